@@ -9,7 +9,12 @@ import time
 import threading
 import subprocess
 import logging
-from flask import Flask, request, jsonify
+import urllib.request
+from flask import Flask, Response, request, jsonify
+
+# metrics of the vision controllers live in the top-level package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import metrics
 
 # Configure logging
 logging.basicConfig(
@@ -102,6 +107,18 @@ class Bridge:
             
             return jsonify(self.voice_commander.get_available_microphones())
         
+        @self.app.route('/api/metrics', methods=['GET'])
+        def get_metrics():
+            # Phoenix serves its metrics on a local port, fall back to the
+            # metrics of this process when it is not running
+            url = f"http://127.0.0.1:{metrics.METRICS_PORT}/metrics"
+            try:
+                with urllib.request.urlopen(url, timeout=1.0) as response:
+                    body = response.read().decode()
+            except OSError:
+                body = metrics.REGISTRY.render()
+            return Response(body, content_type=metrics.CONTENT_TYPE)
+        
         @self.app.route('/api/test', methods=['GET'])
         def test_connection():
             return jsonify({"status": "ok", "message": "Bridge is running"})
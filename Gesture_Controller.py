@@ -1,15 +1,22 @@
 import cv2
 import mediapipe as mp
-import pyautogui
-import math
 from enum import IntEnum
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-from google.protobuf.json_format import MessageToDict
-import screen_brightness_control as sbcontrol
+import time
+import camera_tuner
+import frame_pipeline
+import frame_prep
+import hand_backends
+import preview
+import cursor_filter
+import input_backend
+import metrics
+import system_control
+import vision_workers
+from cursor_actuator import CursorActuator
+from hand_features import HandFeatures
+from gesture_state import GestureDebouncer
+from hand_tracking import HandTracker
 
-pyautogui.FAILSAFE = False
 mp_drawing = mp.solutions.drawing_utils
 mp_hands = mp.solutions.hands
 
@@ -40,11 +47,54 @@ class HLabel(IntEnum):
     MAJOR = 1
 
 
+class CState(IntEnum):
+    """
+    Enum for states of 'Controller'.
+    """
+
+    IDLE = 0
+    ARMED = 1
+    GRAB = 2
+    PINCH_MAJOR = 3
+    PINCH_MINOR = 4
+
+
+# time based debouncing of gestures, see 'gesture_state.GestureDebouncer'.
+# 'dwell' is the delay from a gesture to its action, tune it per gesture.
+GESTURE_RULES = {
+    "default": {"dwell": 0.1, "release": 0.0, "min_confidence": 0.5},
+    Gest.V_GEST: {"dwell": 0.1},
+    Gest.FIST: {"dwell": 0.12, "release": 0.1},
+    Gest.MID: {"dwell": 0.15},
+    Gest.INDEX: {"dwell": 0.15},
+    Gest.TWO_FINGER_CLOSED: {"dwell": 0.2},
+    Gest.PINCH_MAJOR: {"dwell": 0.12, "release": 0.1},
+    Gest.PINCH_MINOR: {"dwell": 0.12, "release": 0.1},
+}
+
+
 class HandRecog:
     """
     Convert Mediapipe Landmarks to recognizable Gestures.
+
+    Attributes
+    ----------
+    pinch_enter : float
+        max. thumb to index distance to start a pinch.
+    pinch_exit : float
+        max. thumb to index distance to stay in a pinch.
+    spread_enter : float
+        min. index to middle finger spread to start a V gesture.
+    spread_exit : float
+        min. index to middle finger spread to stay in a V gesture.
     """
 
+    engine = HandFeatures(max_hands=1)
+    pinch_enter = 0.05
+    pinch_exit = 0.065
+    spread_enter = 1.7
+    spread_exit = 1.55
+
     def __init__(self, hand_label):
         """
         Constructs all the necessary attributes for the HandRecog object.
@@ -54,101 +104,40 @@ class HandRecog:
             finger : int
                 Represent gesture corresponding to Enum 'Gest',
                 stores computed gesture for current frame.
-            ori_gesture : int
-                Represent gesture corresponding to Enum 'Gest',
-                stores gesture being used.
             prev_gesture : int
                 Represent gesture corresponding to Enum 'Gest',
                 stores gesture computed for previous frame.
-            frame_count : int
-                total no. of frames since 'ori_gesture' is updated.
+            debouncer : Object of 'gesture_state.GestureDebouncer'
+                confirms gestures held for their dwell time in 'GESTURE_RULES'.
             hand_result : Object
                 Landmarks obtained from mediapipe.
+            score : float
+                handedness confidence of 'hand_result'.
             hand_label : int
                 Represents multi-handedness corresponding to Enum 'HLabel'.
+            features : ndarray
+                Feature vector of 'hand_result', see 'hand_features.HandFeatures'.
         """
 
         self.finger = 0
-        self.ori_gesture = Gest.PALM
         self.prev_gesture = Gest.PALM
-        self.frame_count = 0
+        self.debouncer = GestureDebouncer(GESTURE_RULES, Gest.PALM)
         self.hand_result = None
+        self.score = 1.0
         self.hand_label = hand_label
+        self.features = None
 
-    def update_hand_result(self, hand_result):
-        self.hand_result = hand_result
-
-    def get_signed_dist(self, point):
-        """
-        returns signed euclidean distance between 'point'.
-
-        Parameters
-        ----------
-        point : list contaning two elements of type list/tuple which represents
-            landmark point.
-
-        Returns
-        -------
-        float
-        """
-        sign = -1
-        if (
-            self.hand_result.landmark[point[0]].y
-            < self.hand_result.landmark[point[1]].y
-        ):
-            sign = 1
-        dist = (
-            self.hand_result.landmark[point[0]].x
-            - self.hand_result.landmark[point[1]].x
-        ) ** 2
-        dist += (
-            self.hand_result.landmark[point[0]].y
-            - self.hand_result.landmark[point[1]].y
-        ) ** 2
-        dist = math.sqrt(dist)
-        return dist * sign
-
-    def get_dist(self, point):
-        """
-        returns euclidean distance between 'point'.
-
-        Parameters
-        ----------
-        point : list contaning two elements of type list/tuple which represents
-            landmark point.
-
-        Returns
-        -------
-        float
-        """
-        dist = (
-            self.hand_result.landmark[point[0]].x
-            - self.hand_result.landmark[point[1]].x
-        ) ** 2
-        dist += (
-            self.hand_result.landmark[point[0]].y
-            - self.hand_result.landmark[point[1]].y
-        ) ** 2
-        dist = math.sqrt(dist)
-        return dist
-
-    def get_dz(self, point):
+    def update_hand_result(self, hand_result, features=None, score=1.0):
         """
-        returns absolute difference on z-axis between 'point'.
-
-        Parameters
-        ----------
-        point : list contaning two elements of type list/tuple which represents
-            landmark point.
-
-        Returns
-        -------
-        float
+        sets 'hand_result', its handedness 'score' and its feature vector
+        computed by 'hand_features.HandFeatures', computed here if not given.
         """
-        return abs(
-            self.hand_result.landmark[point[0]].z
-            - self.hand_result.landmark[point[1]].z
-        )
+        self.hand_result = hand_result
+        self.score = score
+        if hand_result is not None and features is None:
+            HandRecog.engine.load(0, hand_result)
+            features = HandRecog.engine.compute()[0].copy()
+        self.features = features
 
     def set_finger_state(self):
         """
@@ -162,28 +151,15 @@ class HandRecog:
         if self.hand_result == None:
             return
 
-        points = [[8, 5, 0], [12, 9, 0], [16, 13, 0], [20, 17, 0]]
-        self.finger = 0
-        self.finger = self.finger | 0  # thumb
-        for idx, point in enumerate(points):
-
-            dist = self.get_signed_dist(point[:2])
-            dist2 = self.get_signed_dist(point[1:])
+        self.finger = HandFeatures.finger_state(self.features)
 
-            try:
-                ratio = round(dist / dist2, 1)
-            except:
-                ratio = round(dist1 / 0.01, 1)
-
-            self.finger = self.finger << 1
-            if ratio > 0.5:
-                self.finger = self.finger | 1
-
-    def get_gesture(self):
+    def get_gesture(self, timestamp=None):
         """
         returns int representing gesture corresponding to Enum 'Gest'.
-        sets 'frame_count', 'ori_gesture', 'prev_gesture',
-        handles fluctations due to noise.
+        sets 'prev_gesture', handles fluctations due to noise with
+        threshold hysteresis and by confirming a gesture only after it was
+        seen for its dwell time, 'timestamp' (seconds) is the capture time
+        of the frame, now if None.
 
         Returns
         -------
@@ -191,23 +167,31 @@ class HandRecog:
         """
         if self.hand_result == None:
             return Gest.PALM
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        pinch = HandRecog.pinch_enter
+        if self.prev_gesture in [Gest.PINCH_MAJOR, Gest.PINCH_MINOR]:
+            pinch = HandRecog.pinch_exit
+        spread = HandRecog.spread_enter
+        if self.prev_gesture == Gest.V_GEST:
+            spread = HandRecog.spread_exit
 
         current_gesture = Gest.PALM
-        if self.finger in [Gest.LAST3, Gest.LAST4] and self.get_dist([8, 4]) < 0.05:
+        if (
+            self.finger in [Gest.LAST3, Gest.LAST4]
+            and self.features[HandFeatures.PINCH] < pinch
+        ):
             if self.hand_label == HLabel.MINOR:
                 current_gesture = Gest.PINCH_MINOR
             else:
                 current_gesture = Gest.PINCH_MAJOR
 
         elif Gest.FIRST2 == self.finger:
-            point = [[8, 12], [5, 9]]
-            dist1 = self.get_dist(point[0])
-            dist2 = self.get_dist(point[1])
-            ratio = dist1 / dist2
-            if ratio > 1.7:
+            if self.features[HandFeatures.SPREAD] > spread:
                 current_gesture = Gest.V_GEST
             else:
-                if self.get_dz([8, 12]) < 0.1:
+                if self.features[HandFeatures.DZ] < 0.1:
                     current_gesture = Gest.TWO_FINGER_CLOSED
                 else:
                     current_gesture = Gest.MID
@@ -215,16 +199,8 @@ class HandRecog:
         else:
             current_gesture = self.finger
 
-        if current_gesture == self.prev_gesture:
-            self.frame_count += 1
-        else:
-            self.frame_count = 0
-
         self.prev_gesture = current_gesture
-
-        if self.frame_count > 4:
-            self.ori_gesture = current_gesture
-        return self.ori_gesture
+        return self.debouncer.update(current_gesture, timestamp, self.score)
 
 
 class Controller:
@@ -237,16 +213,14 @@ class Controller:
         previous mouse location x coordinate
     ty_old : int
         previous mouse location y coordinate
-    flag : bool
-        true if V gesture is detected
-    grabflag : bool
-        true if FIST gesture is detected
-    pinchmajorflag : bool
-        true if PINCH gesture is detected through MAJOR hand,
+    state : int
+        Represents state corresponding to Enum 'CState',
+        ARMED after V gesture, clicks are only executed in ARMED state,
+        GRAB while FIST gesture holds the left button down,
+        PINCH_MAJOR while PINCH gesture is detected through MAJOR hand,
         on x-axis 'Controller.changesystembrightness',
-        on y-axis 'Controller.changesystemvolume'.
-    pinchminorflag : bool
-        true if PINCH gesture is detected through MINOR hand,
+        on y-axis 'Controller.changesystemvolume',
+        PINCH_MINOR while PINCH gesture is detected through MINOR hand,
         on x-axis 'Controller.scrollHorizontal',
         on y-axis 'Controller.scrollVertical'.
     pinchstartxcoord : int
@@ -262,29 +236,50 @@ class Controller:
     pinchlv : int
         stores quantized magnitued of pinch gesture displacment, from
         starting position
-    framecount : int
-        stores no. of frames since 'pinchlv' is updated.
+    pinchsince : float
+        timestamp since which 'prevpinchlv' is stable, or of the last pinch
+        action, None before the pinch moved past 'pinch_threshold'.
+    pinch_interval : float
+        seconds 'prevpinchlv' must be stable before a pinch action, and
+        between repeated pinch actions.
     prev_hand : tuple
-        stores (x, y) coordinates of hand in previous frame.
+        stores filtered (x, y) coordinates of hand in previous frame.
     pinch_threshold : float
         step size for quantization of 'pinchlv'.
+    cursor : Object of 'cursor_actuator.CursorActuator'
+        moves the cursor on its own thread, started on first use.
+    cursor_profile : str or dict
+        cursor filter profile, see 'cursor_filter.PROFILES'.
+    cursor_filter : Object
+        filter of hand position built from 'cursor_profile'.
+    cursor_gain : float
+        scale from filtered hand motion to cursor motion.
+    cursor_pos : tuple
+        (x, y) cursor position tracked by the controller, read from the
+        OS only once.
+    screen : tuple
+        cached (width, height) of screen.
     """
 
     tx_old = 0
     ty_old = 0
     trial = True
-    flag = False
-    grabflag = False
-    pinchmajorflag = False
-    pinchminorflag = False
+    state = CState.IDLE
     pinchstartxcoord = None
     pinchstartycoord = None
     pinchdirectionflag = None
     prevpinchlv = 0
     pinchlv = 0
-    framecount = 0
+    pinchsince = None
+    pinch_interval = 0.15
     prev_hand = None
     pinch_threshold = 0.3
+    cursor = None
+    cursor_profile = "default"
+    cursor_filter = None
+    cursor_gain = 1.0
+    cursor_pos = None
+    screen = None
 
     def getpinchylv(hand_result):
         """returns distance beween starting pinch y coord and current hand position y coord."""
@@ -297,76 +292,84 @@ class Controller:
         return dist
 
     def changesystembrightness():
-        """sets system brightness based on 'Controller.pinchlv'."""
-        currentBrightnessLv = sbcontrol.get_brightness(display=0) / 100.0
-        currentBrightnessLv += Controller.pinchlv / 50.0
-        if currentBrightnessLv > 1.0:
-            currentBrightnessLv = 1.0
-        elif currentBrightnessLv < 0.0:
-            currentBrightnessLv = 0.0
-        sbcontrol.fade_brightness(
-            int(100 * currentBrightnessLv), start=sbcontrol.get_brightness(display=0)
-        )
+        """changes system brightness based on 'Controller.pinchlv', without waiting."""
+        system_control.get_service().adjust("brightness", Controller.pinchlv / 50.0)
 
     def changesystemvolume():
-        """sets system volume based on 'Controller.pinchlv'."""
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-        volume = cast(interface, POINTER(IAudioEndpointVolume))
-        currentVolumeLv = volume.GetMasterVolumeLevelScalar()
-        currentVolumeLv += Controller.pinchlv / 50.0
-        if currentVolumeLv > 1.0:
-            currentVolumeLv = 1.0
-        elif currentVolumeLv < 0.0:
-            currentVolumeLv = 0.0
-        volume.SetMasterVolumeLevelScalar(currentVolumeLv, None)
+        """changes system volume based on 'Controller.pinchlv', without waiting."""
+        system_control.get_service().adjust("volume", Controller.pinchlv / 50.0)
 
     def scrollVertical():
         """scrolls on screen vertically."""
-        pyautogui.scroll(120 if Controller.pinchlv > 0.0 else -120)
+        input_backend.get_backend().scroll(1 if Controller.pinchlv > 0.0 else -1)
 
     def scrollHorizontal():
         """scrolls on screen horizontally."""
-        pyautogui.keyDown("shift")
-        pyautogui.keyDown("ctrl")
-        pyautogui.scroll(-120 if Controller.pinchlv > 0.0 else 120)
-        pyautogui.keyUp("ctrl")
-        pyautogui.keyUp("shift")
+        inputs = input_backend.get_backend()
+        inputs.key_down("shift")
+        inputs.key_down("ctrl")
+        inputs.scroll(-1 if Controller.pinchlv > 0.0 else 1)
+        inputs.key_up("ctrl")
+        inputs.key_up("shift")
+
+    def move_cursor(x, y):
+        """hands (x, y) to 'Controller.cursor' without waiting for the move."""
+        if Controller.cursor is None:
+            Controller.cursor = CursorActuator()
+            Controller.cursor.start()
+        Controller.cursor.move_to(x, y)
+
+    def set_cursor_profile(profile):
+        """
+        selects cursor filter and gain, 'profile' is a name in
+        'cursor_filter.PROFILES' or a dict of the same form.
+        """
+        Controller.cursor_profile = profile
+        Controller.cursor_filter, Controller.cursor_gain = cursor_filter.make_filter(
+            profile
+        )
 
-    def get_position(hand_result):
+    def get_position(hand_result, timestamp=None):
         """
         returns coordinates of current hand position.
 
         Locates hand to get cursor position also stabilize cursor by
-        dampening jerky motion of hand.
+        filtering hand motion with 'Controller.cursor_filter', 'timestamp'
+        (seconds) is the capture time of the frame, now if None.
 
         Returns
         -------
         tuple(float, float)
         """
         point = 9
-        position = [hand_result.landmark[point].x, hand_result.landmark[point].y]
-        sx, sy = pyautogui.size()
-        x_old, y_old = pyautogui.position()
-        x = int(position[0] * sx)
-        y = int(position[1] * sy)
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if Controller.screen is None:
+            Controller.screen = input_backend.get_backend().size()
+        if Controller.cursor_filter is None:
+            Controller.set_cursor_profile(Controller.cursor_profile)
+        sx, sy = Controller.screen
+
+        if Controller.prev_hand is None:
+            Controller.cursor_filter.reset()
+        x, y = Controller.cursor_filter.filter(
+            hand_result.landmark[point].x * sx,
+            hand_result.landmark[point].y * sy,
+            timestamp,
+        )
         if Controller.prev_hand is None:
             Controller.prev_hand = x, y
+        if Controller.cursor_pos is None:
+            Controller.cursor_pos = input_backend.get_backend().position()
+
         delta_x = x - Controller.prev_hand[0]
         delta_y = y - Controller.prev_hand[1]
+        Controller.prev_hand = x, y
 
-        distsq = delta_x**2 + delta_y**2
-        ratio = 1
-        Controller.prev_hand = [x, y]
-
-        if distsq <= 25:
-            ratio = 0
-        elif distsq <= 900:
-            ratio = 0.07 * (distsq ** (1 / 2))
-        else:
-            ratio = 2.1
-        x, y = x_old + delta_x * ratio, y_old + delta_y * ratio
-        return (x, y)
+        x = Controller.cursor_pos[0] + delta_x * Controller.cursor_gain
+        y = Controller.cursor_pos[1] + delta_y * Controller.cursor_gain
+        Controller.cursor_pos = (min(max(x, 0), sx - 1), min(max(y, 0), sy - 1))
+        return Controller.cursor_pos
 
     def pinch_control_init(hand_result):
         """Initializes attributes for pinch gesture."""
@@ -374,12 +377,13 @@ class Controller:
         Controller.pinchstartycoord = hand_result.landmark[8].y
         Controller.pinchlv = 0
         Controller.prevpinchlv = 0
-        Controller.framecount = 0
+        Controller.pinchsince = None
 
-    def pinch_control(hand_result, controlHorizontal, controlVertical):
+    def pinch_control(hand_result, controlHorizontal, controlVertical, timestamp):
         """
-        calls 'controlHorizontal' or 'controlVertical' based on pinch flags,
-        'framecount' and sets 'pinchlv'.
+        calls 'controlHorizontal' or 'controlVertical' based on pinch
+        direction once 'prevpinchlv' was stable for 'pinch_interval' seconds
+        and sets 'pinchlv'.
 
         Parameters
         ----------
@@ -389,13 +393,18 @@ class Controller:
             pinch gesture.
         controlVertical : callback function assosiated with vertical
             pinch gesture.
+        timestamp : float
+            capture time of the frame in seconds.
 
         Returns
         -------
         None
         """
-        if Controller.framecount == 5:
-            Controller.framecount = 0
+        if (
+            Controller.pinchsince is not None
+            and timestamp - Controller.pinchsince >= Controller.pinch_interval
+        ):
+            Controller.pinchsince = timestamp
             Controller.pinchlv = Controller.prevpinchlv
 
             if Controller.pinchdirectionflag == True:
@@ -409,76 +418,93 @@ class Controller:
 
         if abs(lvy) > abs(lvx) and abs(lvy) > Controller.pinch_threshold:
             Controller.pinchdirectionflag = False
-            if abs(Controller.prevpinchlv - lvy) < Controller.pinch_threshold:
-                Controller.framecount += 1
-            else:
+            if abs(Controller.prevpinchlv - lvy) >= Controller.pinch_threshold:
                 Controller.prevpinchlv = lvy
-                Controller.framecount = 0
+                Controller.pinchsince = timestamp
 
         elif abs(lvx) > Controller.pinch_threshold:
             Controller.pinchdirectionflag = True
-            if abs(Controller.prevpinchlv - lvx) < Controller.pinch_threshold:
-                Controller.framecount += 1
-            else:
+            if abs(Controller.prevpinchlv - lvx) >= Controller.pinch_threshold:
                 Controller.prevpinchlv = lvx
-                Controller.framecount = 0
+                Controller.pinchsince = timestamp
+
+        else:
+            # back in the dead zone, no more steps until the pinch moves out
+            # again, which restarts the stability timer
+            Controller.prevpinchlv = 0
+            Controller.pinchsince = None
+
+    def handle_controls(gesture, hand_result, timestamp=None):
+        """
+        Impliments all gesture functionality.
 
-    def handle_controls(gesture, hand_result):
-        """Impliments all gesture functionality."""
+        Leaves GRAB and PINCH states when their gesture ends, then enters
+        the state of the new gesture or executes it.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
         x, y = None, None
-        if gesture != Gest.PALM:
-            x, y = Controller.get_position(hand_result)
+        if gesture in (Gest.V_GEST, Gest.FIST):
+            x, y = Controller.get_position(hand_result, timestamp)
+        else:
+            # hand motion of other gestures must not build up in
+            # 'cursor_pos', the next cursor gesture restarts from the hand
+            Controller.prev_hand = None
 
-        # flag reset
-        if gesture != Gest.FIST and Controller.grabflag:
-            Controller.grabflag = False
-            pyautogui.mouseUp(button="left")
+        # state exit
+        if Controller.state == CState.GRAB and gesture != Gest.FIST:
+            Controller.state = CState.IDLE
+            input_backend.get_backend().mouse_up(button="left")
 
-        if gesture != Gest.PINCH_MAJOR and Controller.pinchmajorflag:
-            Controller.pinchmajorflag = False
+        if Controller.state == CState.PINCH_MAJOR and gesture != Gest.PINCH_MAJOR:
+            Controller.state = CState.IDLE
 
-        if gesture != Gest.PINCH_MINOR and Controller.pinchminorflag:
-            Controller.pinchminorflag = False
+        if Controller.state == CState.PINCH_MINOR and gesture != Gest.PINCH_MINOR:
+            Controller.state = CState.IDLE
 
         # implementation
         if gesture == Gest.V_GEST:
-            Controller.flag = True
-            pyautogui.moveTo(x, y, duration=0.1)
+            Controller.state = CState.ARMED
+            Controller.move_cursor(x, y)
 
         elif gesture == Gest.FIST:
-            if not Controller.grabflag:
-                Controller.grabflag = True
-                pyautogui.mouseDown(button="left")
-            pyautogui.moveTo(x, y, duration=0.1)
+            if Controller.state != CState.GRAB:
+                Controller.state = CState.GRAB
+                input_backend.get_backend().mouse_down(button="left")
+            Controller.move_cursor(x, y)
 
-        elif gesture == Gest.MID and Controller.flag:
-            pyautogui.click()
-            Controller.flag = False
+        elif gesture == Gest.MID and Controller.state == CState.ARMED:
+            input_backend.get_backend().click()
+            Controller.state = CState.IDLE
 
-        elif gesture == Gest.INDEX and Controller.flag:
-            pyautogui.click(button="right")
-            Controller.flag = False
+        elif gesture == Gest.INDEX and Controller.state == CState.ARMED:
+            input_backend.get_backend().click(button="right")
+            Controller.state = CState.IDLE
 
-        elif gesture == Gest.TWO_FINGER_CLOSED and Controller.flag:
-            pyautogui.doubleClick()
-            Controller.flag = False
+        elif gesture == Gest.TWO_FINGER_CLOSED and Controller.state == CState.ARMED:
+            input_backend.get_backend().double_click()
+            Controller.state = CState.IDLE
 
         elif gesture == Gest.PINCH_MINOR:
-            if Controller.pinchminorflag == False:
+            if Controller.state != CState.PINCH_MINOR:
                 Controller.pinch_control_init(hand_result)
-                Controller.pinchminorflag = True
+                Controller.state = CState.PINCH_MINOR
             Controller.pinch_control(
-                hand_result, Controller.scrollHorizontal, Controller.scrollVertical
+                hand_result,
+                Controller.scrollHorizontal,
+                Controller.scrollVertical,
+                timestamp,
             )
 
         elif gesture == Gest.PINCH_MAJOR:
-            if Controller.pinchmajorflag == False:
+            if Controller.state != CState.PINCH_MAJOR:
                 Controller.pinch_control_init(hand_result)
-                Controller.pinchmajorflag = True
+                Controller.state = CState.PINCH_MAJOR
             Controller.pinch_control(
                 hand_result,
                 Controller.changesystembrightness,
                 Controller.changesystemvolume,
+                timestamp,
             )
 
 
@@ -511,6 +537,56 @@ class GestureController:
     dom_hand : bool
         True if right hand is domaniant hand, otherwise False.
         default True.
+    major_score : float
+        handedness confidence of 'hr_major'.
+    minor_score : float
+        handedness confidence of 'hr_minor'.
+    tracker : Object of 'hand_tracking.HandTracker'
+        keeps identity and handedness of hands stable over frames.
+    major_track : int
+        track id of 'hr_major', None if not visible.
+    minor_track : int
+        track id of 'hr_minor', None if not visible.
+    features : Object of 'hand_features.HandFeatures'
+        feature engine shared by both hands, slots indexed by 'HLabel'.
+    pipeline_mode : bool
+        True to run capture, inference and actuation as separate stages
+        on their own threads, see 'GestureController.start_pipeline'.
+        default False.
+    recorder : Object of 'gesture_replay.SessionRecorder'
+        if set, landmarks of every frame are recorded and saved on exit.
+    render_mode : str
+        'window' draws and shows every frame, 'preview' draws and shows at
+        most 'preview_rate' frames per second on a separate thread,
+        'headless' skips drawing and windows completely.
+        default 'window'.
+    preview_rate : float
+        max. frames per second shown in 'preview' mode.
+    frame_scheduler : Object of 'frame_scheduler.FrameScheduler'
+        if set, paces the loop at its frame rate, else the camera does.
+    idle_scheduler : Object of 'idle_gate.IdleScheduler'
+        if set, drops to a low frame rate with a motion gate in front of
+        inference while no hand is visible.
+    adaptive : Object of 'adaptive_inference.AdaptiveInference'
+        if set, runs inference on a downscaled frame or a crop around the
+        tracked hands, adapted to a frame latency budget.
+    inference_workers : bool
+        True to run hand landmark inference in a supervised worker process,
+        see 'vision_workers.VisionWorker'.
+        default False.
+    detector_pool : Object of 'detector_pool.DetectorPool'
+        if set, the pool's prewarmed hand model is used and kept loaded
+        after the controller stops.
+    hand_backend : str
+        name of the hand landmark backend in 'hand_backends.BACKENDS',
+        'solutions' or 'tasks', from 'PHOENIX_HAND_BACKEND' if None.
+    max_hands : int
+        max. no. of hands detected.
+    model_complexity : int
+        0 for the light, 1 for the full hand landmark model.
+    stats : Object of 'metrics.StageMetrics'
+        frame counts and capture, inference, classification and actuation
+        latency, served by 'metrics.serve'.
     """
 
     gc_mode = 0
@@ -520,11 +596,36 @@ class GestureController:
     hr_major = None
     hr_minor = None
     dom_hand = True
-
-    def __init__(self):
-        """Initilaizes attributes."""
+    major_score = 1.0
+    minor_score = 1.0
+    tracker = HandTracker()
+    major_track = None
+    minor_track = None
+    features = HandFeatures(max_hands=2)
+    pipeline_mode = False
+    recorder = None
+    render_mode = "window"
+    preview_rate = 10.0
+    frame_scheduler = None
+    idle_scheduler = None
+    adaptive = None
+    inference_workers = False
+    detector_pool = None
+    hand_backend = None
+    max_hands = 2
+    model_complexity = 1
+    stats = metrics.StageMetrics("gesture")
+
+    def __init__(self, cap=None):
+        """
+        Initilaizes attributes, 'cap' is a capture with the interface of
+        'cv2.VideoCapture', e.g. 'camera_broker.BrokerCapture' to share the
+        camera, camera 0 is opened with its 'camera_tuner' profile if None.
+        """
         GestureController.gc_mode = 1
-        GestureController.cap = cv2.VideoCapture(0)
+        GestureController.cap = (
+            cap if cap is not None else camera_tuner.open_capture(0)
+        )
         GestureController.CAM_HEIGHT = GestureController.cap.get(
             cv2.CAP_PROP_FRAME_HEIGHT
         )
@@ -532,88 +633,334 @@ class GestureController:
             cv2.CAP_PROP_FRAME_WIDTH
         )
 
-    def classify_hands(results):
+    def classify_hands(results, timestamp=None):
         """
         sets 'hr_major', 'hr_minor' based on classification(left, right) of
-        hand obtained from mediapipe, uses 'dom_hand' to decide major and
-        minor hand.
-        """
-        left, right = None, None
-        try:
-            handedness_dict = MessageToDict(results.multi_handedness[0])
-            if handedness_dict["classification"][0]["label"] == "Right":
-                right = results.multi_hand_landmarks[0]
-            else:
-                left = results.multi_hand_landmarks[0]
-        except:
-            pass
-
-        try:
-            handedness_dict = MessageToDict(results.multi_handedness[1])
-            if handedness_dict["classification"][0]["label"] == "Right":
-                right = results.multi_hand_landmarks[1]
-            else:
-                left = results.multi_hand_landmarks[1]
-        except:
-            pass
+        hand obtained from mediapipe, stabilized by 'tracker', uses
+        'dom_hand' to decide major and minor hand.
+        """
+        hands = {"Left": (None, 1.0, None), "Right": (None, 1.0, None)}
+        for track in GestureController.tracker.update(results, timestamp):
+            hands[track.label] = (track.landmarks, track.score, track.track_id)
+
+        major, minor = "Right", "Left"
+        if GestureController.dom_hand != True:
+            major, minor = minor, major
+        (
+            GestureController.hr_major,
+            GestureController.major_score,
+            GestureController.major_track,
+        ) = hands[major]
+        (
+            GestureController.hr_minor,
+            GestureController.minor_score,
+            GestureController.minor_track,
+        ) = hands[minor]
+
+    def process_hands(results, handmajor, handminor, timestamp=None):
+        """
+        returns (gesture, hand_result) to be passed to
+        'Controller.handle_controls' for landmarks in 'results' captured at
+        'timestamp' (seconds).
+        """
+        GestureController.classify_hands(results, timestamp)
+        features = GestureController.features
+        features.load(HLabel.MAJOR, GestureController.hr_major)
+        features.load(HLabel.MINOR, GestureController.hr_minor)
+        features.compute()
+        handmajor.update_hand_result(
+            GestureController.hr_major,
+            features.features[HLabel.MAJOR],
+            GestureController.major_score,
+        )
+        handminor.update_hand_result(
+            GestureController.hr_minor,
+            features.features[HLabel.MINOR],
+            GestureController.minor_score,
+        )
 
-        if GestureController.dom_hand == True:
-            GestureController.hr_major = right
-            GestureController.hr_minor = left
-        else:
-            GestureController.hr_major = left
-            GestureController.hr_minor = right
+        handmajor.set_finger_state()
+        handminor.set_finger_state()
+        gest_name = handminor.get_gesture(timestamp)
+
+        if gest_name == Gest.PINCH_MINOR:
+            return gest_name, handminor.hand_result
+        gest_name = handmajor.get_gesture(timestamp)
+        return gest_name, handmajor.hand_result
+
+    def hands_model():
+        """
+        returns hand landmark model of 'hand_backend' to be used as context
+        manager, from 'detector_pool' if set, else a new one, in a worker
+        process if 'inference_workers' is set.
+        """
+        options = {
+            "max_num_hands": GestureController.max_hands,
+            "model_complexity": GestureController.model_complexity,
+            "min_detection_confidence": 0.5,
+            "min_tracking_confidence": 0.5,
+        }
+        if GestureController.detector_pool:
+            return GestureController.detector_pool.get(
+                "hands", backend=GestureController.hand_backend, **options
+            )
+        if GestureController.inference_workers:
+            return vision_workers.VisionWorker("hands", **options)
+        return hand_backends.create_backend(GestureController.hand_backend, **options)
+
+    def draw_hands(image, hand_landmarks):
+        """draws 'hand_landmarks' on BGR 'image' and returns it."""
+        for hand in hand_landmarks or []:
+            mp_drawing.draw_landmarks(image, hand, mp_hands.HAND_CONNECTIONS)
+        return image
+
+    def show(frame, results, renderer, delay, prep):
+        """
+        renders BGR camera 'frame' and landmarks in 'results' according to
+        'render_mode', returns False if user pressed Enter to quit.
+        'prep' mirrors the frame like the landmarks, only if it is shown.
+        """
+        if GestureController.render_mode == "window":
+            image = GestureController.draw_hands(
+                prep.preview(frame), results.multi_hand_landmarks
+            )
+            cv2.imshow("Gesture Controller", image)
+            return cv2.waitKey(delay) & 0xFF != 13
+        if renderer is not None and renderer.due():
+            image = prep.preview(frame, copy=True)
+            hand_landmarks = results.multi_hand_landmarks
+            renderer.submit(
+                lambda: [
+                    (
+                        "Gesture Controller",
+                        GestureController.draw_hands(image, hand_landmarks),
+                    )
+                ]
+            )
+            return not renderer.stop_requested
+        return True
 
     def start(self):
         """
         Entry point of whole programm, caputres video frame and passes, obtains
         landmark from mediapipe and passes it to 'handmajor' and 'handminor' for
         controlling.
+
+        With an asynchronous hand backend frames are only submitted here,
+        the gesture logic runs in the backend's result callback and the
+        preview shows the newest results delivered.
         """
+        if GestureController.pipeline_mode:
+            self.start_pipeline()
+            return
 
         handmajor = HandRecog(HLabel.MAJOR)
         handminor = HandRecog(HLabel.MINOR)
+        renderer = preview.make_renderer(
+            GestureController.render_mode, GestureController.preview_rate
+        )
+        scheduler = GestureController.idle_scheduler
+        adaptive = GestureController.adaptive
+        prep = frame_prep.FramePrep()
+        latest = [vision_workers.hand_results([], [], [])]
+        stats = GestureController.stats
+        pace = GestureController.pacer(stats)
+
+        def on_results(results, timestamp):
+            """runs gesture logic on 'results' of frame captured at 'timestamp'."""
+            stats.stage("inference").observe(time.perf_counter() - timestamp)
+            prep.mirror_hands(results)
+            if GestureController.recorder:
+                GestureController.recorder.add(results, timestamp)
+            if scheduler:
+                scheduler.update(bool(results.multi_hand_landmarks))
+
+            if results.multi_hand_landmarks:
+                with stats.time("classification"):
+                    gest_name, hand_result = GestureController.process_hands(
+                        results, handmajor, handminor, timestamp
+                    )
+                with stats.time("actuation"):
+                    Controller.handle_controls(gest_name, hand_result, timestamp)
+            else:
+                Controller.prev_hand = None
+            if adaptive:
+                adaptive.observe(time.perf_counter() - timestamp)
+            latest[0] = results
 
-        with mp_hands.Hands(
-            max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5
-        ) as hands:
+        with GestureController.hands_model() as hands:
+            asynchronous = getattr(hands, "asynchronous", False) and not adaptive
             while GestureController.cap.isOpened() and GestureController.gc_mode:
-                success, image = GestureController.cap.read()
+                pace()
+                with stats.time("capture"):
+                    success, image = prep.read(GestureController.cap)
+                timestamp = time.perf_counter()
 
                 if not success:
                     print("Ignoring Empty Camera Frame.")
+                    stats.drop("empty")
+                    continue
+                stats.frame()
+                if scheduler and not scheduler.should_infer(image):
+                    stats.drop("idle")
+                    if GestureController.render_mode == "window":
+                        cv2.waitKey(1)
                     continue
 
-                image = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
-                image.flags.writeable = False
-                results = hands.process(image)
+                rgb = prep.to_rgb(image)
+                if asynchronous:
+                    hands.submit(rgb, timestamp, on_results)
+                elif adaptive:
+                    on_results(adaptive.process(hands, rgb), timestamp)
+                else:
+                    on_results(hands.process(rgb), timestamp)
+                if not GestureController.show(image, latest[0], renderer, 5, prep):
+                    break
+        if renderer is not None:
+            renderer.stop()
+        if GestureController.frame_scheduler:
+            print("Frame scheduler:", GestureController.frame_scheduler.report())
+        if scheduler:
+            print("Idle scheduler:", scheduler.report())
+        if adaptive:
+            print("Adaptive inference:", adaptive.report())
+            adaptive.close()
+        if GestureController.recorder:
+            GestureController.recorder.save()
+        GestureController.cap.release()
+        if GestureController.render_mode == "window":
+            preview.destroy_windows(["Gesture Controller"])
 
-                image.flags.writeable = True
-                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    def pacer(stats):
+        """
+        returns function waiting until the next frame is due by
+        'frame_scheduler' and 'idle_scheduler', counting skipped frames.
+        """
+        pacer = GestureController.frame_scheduler
+        scheduler = GestureController.idle_scheduler
+        if pacer:
+            pacer.reset()
+
+        def pace():
+            if pacer:
+                skipped = pacer.wait()
+                if skipped:
+                    stats.drop("overrun", skipped)
+            if scheduler:
+                scheduler.wait()
+
+        return pace
+
+    def actuate(command):
+        """
+        actuation stage of the pipeline, 'command' is (gesture, hand_result,
+        timestamp), gesture is None when no hand is visible.
+        """
+        gest_name, hand_result, timestamp = command
+        if gest_name is None:
+            Controller.prev_hand = None
+        else:
+            with GestureController.stats.time("actuation"):
+                Controller.handle_controls(gest_name, hand_result, timestamp)
 
-                if results.multi_hand_landmarks:
-                    GestureController.classify_hands(results)
-                    handmajor.update_hand_result(GestureController.hr_major)
-                    handminor.update_hand_result(GestureController.hr_minor)
+    def start_pipeline(self):
+        """
+        Staged variant of 'start'.
 
-                    handmajor.set_finger_state()
-                    handminor.set_finger_state()
-                    gest_name = handminor.get_gesture()
+        A capture thread keeps only the newest camera frame, this thread
+        runs inference on whatever frame is newest when it becomes free and
+        an actuation thread executes the newest gesture. Stale frames and
+        gestures are dropped instead of queued, so cursor latency stays
+        bounded by one inference time.
+        """
+        handmajor = HandRecog(HLabel.MAJOR)
+        handminor = HandRecog(HLabel.MINOR)
+        renderer = preview.make_renderer(
+            GestureController.render_mode, GestureController.preview_rate
+        )
+        scheduler = GestureController.idle_scheduler
+        adaptive = GestureController.adaptive
+        prep = frame_prep.FramePrep()
+        stats = GestureController.stats
+
+        frame_slot = frame_pipeline.LatestFrame()
+        action_slot = frame_pipeline.LatestFrame()
+        capture = frame_pipeline.CaptureThread(
+            GestureController.cap, frame_slot, GestureController.pacer(stats)
+        )
+        actuation = frame_pipeline.StageThread(action_slot, GestureController.actuate)
+        capture.start()
+        actuation.start()
+
+        # drops counted by the threads and already added to 'stats'
+        reported = {"stale": 0, "empty": 0}
+
+        def report_drops():
+            counts = {"stale": frame_slot.dropped, "empty": capture.failed}
+            for reason, count in counts.items():
+                if count > reported[reason]:
+                    stats.drop(reason, count - reported[reason])
+                    reported[reason] = count
+
+        with GestureController.hands_model() as hands:
+            while GestureController.gc_mode:
+                report_drops()
+                taken = frame_slot.take(timeout=0.5)
+                if taken is None:
+                    if frame_slot.closed:
+                        break
+                    continue
+                _, (timestamp, image) = taken
+                stats.frame()
+                if scheduler and not scheduler.should_infer(image):
+                    stats.drop("idle")
+                    continue
 
-                    if gest_name == Gest.PINCH_MINOR:
-                        Controller.handle_controls(gest_name, handminor.hand_result)
+                rgb = prep.to_rgb(image)
+                with stats.time("inference"):
+                    if adaptive:
+                        results = adaptive.process(hands, rgb)
                     else:
-                        gest_name = handmajor.get_gesture()
-                        Controller.handle_controls(gest_name, handmajor.hand_result)
+                        results = hands.process(rgb)
+                prep.mirror_hands(results)
+                if GestureController.recorder:
+                    GestureController.recorder.add(results, timestamp)
+                if scheduler:
+                    scheduler.update(bool(results.multi_hand_landmarks))
 
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        mp_drawing.draw_landmarks(
-                            image, hand_landmarks, mp_hands.HAND_CONNECTIONS
+                if results.multi_hand_landmarks:
+                    with stats.time("classification"):
+                        gest_name, hand_result = GestureController.process_hands(
+                            results, handmajor, handminor, timestamp
                         )
+                    action_slot.put((gest_name, hand_result, timestamp))
                 else:
-                    Controller.prev_hand = None
-                cv2.imshow("Gesture Controller", image)
-                if cv2.waitKey(5) & 0xFF == 13:
+                    action_slot.put((None, None, timestamp))
+                if adaptive:
+                    adaptive.observe(time.perf_counter() - timestamp)
+                if not GestureController.show(image, results, renderer, 1, prep):
                     break
+
+        if renderer is not None:
+            renderer.stop()
+        capture.stop()
+        actuation.stop()
+        capture.join()
+        actuation.join()
+        print(
+            "Pipeline dropped %d of %d camera frames and %d gestures."
+            % (frame_slot.dropped, capture.frames, action_slot.dropped)
+        )
+        report_drops()
+        if GestureController.frame_scheduler:
+            print("Frame scheduler:", GestureController.frame_scheduler.report())
+        if scheduler:
+            print("Idle scheduler:", scheduler.report())
+        if adaptive:
+            print("Adaptive inference:", adaptive.report())
+            adaptive.close()
+        if GestureController.recorder:
+            GestureController.recorder.save()
         GestureController.cap.release()
-        cv2.destroyAllWindows()
\ No newline at end of file
+        if GestureController.render_mode == "window":
+            preview.destroy_windows(["Gesture Controller"])
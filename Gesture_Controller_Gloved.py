@@ -3,29 +3,89 @@ import cv2
 import cv2.aruco as aruco
 import os
 import glob
+import hashlib
 import math
-import pyautogui
 import time
+import camera_tuner
+import input_backend
+import preview
+from cursor_actuator import CursorActuator
+from frame_scheduler import FrameScheduler
+from marker_tracking import MarkerTracker
+from roi_segmenter import ROISegmenter
 
 
 class Marker:
+    # checkerboard images, calibrations computed from them are cached in
+    # 'cache_dir' per image set and camera resolution
+    images = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "calib_images", "checkerboard"
+    )
+    cache_dir = os.path.join(os.path.expanduser("~"), ".phoenix", "calibration")
+    # search a window around the last corners first, padded by 'window_pad'
+    # marker sizes plus 'velocity_gain' times the marker's px/frame speed
+    windowed = True
+    window_pad = 1.0
+    velocity_gain = 3.0
+
     def __init__(self, dict_type=aruco.DICT_4X4_50, thresh_constant=1):
         self.aruco_dict = aruco.Dictionary_get(dict_type)
         self.parameters = aruco.DetectorParameters_create()
         self.parameters.adaptiveThreshConstant = thresh_constant
         self.corners = None
         self.marker_x2y = 1
-        self.mtx, self.dist = Marker.calibrate()
+        # calibrated on the first detection, at the camera's resolution
+        self.mtx, self.dist = None, None
+        self.calibrated = False
+        self.center = None
+        self.velocity = 0.0
+        # no. of searches, full frame searches and searched frame fractions
+        self.searches = 0
+        self.full_searches = 0
+        self.searched = 0.0
+
+    def calibration_key(images, resolution):
+        """returns hash of the contents of 'images' and camera 'resolution'."""
+        digest = hashlib.sha1(b"%dx%d" % resolution)
+        for fname in images:
+            with open(fname, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:16]
+
+    def load_calibration(resolution):
+        """
+        returns (mtx, dist) for frames of 'resolution' (width, height), from
+        the cache if the images were calibrated before, (None, None) if
+        there are no usable images.
+        """
+        images = sorted(glob.glob(os.path.join(Marker.images, "*.jpg")))
+        if not images:
+            print("No calibration images found, marker pose is not estimated.")
+            return None, None
+        key = Marker.calibration_key(images, resolution)
+        cache = os.path.join(Marker.cache_dir, key + ".npz")
+        if os.path.exists(cache):
+            with np.load(cache) as data:
+                return data["mtx"], data["dist"]
+
+        calibration = Marker.calibrate(images)
+        if calibration is None:
+            return None, None
+        mtx, dist, size = calibration
+        # focal lengths and principal point scale with the resolution
+        mtx[0] *= resolution[0] / size[0]
+        mtx[1] *= resolution[1] / size[1]
+        os.makedirs(Marker.cache_dir, exist_ok=True)
+        np.savez(cache, mtx=mtx, dist=dist)
+        return mtx, dist
 
-    def calibrate():
+    def calibrate(images):
+        """returns (mtx, dist, (width, height)) of checkerboard 'images'."""
         criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
         objp = np.zeros((6 * 7, 3), np.float32)
         objp[:, :2] = np.mgrid[0:7, 0:6].T.reshape(-1, 2)
         objpoints = []
         imgpoints = []
-        path = os.path.dirname(os.path.abspath(__file__))
-        p1 = path + r"\calib_images\checkerboard\*.jpg"
-        images = glob.glob(p1)
         for fname in images:
             img = cv2.imread(fname)
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -34,23 +94,79 @@ class Marker:
                 objpoints.append(objp)
                 corners2 = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
                 imgpoints.append(corners2)
-                img = cv2.drawChessboardCorners(img, (7, 6), corners2, ret)
+        if not objpoints:
+            return None
 
         ret, mtx, dist, rvecs, tvecs = cv2.calibrateCamera(
             objpoints, imgpoints, gray.shape[::-1], None, None
         )
 
-        return mtx, dist
+        return mtx, dist, gray.shape[::-1]
 
-    def detect(self, frame):
+    def search_window(self, width, height):
+        """
+        returns (x0, y0, x1, y1) to search around the last corners in a
+        'width' x 'height' frame, None to search the whole frame.
+        """
+        if not self.corners:
+            return None
+        points = np.reshape(self.corners[0], (-1, 2))
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        pad = max(x1 - x0, y1 - y0) * Marker.window_pad
+        pad += self.velocity * Marker.velocity_gain
+        x0, y0 = int(max(x0 - pad, 0)), int(max(y0 - pad, 0))
+        x1, y1 = int(min(x1 + pad, width)), int(min(y1 + pad, height))
+        if x1 <= x0 or y1 <= y0 or (x1 - x0) * (y1 - y0) > width * height / 2:
+            return None
+        return x0, y0, x1, y1
+
+    def search(self, frame, window):
+        """returns (corners, ids) of markers in 'window' of 'frame', or all of it."""
+        height, width = frame.shape[:2]
+        self.searches += 1
+        if window is None:
+            self.full_searches += 1
+            self.searched += 1.0
+            x0, y0 = 0, 0
+        else:
+            x0, y0, x1, y1 = window
+            self.searched += (x1 - x0) * (y1 - y0) / (width * height)
+            frame = frame[y0:y1, x0:x1]
         gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        self.corners, ids, rejectedImgPoints = aruco.detectMarkers(
+        corners, ids, rejectedImgPoints = aruco.detectMarkers(
             gray_frame, self.aruco_dict, parameters=self.parameters
         )
+        if ids is not None and (x0 or y0):
+            corners = [c + np.array([x0, y0], np.float32) for c in corners]
+        return corners, ids
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        window = self.search_window(width, height) if Marker.windowed else None
+        corners, ids = self.search(frame, window)
+        if ids is None and window is not None:
+            # missed in the window, search the whole frame before giving up
+            corners, ids = self.search(frame, None)
+        self.corners = corners
+
+        if ids is not None:
+            center = np.reshape(corners[0], (-1, 2)).mean(axis=0)
+            if self.center is not None:
+                speed = float(np.linalg.norm(center - self.center))
+                self.velocity += 0.5 * (speed - self.velocity)
+            self.center = center
+        else:
+            self.center = None
+            self.velocity = 0.0
+
+        if not self.calibrated:
+            self.mtx, self.dist = Marker.load_calibration(frame.shape[1::-1])
+            self.calibrated = True
         if np.all(ids != None):
-            rvec, tvec, _ = aruco.estimatePoseSingleMarkers(
-                self.corners, 0.05, self.mtx, self.dist
-            )
+            if self.mtx is not None:
+                rvec, tvec, _ = aruco.estimatePoseSingleMarkers(
+                    self.corners, 0.05, self.mtx, self.dist
+                )
         else:
             self.corners = None
 
@@ -130,6 +246,7 @@ class ROI:
 
         self.marker_top = None
         self.glove_hsv = None
+        self.segmenter = ROISegmenter()
 
     def findROI(self, frame, marker):
         rec_coor = marker.corners[0][0]
@@ -273,36 +390,9 @@ class ROI:
         ]
 
     def cropROI(self, frame):
-        pts = np.array(self.roi_corners)
-
-        rect = cv2.boundingRect(pts)
-        x, y, w, h = rect
-        croped = frame[y : y + h, x : x + w].copy()
-
-        pts = pts - pts.min(axis=0)
-
-        mask = np.zeros(croped.shape[:2], np.uint8)
-        cv2.drawContours(mask, [pts], -1, (255, 255, 255), -1, cv2.LINE_AA)
-
-        dst = cv2.bitwise_and(croped, croped, mask=mask)
-
-        bg = np.ones_like(croped, np.uint8) * 255
-        cv2.bitwise_not(bg, bg, mask=mask)
-
-        kernelOpen = np.ones((3, 3), np.uint8)
-        kernelClose = np.ones((5, 5), np.uint8)
-
-        hsv = cv2.cvtColor(dst, cv2.COLOR_BGR2HSV)
-
-        lower_range = np.array([self.hsv_glove[0][0][0] // 1 - 5, 50, 50])
-        upper_range = np.array([self.hsv_glove[0][0][0] // 1 + 5, 255, 255])
-
-        mask = cv2.inRange(hsv, lower_range, upper_range)
-        Opening = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernelOpen)
-        Closing = cv2.morphologyEx(Opening, cv2.MORPH_CLOSE, kernelClose)
-        FinalMask = Closing
-
-        return FinalMask
+        """returns glove mask of the ROI, valid until the next call."""
+        hue = int(self.hsv_glove[0][0][0])
+        return self.segmenter.segment(frame, self.roi_corners, hue)
 
 
 class Glove:
@@ -311,6 +401,7 @@ class Glove:
         self.fingers = 0
         self.arearatio = 0
         self.gesture = 0
+        self.draw = True
 
     def find_fingers(self, FinalMask):
         conts, h = cv2.findContours(FinalMask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
@@ -351,7 +442,8 @@ class Glove:
                     l += 1
 
                 # draw lines around hand
-                cv2.line(FinalMask, start, end, [255, 255, 255], 2)
+                if self.draw:
+                    cv2.line(FinalMask, start, end, [255, 255, 255], 2)
 
             l += 1
         except:
@@ -363,25 +455,25 @@ class Glove:
     def find_gesture(self, frame):
         font = cv2.FONT_HERSHEY_SIMPLEX
         self.gesture = 0
+        label = None
         if self.fingers == 1:
 
             if self.arearatio < 15:
-                cv2.putText(frame, "0", (0, 50), font, 2, (0, 0, 255), 3, cv2.LINE_AA)
+                label = "0"
                 self.gesture = 0
             elif self.arearatio < 25:
-                cv2.putText(
-                    frame, "2 fingers", (0, 50), font, 2, (0, 0, 255), 3, cv2.LINE_AA
-                )
+                label = "2 fingers"
                 self.gesture = 2
             else:
-                cv2.putText(
-                    frame, "1 finger", (0, 50), font, 2, (0, 0, 255), 3, cv2.LINE_AA
-                )
+                label = "1 finger"
                 self.gesture = 1
 
         elif self.fingers == 2:
-            cv2.putText(frame, "2", (0, 50), font, 2, (0, 0, 255), 3, cv2.LINE_AA)
+            label = "2"
             self.gesture = 3
+
+        if label and self.draw:
+            cv2.putText(frame, label, (0, 50), font, 2, (0, 0, 255), 3, cv2.LINE_AA)
         """
         elif self.fingers==3:
             #cv2.putText(frame,'3',(0,50), font, 2, (0,0,255), 3, cv2.LINE_AA)
@@ -404,6 +496,7 @@ class Tracker:
         self.start_time = 0.0
         self.now_time = 0.0
         self.tracker_bbox = None
+        self.draw = True
 
     def corners_to_tracker(self, corners):
         csrt_minX = int(
@@ -496,40 +589,43 @@ class Tracker:
 
         if self.now_time - self.start_time >= 2.0:
 
-            cv2.putText(
-                frame,
-                "Posture your hand correctly",
-                (10, 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.75,
-                (0, 0, 255),
-                1,
-                cv2.LINE_AA,
-            )
+            if self.draw:
+                cv2.putText(
+                    frame,
+                    "Posture your hand correctly",
+                    (10, 10),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.75,
+                    (0, 0, 255),
+                    1,
+                    cv2.LINE_AA,
+                )
             self.tracker_started = False
             self.tracker_bbox = None
             return
 
         if ok:
 
-            p1 = (int(self.tracker_bbox[0]), int(self.tracker_bbox[1]))
-            p2 = (
-                int(self.tracker_bbox[0] + self.tracker_bbox[2]),
-                int(self.tracker_bbox[1] + self.tracker_bbox[3]),
-            )
-            cv2.rectangle(frame, p1, p2, (80, 255, 255), 2, 1)
+            if self.draw:
+                p1 = (int(self.tracker_bbox[0]), int(self.tracker_bbox[1]))
+                p2 = (
+                    int(self.tracker_bbox[0] + self.tracker_bbox[2]),
+                    int(self.tracker_bbox[1] + self.tracker_bbox[3]),
+                )
+                cv2.rectangle(frame, p1, p2, (80, 255, 255), 2, 1)
         else:
 
             self.tracker_started = False
-            cv2.putText(
-                frame,
-                "Tracking failure detected",
-                (100, 80),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.75,
-                (0, 0, 255),
-                2,
-            )
+            if self.draw:
+                cv2.putText(
+                    frame,
+                    "Tracking failure detected",
+                    (100, 80),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.75,
+                    (0, 0, 255),
+                    2,
+                )
             print("Tracking failure detected")
 
 
@@ -539,12 +635,16 @@ class Mouse:
         self.ty_old = 0
         self.trial = True
         self.flag = 0
+        self.cursor = None
 
     def move_mouse(self, frame, position, gesture):
 
-        (sx, sy) = pyautogui.size()
+        (sx, sy) = input_backend.get_backend().size()
         (camx, camy) = (frame.shape[:2][0], frame.shape[:2][1])
-        (mx_old, my_old) = pyautogui.position()
+        if self.cursor is not None and self.cursor.target is not None:
+            (mx_old, my_old) = self.cursor.target
+        else:
+            (mx_old, my_old) = input_backend.get_backend().position()
 
         Damping = 2
         tx = position[0]
@@ -560,33 +660,62 @@ class Mouse:
             self.flag = 0
             mx = mx_old + (delta_tx * sx) // (camx * Damping)
             my = my_old + (delta_ty * sy) // (camy * Damping)
-            pyautogui.moveTo(mx, my, duration=0.1)
+            if self.cursor is None:
+                self.cursor = CursorActuator()
+                self.cursor.start()
+            self.cursor.move_to(mx, my)
 
         elif gesture == 0:
             if self.flag == 0:
-                pyautogui.doubleClick()
+                input_backend.get_backend().double_click()
                 self.flag = 1
         elif gesture == 1:
             print("1 Finger Open")
 
 
+def draw_frame(frame, corners, roi_corners, hsv_corners, final_mask):
+    """draws marker and boxes on 'frame', returns (window name, image) to show."""
+    windows = []
+    if corners:
+        aruco.drawDetectedMarkers(frame, corners)
+        draw_box(frame, roi_corners, (255, 0, 0))
+        draw_box(frame, hsv_corners, (0, 0, 250))
+        windows.append(("FinalMask", final_mask))
+    windows.append(("frame", frame))
+    return windows
+
+
 class GestureController:
     gc_mode = 0
-    pyautogui.FAILSAFE = False
-    f_start_time = 0
-    f_now_time = 0
+    # paces the loop at 30 frames/s without spinning for the whole wait
+    frame_scheduler = FrameScheduler(30.0)
+    # 'window', 'preview' (at most 'preview_rate' frames/s) or 'headless'
+    render_mode = "window"
+    preview_rate = 10.0
 
     cam_width = 0
     cam_height = 0
 
-    aru_marker = Marker()
+    # created on first 'start', calibrates on its first detection
+    aru_marker = None
+    # tracker following the marker between full detections every
+    # 'detect_every' frames, a key of 'marker_tracking.TRACKERS', or None
+    # to detect on every frame with a CSRT fallback
+    tracker_kind = "lk"
+    detect_every = 5
+    marker_tracker = None
     hand_roi = ROI(2.5, 2.5, 6, 0.45, 0.6, 0.4)
     glove = Glove()
     csrt_track = Tracker()
     mouse = Mouse()
 
-    def __init__(self):
-        GestureController.cap = cv2.VideoCapture(0)
+    def __init__(self, cap=None):
+        # 'cap' is any 'cv2.VideoCapture'-like capture, e.g. a shared
+        # 'camera_broker.BrokerCapture', camera 0 is opened with its
+        # 'camera_tuner' profile if None
+        GestureController.cap = (
+            cap if cap is not None else camera_tuner.open_capture(0)
+        )
         if GestureController.cap.isOpened():
             GestureController.cam_width = int(
                 GestureController.cap.get(cv2.CAP_PROP_FRAME_WIDTH)
@@ -598,29 +727,47 @@ class GestureController:
             print("CANNOT OPEN CAMERA")
 
         GestureController.gc_mode = 1
-        GestureController.f_start_time = time.time()
-        GestureController.f_now_time = time.time()
+
+    def detect_marker(frame):
+        """runs full marker detection on 'frame', returns the marker corners."""
+        GestureController.aru_marker.detect(frame)
+        return GestureController.aru_marker.corners
 
     def start(self):
+        if GestureController.aru_marker is None:
+            GestureController.aru_marker = Marker()
+        if GestureController.tracker_kind:
+            GestureController.marker_tracker = MarkerTracker(
+                GestureController.detect_marker,
+                GestureController.tracker_kind,
+                GestureController.detect_every,
+            )
+        draw = GestureController.render_mode != "headless"
+        GestureController.glove.draw = draw
+        GestureController.csrt_track.draw = draw
+        renderer = preview.make_renderer(
+            GestureController.render_mode,
+            GestureController.preview_rate,
+            stop_keys=(ord("q"),),
+        )
+        GestureController.frame_scheduler.reset()
         while True:
             # mode checking
             if not GestureController.gc_mode:
                 print("Exiting Gesture Controller")
                 break
             # fps control
-            fps = 30.0
-            GestureController.f_start_time = time.time()
-            while (
-                GestureController.f_now_time - GestureController.f_start_time
-                <= 1.0 / fps
-            ):
-                GestureController.f_now_time = time.time()
+            GestureController.frame_scheduler.wait()
 
             ret, frame = GestureController.cap.read()
             frame = cv2.flip(frame, 1)
+            FinalMask = None
 
-            GestureController.aru_marker.detect(frame)
-            if GestureController.aru_marker.is_detected():
+            if GestureController.marker_tracker:
+                GestureController.aru_marker.corners = (
+                    GestureController.marker_tracker.update(frame)
+                )
+            elif GestureController.detect_marker(frame):
                 GestureController.csrt_track.corners_to_tracker(
                     GestureController.aru_marker.corners
                 )
@@ -650,16 +797,37 @@ class GestureController:
                 )
 
             # draw call
-            if GestureController.aru_marker.is_detected():
-                GestureController.aru_marker.draw_marker(frame)
-                draw_box(frame, GestureController.hand_roi.roi_corners, (255, 0, 0))
-                draw_box(frame, GestureController.hand_roi.hsv_corners, (0, 0, 250))
-                cv2.imshow("FinalMask", FinalMask)
+            if not draw:
+                continue
+            corners = GestureController.aru_marker.corners
+            if not GestureController.aru_marker.is_detected():
+                corners = None
+            roi_corners = GestureController.hand_roi.roi_corners
+            hsv_corners = GestureController.hand_roi.hsv_corners
+            if renderer is not None:
+                if renderer.due():
+                    # the segmenter reuses the mask's buffer on the next frame
+                    if FinalMask is not None:
+                        FinalMask = FinalMask.copy()
+                    args = (frame, corners, roi_corners, hsv_corners, FinalMask)
+                    renderer.submit(lambda args=args: draw_frame(*args))
+                if renderer.stop_requested:
+                    break
+                continue
 
             # display frame
-            cv2.imshow("frame", frame)
+            for name, image in draw_frame(
+                frame, corners, roi_corners, hsv_corners, FinalMask
+            ):
+                cv2.imshow(name, image)
             if cv2.waitKey(1) & 0xFF == ord("q"):
                 break
 
+        if renderer is not None:
+            renderer.stop()
+        if GestureController.marker_tracker:
+            print("Marker tracker:", GestureController.marker_tracker.report())
+        print("ROI segmenter:", GestureController.hand_roi.segmenter.report())
         GestureController.cap.release()
-        cv2.destroyAllWindows()
\ No newline at end of file
+        if GestureController.render_mode == "window":
+            preview.destroy_windows(["frame", "FinalMask"])
\ No newline at end of file
@@ -4,8 +4,7 @@ from datetime import date
 import time
 import webbrowser
 import datetime
-from pynput.keyboard import Key, Controller
-import pyautogui
+import input_backend
 import sys
 import os
 from os import listdir
@@ -14,14 +13,41 @@ import smtplib
 import wikipedia
 import Gesture_Controller
 import eye_control
-import app
+import camera_broker
+import detector_pool
+import metrics
 from threading import Thread
 
 today = date.today()
 r = sr.Recognizer()
-keyboard = Controller()
-engine = pyttsx3.init("sapi5")
-engine.setProperty("voice", engine.getProperty("voices")[0].id)
+
+# created by 'setup', in the main process only: spawned detector workers
+# import this module as '__mp_main__' and must not open the camera,
+# microphone or UI again
+app = None
+engine = None
+camera = None
+detectors = None
+
+# speech recognition and synthesis latency, served with the controllers'
+# metrics on 'metrics.METRICS_PORT'
+asr_latency = metrics.REGISTRY.histogram(
+    "phoenix_stage_seconds",
+    "latency of a processing stage",
+    controller="voice",
+    stage="asr",
+)
+tts_latency = metrics.REGISTRY.histogram(
+    "phoenix_stage_seconds",
+    "latency of a processing stage",
+    controller="voice",
+    stage="tts",
+)
+
+# wheel notches of "scroll up" / "scroll down", the distance
+# 'pyautogui.scroll(10)' scrolled: 10 notches on X11, on Windows 10 wheel
+# units, less than the one notch of 120 units that moves most applications
+SCROLL_NOTCHES = 1 if sys.platform == "win32" else 10
 
 file_exp_status = False
 files = []
@@ -36,8 +62,9 @@ def reply(message):
 def reply(audio):
     app.ChatBot.addAppMsg(audio)
     print(audio)
-    engine.say(audio)
-    engine.runAndWait()
+    with tts_latency.time():
+        engine.say(audio)
+        engine.runAndWait()
 
 
 def wish():
@@ -53,9 +80,24 @@ def wish():
     reply("I am Phoenix, How May I Help You?")
 
 
-with sr.Microphone() as source:
-    r.energy_threshold = 500
-    r.dynamic_energy_threshold = False
+def setup():
+    """
+    initialises the UI, text to speech and the microphone, and opens the
+    camera shared by gesture and eye control with their models, loaded
+    and warmed up once at startup.
+    """
+    global app, engine, camera, detectors
+    import app
+
+    engine = pyttsx3.init("sapi5")
+    engine.setProperty("voice", engine.getProperty("voices")[0].id)
+
+    with sr.Microphone() as source:
+        r.energy_threshold = 500
+        r.dynamic_energy_threshold = False
+
+    camera = camera_broker.CameraBroker(camera_broker.CameraSource(0))
+    detectors = detector_pool.DetectorPool(camera, workers=True)
 
 
 def record_audio():
@@ -65,10 +107,17 @@ def record_audio():
         audio = r.listen(source, phrase_time_limit=5)
 
         try:
-            voice_data = r.recognize_google(audio)
+            with asr_latency.time():
+                voice_data = r.recognize_google(audio)
         except sr.RequestError:
+            metrics.REGISTRY.counter(
+                "phoenix_asr_errors_total", "failed recognitions", reason="service"
+            ).inc()
             reply("Sorry My Service Is Down. Please Check Your Internet Connection.")
         except sr.UnknownValueError:
+            metrics.REGISTRY.counter(
+                "phoenix_asr_errors_total", "failed recognitions", reason="unknown"
+            ).inc()
             print("Cannot Recognize.")
             pass
         return voice_data.lower()
@@ -127,13 +176,15 @@ def respond(voice_data):
         if Gesture_Controller.GestureController.gc_mode:
             Gesture_Controller.GestureController.gc_mode = 0
         app.ChatBot.close()
+        detectors.close()
         sys.exit()
 
     elif "start gesture control" in voice_data:
         if Gesture_Controller.GestureController.gc_mode:
             reply("Gesture Control Mode Is Actived.")
         else:
-            gc = Gesture_Controller.GestureController()
+            detectors.activate("hands")
+            gc = Gesture_Controller.GestureController(detectors.capture())
             t = Thread(target=gc.start)
             t.start()
             reply("Launched Successfully.")
@@ -149,7 +200,8 @@ def respond(voice_data):
         if eye_control.EyeController.gc_mode:
             reply("Eye Control Mode Is Actived.")
         else:
-            gc = eye_control.EyeController()
+            detectors.activate("face_mesh")
+            gc = eye_control.EyeController(detectors.capture())
             t = Thread(target=gc.start)
             t.start()
             reply("Launched Successfully.")
@@ -162,15 +214,11 @@ def respond(voice_data):
             reply("Eye Control Mode Is Already Deactivated.")
 
     elif "copy" in voice_data:
-        with keyboard.pressed(Key.ctrl):
-            keyboard.press("c")
-            keyboard.release("c")
+        input_backend.get_backend().hotkey("ctrl", "c")
         reply("Copied.")
 
     elif "paste" in voice_data:
-        with keyboard.pressed(Key.ctrl):
-            keyboard.press("v")
-            keyboard.release("v")
+        input_backend.get_backend().hotkey("ctrl", "v")
         reply("Pasted.")
 
     elif "list" in voice_data:
@@ -194,13 +242,13 @@ def respond(voice_data):
             reply(f"Failed to open {app_name}. Please check the name or file.")
 
     elif "window maximise" in voice_data:
-        pyautogui.hotkey("alt", "space")
-        pyautogui.press("x")
+        input_backend.get_backend().hotkey("alt", "space")
+        input_backend.get_backend().press("x")
         reply("Window maximized.")
 
     elif "window minimise" in voice_data:
-        pyautogui.hotkey("alt", "space")
-        pyautogui.press("n")
+        input_backend.get_backend().hotkey("alt", "space")
+        input_backend.get_backend().press("n")
         reply("Window minimized.")
 
     elif "voice typing" in voice_data:
@@ -211,35 +259,33 @@ def respond(voice_data):
             reply("Voice typing mode off.")
 
     elif "insert tab" in voice_data:
-        keyboard.press(Key.tab)
-        keyboard.release(Key.tab)
+        input_backend.get_backend().press("tab")
         reply("Tab inserted.")
 
     elif "insert whitespace" in voice_data:
-        keyboard.press(Key.space)
-        keyboard.release(Key.space)
+        input_backend.get_backend().press("space")
         reply("Whitespace inserted.")
 
     elif "clear" in voice_data:
-        pyautogui.hotkey("ctrl", "a")
-        pyautogui.press("delete")
+        input_backend.get_backend().hotkey("ctrl", "a")
+        input_backend.get_backend().press("delete")
         reply("Cleared.")
 
     elif "cut" in voice_data:
-        pyautogui.hotkey("ctrl", "x")
+        input_backend.get_backend().hotkey("ctrl", "x")
         reply("Cut.")
 
     elif "backspace" in voice_data:
-        pyautogui.press("backspace")
+        input_backend.get_backend().press("backspace")
         reply("Backspace pressed.")
 
     elif "press" in voice_data:
         key_name = voice_data.replace("press", "").strip()
-        pyautogui.press(key_name)
+        input_backend.get_backend().press(key_name)
         reply(f"Pressed {key_name}.")
 
     elif "start" in voice_data:
-        pyautogui.press("win")
+        input_backend.get_backend().press("win")
         reply("Start menu opened.")
 
     elif "recycle bin" in voice_data:
@@ -247,15 +293,15 @@ def respond(voice_data):
         reply("Recycle bin opened.")
 
     elif "show desktop" in voice_data:
-        pyautogui.hotkey("win", "d")
+        input_backend.get_backend().hotkey("win", "d")
         reply("Desktop shown.")
 
     elif "scroll up" in voice_data:
-        pyautogui.scroll(10)
+        input_backend.get_backend().scroll(SCROLL_NOTCHES)
         reply("Scrolled up.")
 
     elif "scroll down" in voice_data:
-        pyautogui.scroll(-10)
+        input_backend.get_backend().scroll(-SCROLL_NOTCHES)
         reply("Scrolled down.")
 
     elif file_exp_status:
@@ -297,26 +343,36 @@ def respond(voice_data):
         reply("I Am Not Functioned To Do This!")
 
 
-t1 = Thread(target=app.ChatBot.start)
-t1.start()
+if __name__ == "__main__":
+    setup()
 
-while not app.ChatBot.started:
-    time.sleep(0.5)
+    # controllers use the pool's prewarmed models, run in worker processes
+    # so they do not share the GIL with speech recognition, TTS and the UI
+    Gesture_Controller.GestureController.detector_pool = detectors
+    eye_control.EyeController.detector_pool = detectors
+    detectors.start()
+    metrics.serve()
 
-wish()
-voice_data = None
-while True:
-    if app.ChatBot.isUserInput():
-        voice_data = app.ChatBot.popUserInput()
-    else:
-        voice_data = record_audio()
+    t1 = Thread(target=app.ChatBot.start)
+    t1.start()
 
-    if "phoenix" in voice_data:
-        try:
-            respond(voice_data)
-        except SystemExit:
-            reply("Exit Successful.")
-            break
-        except Exception as e:
-            print(f"EXCEPTION: {e}")
-            break
\ No newline at end of file
+    while not app.ChatBot.started:
+        time.sleep(0.5)
+
+    wish()
+    voice_data = None
+    while True:
+        if app.ChatBot.isUserInput():
+            voice_data = app.ChatBot.popUserInput()
+        else:
+            voice_data = record_audio()
+
+        if "phoenix" in voice_data:
+            try:
+                respond(voice_data)
+            except SystemExit:
+                reply("Exit Successful.")
+                break
+            except Exception as e:
+                print(f"EXCEPTION: {e}")
+                break
@@ -0,0 +1,221 @@
+import time
+import cv2
+import numpy as np
+import mediapipe as mp
+
+
+class AdaptiveInference:
+    """
+    Runs 'mp_hands.Hands.process' on a downscaled frame, or on a crop around
+    the last known hands once they are tracked, and adapts resolution and
+    crop margin to keep frame latency under a budget.
+
+    Landmarks of a crop are mapped back to normalized coordinates of the
+    full frame, so callers see the same results as with the full frame.
+
+    The tracking graph passed to 'process' only ever sees full frames, as
+    it reuses the hand regions of the previous frame in image coordinates.
+    Crops, whose size and offset change every frame, go to 'crop_model',
+    a separate static image graph.
+
+    On CPU the landmark model dominates the cost of a frame whatever the
+    input size, 'benchmark_adaptive.py' found crops no faster than the
+    tracking graph on full frames, so 'use_roi' is off by default. Measure
+    on the target machine before enabling it.
+
+    A hand entering the view outside the crop would not be found, so the
+    full frame is searched again every 'search_every' frames while fewer
+    than 'max_hands' hands are tracked, and every 'full_every' frames
+    otherwise.
+
+    Attributes
+    ----------
+    budget : float
+        target end-to-end frame latency in seconds.
+    level : int
+        index into 'SCALES' used for full-frame detection.
+    margin : float
+        crop padding around the hand box, fraction of box size.
+    bbox : tuple
+        normalized (x0, y0, x1, y1) box around the hands of last frame,
+        None if no hand is tracked.
+    hands : int
+        no. of hands found in the last frame.
+    latency : float
+        smoothed end-to-end frame latency in seconds.
+    crop_model : Object
+        static image hand graph for crops, created on the first crop if
+        not given.
+    events : list
+        (time, 'degrade' or 'restore', level, margin, latency) per change.
+    """
+
+    SCALES = (1.0, 0.75, 0.5, 0.375)
+
+    def __init__(
+        self,
+        budget_ms=25.0,
+        margin=0.5,
+        min_margin=0.15,
+        use_roi=False,
+        cooldown=15,
+        smoothing=0.2,
+        max_hands=2,
+        search_every=5,
+        full_every=30,
+        crop_model=None,
+        model_complexity=1,
+    ):
+        self.budget = budget_ms / 1000.0
+        self.max_margin = margin
+        self.min_margin = min_margin
+        self.use_roi = use_roi
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.max_hands = max_hands
+        self.search_every = search_every
+        self.full_every = full_every
+        self.crop_model = crop_model
+        self.model_complexity = model_complexity
+        self.level = 0
+        self.margin = margin
+        self.bbox = None
+        self.hands = 0
+        self.since_full = 0
+        self.latency = None
+        self.frames_since_change = 0
+        self.events = []
+        self.roi_frames = 0
+        self.full_frames = 0
+
+    def crop_box(self, width, height):
+        """returns pixel (x0, y0, x1, y1) of 'bbox' padded by 'margin'."""
+        x0, y0, x1, y1 = self.bbox
+        pad_x = (x1 - x0) * self.margin
+        pad_y = (y1 - y0) * self.margin
+        return (
+            max(int((x0 - pad_x) * width), 0),
+            max(int((y0 - pad_y) * height), 0),
+            min(int((x1 + pad_x) * width), width),
+            min(int((y1 + pad_y) * height), height),
+        )
+
+    def process(self, hands, image):
+        """returns results of tracking graph 'hands' for RGB 'image'."""
+        height, width = image.shape[:2]
+        scale = AdaptiveInference.SCALES[self.level]
+
+        full_every = self.full_every
+        if self.hands < self.max_hands:
+            full_every = self.search_every
+        box = None
+        if self.use_roi and self.bbox is not None and self.since_full < full_every:
+            box = self.crop_box(width, height)
+            if box[2] - box[0] < 16 or box[3] - box[1] < 16:
+                box = None
+
+        if box is not None:
+            x0, y0, x1, y1 = box
+            crop = image[y0:y1, x0:x1]
+            if scale < 1.0:
+                size = (
+                    max(int((x1 - x0) * scale), 1),
+                    max(int((y1 - y0) * scale), 1),
+                )
+                crop = cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+            if self.crop_model is None:
+                self.crop_model = mp.solutions.hands.Hands(
+                    static_image_mode=True,
+                    max_num_hands=self.max_hands,
+                    model_complexity=self.model_complexity,
+                )
+            results = self.crop_model.process(np.ascontiguousarray(crop))
+            self.roi_frames += 1
+            self.since_full += 1
+            for hand in results.multi_hand_landmarks or []:
+                for lm in hand.landmark:
+                    lm.x = (x0 + lm.x * (x1 - x0)) / width
+                    lm.y = (y0 + lm.y * (y1 - y0)) / height
+                    # z is relative to the crop width like x
+                    lm.z = lm.z * (x1 - x0) / width
+        else:
+            if scale < 1.0:
+                size = (int(width * scale), int(height * scale))
+                image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            results = hands.process(image)
+            self.full_frames += 1
+            self.since_full = 0
+
+        self.bbox = None
+        self.hands = len(results.multi_hand_landmarks or [])
+        if results.multi_hand_landmarks:
+            points = np.array(
+                [
+                    (lm.x, lm.y)
+                    for hand in results.multi_hand_landmarks
+                    for lm in hand.landmark
+                ]
+            )
+            self.bbox = (*points.min(axis=0), *points.max(axis=0))
+        return results
+
+    def observe(self, latency):
+        """
+        reports end-to-end 'latency' (seconds) of last frame, lowers quality
+        when over budget and raises it again when well under budget.
+        """
+        if self.latency is None:
+            self.latency = latency
+        self.latency += self.smoothing * (latency - self.latency)
+        self.frames_since_change += 1
+        if self.frames_since_change < self.cooldown:
+            return
+
+        if self.latency > self.budget:
+            if self.use_roi and self.margin > self.min_margin:
+                self.margin = max(self.margin * 0.7, self.min_margin)
+            elif self.level < len(AdaptiveInference.SCALES) - 1:
+                self.level += 1
+            else:
+                return
+            self.record("degrade")
+        elif self.latency < 0.6 * self.budget:
+            if self.level > 0:
+                self.level -= 1
+            elif self.margin < self.max_margin:
+                self.margin = min(self.margin / 0.7, self.max_margin)
+            else:
+                return
+            self.record("restore")
+
+    def record(self, event):
+        self.frames_since_change = 0
+        self.events.append(
+            (time.time(), event, self.level, round(self.margin, 3), self.latency)
+        )
+        print(
+            "Adaptive inference %s: scale %.3f, margin %.2f, latency %.1f ms"
+            % (
+                event,
+                AdaptiveInference.SCALES[self.level],
+                self.margin,
+                self.latency * 1000,
+            )
+        )
+
+    def report(self):
+        """returns dict summarizing frames per mode and quality changes."""
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "scale": AdaptiveInference.SCALES[self.level],
+            "margin": round(self.margin, 3),
+            "latency_ms": round((self.latency or 0.0) * 1000, 1),
+            "degradations": sum(1 for e in self.events if e[1] == "degrade"),
+            "restorations": sum(1 for e in self.events if e[1] == "restore"),
+        }
+
+    def close(self):
+        if self.crop_model is not None:
+            self.crop_model.close()
+            self.crop_model = None
@@ -0,0 +1,104 @@
+import argparse
+import json
+import platform
+import time
+import cv2
+import numpy as np
+import camera_broker
+import detector_pool
+
+
+def make_source(args):
+    if args.camera is not None:
+        return camera_broker.CameraSource(args.camera)
+    width, height = (int(v) for v in args.size.split("x"))
+    return camera_broker.SyntheticSource(width, height)
+
+
+def cold_activation(kind, args):
+    """
+    returns seconds from activation to first processed frame when camera
+    and model are created on every activation, as before the pool.
+    """
+    start = time.perf_counter()
+    broker = camera_broker.CameraBroker(make_source(args))
+    cap = camera_broker.BrokerCapture(broker)
+    model = detector_pool.load_model(kind, detector_pool.MODELS[kind], args.workers)
+    _, frame = cap.read()
+    model.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    seconds = time.perf_counter() - start
+    model.close()
+    cap.release()
+    return seconds
+
+
+def warm_activation(pool, kind):
+    """returns seconds from activation to first processed frame of 'pool'."""
+    pool.activate(kind)
+    start = time.perf_counter()
+    cap = pool.capture()
+    model = pool.get(kind)
+    _, frame = cap.read()
+    model.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    seconds = time.perf_counter() - start
+    cap.release()
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cold vs. prewarmed activation time of the vision controllers."
+    )
+    parser.add_argument("--camera", type=int, help="camera index, default synthetic")
+    parser.add_argument("--size", default="640x480", help="synthetic frame size")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--workers", action="store_true", help="out-of-process")
+    parser.add_argument("--output", default="benchmark_activation.json")
+    args = parser.parse_args()
+
+    report = {}
+    for kind in detector_pool.MODELS:
+        cold = [cold_activation(kind, args) for _ in range(args.cycles)]
+        pool = detector_pool.DetectorPool(
+            camera_broker.CameraBroker(make_source(args)), (kind,), args.workers
+        )
+        pool.warm_up()
+        warm = [warm_activation(pool, kind) for _ in range(args.cycles)]
+        pool.close()
+        report[kind] = {
+            "cold_ms": round(float(np.mean(cold)) * 1000, 1),
+            "warm_ms": round(float(np.mean(warm)) * 1000, 1),
+            "warm_max_ms": round(float(np.max(warm)) * 1000, 1),
+            "warmup_ms": round(pool.warmup_time * 1000, 1),
+        }
+        print(
+            "%-10s cold %8.1f ms  warm %6.1f ms (max %6.1f ms)  pool warm-up %8.1f ms"
+            % (
+                kind,
+                report[kind]["cold_ms"],
+                report[kind]["warm_ms"],
+                report[kind]["warm_max_ms"],
+                report[kind]["warmup_ms"],
+            )
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "source": "camera:%d" % args.camera
+                if args.camera is not None
+                else "synthetic:" + args.size,
+                "workers": args.workers,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "kinds": report,
+            },
+            f,
+            indent=2,
+        )
+    print("Saved results to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import json
+import platform
+import time
+import cv2
+import numpy as np
+import mediapipe as mp
+from adaptive_inference import AdaptiveInference
+from benchmark_gesture import video_frames
+
+SKIN = np.array((110, 150, 210))
+
+
+def draw_hand(image, cx, cy, scale):
+    """draws an open, flat shaded hand, palm at ('cx', 'cy'), on 'image'."""
+    palm = np.array([[-60, -70], [60, -70], [70, 40], [40, 90], [-40, 90], [-70, 30]])
+    palm = (palm * scale + (cx, cy)).astype(np.int32)
+    cv2.fillPoly(image, [palm], SKIN.tolist(), cv2.LINE_AA)
+    wrist = (int(cx - 38 * scale), int(cy + 80 * scale))
+    arm = (int(cx + 38 * scale), image.shape[0])
+    cv2.rectangle(image, wrist, arm, SKIN.tolist(), -1)
+    width = 22 * scale
+    for dx, dy, angle, length in (
+        (-45, -70, -12, 150),
+        (-15, -75, -3, 175),
+        (15, -75, 4, 165),
+        (45, -68, 12, 125),
+    ):
+        x0, y0 = cx + dx * scale, cy + dy * scale
+        step = np.array([np.sin(np.deg2rad(angle)), -np.cos(np.deg2rad(angle))])
+        step *= length * scale / 3
+        for phalanx in range(3):
+            x1, y1 = x0 + step[0], y0 + step[1]
+            color = (SKIN * (0.97 - 0.03 * phalanx)).tolist()
+            thickness = int(width * (1 - 0.08 * phalanx))
+            cv2.line(image, (int(x0), int(y0)), (int(x1), int(y1)), color, thickness)
+            crease = ((int(x1 - width / 3), int(y1)), (int(x1 + width / 3), int(y1)))
+            cv2.line(image, *crease, (SKIN * 0.8).tolist(), 1)
+            x0, y0 = x1, y1
+        tip = (int(x0), int(y0))
+        cv2.circle(image, tip, int(width * 0.45), (SKIN * 0.9).tolist(), -1)
+    x0, y0 = cx - 65 * scale, cy + 30 * scale
+    for dx, dy in ((-40, -30), (-35, -35), (-20, -35)):
+        x1, y1 = x0 + dx * scale, y0 + dy * scale
+        start, end = (int(x0), int(y0)), (int(x1), int(y1))
+        cv2.line(image, start, end, SKIN.tolist(), int(width * 1.1))
+        x0, y0 = x1, y1
+    return image
+
+
+def hand_frames(width, height, limit, seed=0):
+    """yields 'limit' BGR frames of a synthetic hand moving side to side."""
+    rng = np.random.default_rng(seed)
+    noise = [rng.normal(0, 6, (height, width, 3)) for _ in range(4)]
+    for idx in range(limit):
+        image = np.full((height, width, 3), 200, np.uint8)
+        cx = width / 2 + width / 6 * np.sin(idx / 20)
+        draw_hand(image, cx, height * 0.6, 0.8 * height / 480)
+        yield np.clip(image + noise[idx % len(noise)], 0, 255).astype(np.uint8)
+
+
+def measure(frames, process):
+    """returns dict of latency (ms) and hit rate of 'process' on RGB 'frames'."""
+    samples, found = [], 0
+    for image in frames:
+        start = time.perf_counter()
+        results = process(image)
+        samples.append(time.perf_counter() - start)
+        found += bool(results.multi_hand_landmarks)
+    # the first frames include graph start up
+    ms = np.array(samples[10:]) * 1000.0
+    p50, p95 = np.percentile(ms, [50, 95])
+    return {
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "found": round(found / len(frames), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Latency of full-frame hand tracking versus adaptive ROI crops."
+    )
+    parser.add_argument("--video", help="recorded video file, default synthetic")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", default="640x480", help="synthetic frame size")
+    parser.add_argument("--complexity", type=int, default=1, help="model complexity")
+    parser.add_argument("--output", default="benchmark_adaptive.json")
+    args = parser.parse_args()
+
+    if args.video:
+        frames = video_frames(args.video, args.frames)
+    else:
+        width, height = (int(v) for v in args.size.split("x"))
+        frames = hand_frames(width, height, args.frames)
+    frames = [cv2.cvtColor(image, cv2.COLOR_BGR2RGB) for image in frames]
+
+    options = {"max_num_hands": 2, "model_complexity": args.complexity}
+    results = {}
+    with mp.solutions.hands.Hands(**options) as hands:
+        results["full"] = measure(frames, hands.process)
+    for name, use_roi in (("adaptive", False), ("adaptive_roi", True)):
+        adaptive = AdaptiveInference(use_roi=use_roi, model_complexity=args.complexity)
+        with mp.solutions.hands.Hands(**options) as hands:
+
+            def process(image):
+                start = time.perf_counter()
+                results = adaptive.process(hands, image)
+                adaptive.observe(time.perf_counter() - start)
+                return results
+
+            results[name] = measure(frames, process)
+            results[name]["report"] = adaptive.report()
+        adaptive.close()
+
+    for name, stats in results.items():
+        print(
+            "%-13s mean=%7.3fms p50=%7.3fms p95=%7.3fms hands found in %5.1f%%"
+            % (
+                name,
+                stats["mean_ms"],
+                stats["p50_ms"],
+                stats["p95_ms"],
+                stats["found"] * 100,
+            )
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "source": args.video or "synthetic:" + args.size,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                **results,
+            },
+            f,
+            indent=2,
+        )
+    print("Saved results to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import numpy as np
+import cursor_filter
+
+
+def trajectories(path, screen=(1920, 1080), point=9):
+    """
+    returns list of (timestamps, positions) of landmark 'point' of the first
+    hand in session 'path', split where the hand is lost, positions scaled
+    to 'screen' pixels.
+    """
+    data = np.load(path)
+    visible = data["hand_count"] > 0
+    xy = data["landmarks"][:, 0, point, :2] * np.array(screen, np.float32)
+    segments, start = [], None
+    for idx, seen in enumerate(list(visible) + [False]):
+        if seen and start is None:
+            start = idx
+        elif not seen and start is not None:
+            if idx - start > 2:
+                segments.append((data["timestamps"][start:idx], xy[start:idx]))
+            start = None
+    return segments
+
+
+def reference(times, raw, window=0.15):
+    """returns zero-phase centered moving average of 'raw' over 'window' seconds."""
+    ref = np.empty_like(raw)
+    for idx, t in enumerate(times):
+        mask = np.abs(times - t) <= window / 2
+        ref[idx] = raw[mask].mean(axis=0)
+    return ref
+
+
+def evaluate(profile, segments, max_shift=20):
+    """
+    returns jitter (px), lag (ms) and error (px) of 'profile' on 'segments'.
+
+    jitter : RMS second difference of filtered positions.
+    lag : time shift that best aligns filtered positions with the
+        zero-phase reference.
+    error : RMS distance to the reference after removing that shift.
+    """
+    second_diffs, shifts, errors, frame_times = [], [], [], []
+    for times, raw in segments:
+        filt, _ = cursor_filter.make_filter(profile)
+        out = np.array([filt.filter(x, y, t) for t, (x, y) in zip(times, raw)])
+        ref = reference(times, raw)
+        second_diffs.append(np.diff(out, n=2, axis=0))
+        frame_times.append(np.diff(times))
+
+        costs = [
+            np.mean(np.sum((out[shift:] - ref[: len(ref) - shift]) ** 2, axis=1))
+            for shift in range(min(max_shift, len(out) - 1))
+        ]
+        best = int(np.argmin(costs))
+        shifts.append(best)
+        errors.append(costs[best])
+
+    frame_time = np.median(np.concatenate(frame_times))
+    jitter = np.sqrt(np.mean(np.sum(np.concatenate(second_diffs) ** 2, axis=1)))
+    return {
+        "jitter_px": float(jitter),
+        "lag_ms": float(np.mean(shifts) * frame_time * 1000.0),
+        "error_px": float(np.sqrt(np.mean(errors))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare cursor filter profiles for jitter and lag."
+    )
+    parser.add_argument("sessions", nargs="+", help="landmark sessions (.npz)")
+    parser.add_argument("--profiles", nargs="*", default=list(cursor_filter.PROFILES))
+    parser.add_argument("--output", default="benchmark_filters.json")
+    args = parser.parse_args()
+
+    segments = []
+    for path in args.sessions:
+        segments.extend(trajectories(path))
+    if not segments:
+        print("No hand trajectories found in sessions.")
+        return
+
+    results = {}
+    for profile in args.profiles:
+        results[profile] = evaluate(profile, segments)
+        print(
+            "%-10s jitter=%7.3fpx lag=%7.1fms error=%7.2fpx"
+            % (
+                profile,
+                results[profile]["jitter_px"],
+                results[profile]["lag_ms"],
+                results[profile]["error_px"],
+            )
+        )
+    with open(args.output, "w") as f:
+        json.dump({"sessions": args.sessions, "profiles": results}, f, indent=2)
+    print("Saved results to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import json
+import platform
+import time
+import cv2
+import threading
+import numpy as np
+import hand_backends
+from frame_prep import FramePrep
+from Gesture_Controller import (
+    Controller,
+    Gest,
+    GestureController,
+    HandRecog,
+    HLabel,
+)
+import gesture_replay
+
+STAGES = [
+    "preprocess",
+    "hands_process",
+    "classify_hands",
+    "hand_recog",
+    "handle_controls",
+    "draw_landmarks",
+    "imshow",
+]
+
+
+class StageTimes:
+    """
+    Collects per-frame durations of every stage of the gesture controller
+    loop, in seconds.
+    """
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+
+    def add(self, stage, seconds):
+        self.samples[stage].append(seconds)
+
+    def report(self):
+        """returns dict of count, mean, p50, p95, p99 (ms) and throughput per stage."""
+        report = {}
+        for stage, samples in self.samples.items():
+            if not samples:
+                continue
+            ms = np.array(samples) * 1000.0
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            report[stage] = {
+                "count": len(samples),
+                "mean_ms": float(ms.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "throughput_fps": float(1000.0 / ms.mean()) if ms.mean() > 0 else None,
+            }
+        return report
+
+
+def video_frames(path, limit):
+    """yields up to 'limit' BGR frames of video file 'path'."""
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.isOpened() and count < limit:
+        success, image = cap.read()
+        if not success:
+            break
+        count += 1
+        yield image
+    cap.release()
+
+
+def synthetic_frames(width, height, limit, seed=0):
+    """yields 'limit' random BGR frames of size 'width' x 'height'."""
+    rng = np.random.default_rng(seed)
+    pool = [rng.integers(0, 256, (height, width, 3), np.uint8) for _ in range(8)]
+    for idx in range(limit):
+        yield pool[idx % len(pool)]
+
+
+def run(frames, session=None, display=False, backend=None):
+    """
+    times every stage of 'GestureController.start' on 'frames' with hand
+    backend named 'backend'.
+
+    If mediapipe finds no hand in a frame, the next frame of 'session'
+    (results from 'gesture_replay.load_session') is used instead so the
+    gesture stages are exercised with synthetic input too.
+    """
+    times = StageTimes()
+    handmajor = HandRecog(HLabel.MAJOR)
+    handminor = HandRecog(HLabel.MINOR)
+    features = GestureController.features
+    prep = FramePrep()
+    gesture_replay.reset_controller()
+    clock = time.perf_counter
+
+    with hand_backends.create_backend(
+        backend
+    ) as hands, gesture_replay.mock_controls(gesture_replay.MockActuator()):
+        for idx, image in enumerate(frames):
+            t0 = clock()
+            rgb = prep.to_rgb(image)
+            t1 = clock()
+            results = prep.mirror_hands(hands.process(rgb))
+            t2 = clock()
+            times.add("preprocess", t1 - t0)
+            times.add("hands_process", t2 - t1)
+
+            if not results.multi_hand_landmarks and session:
+                results = session[idx % len(session)]
+
+            t0 = clock()
+            if results.multi_hand_landmarks:
+                GestureController.classify_hands(results)
+                t1 = clock()
+                features.load(HLabel.MAJOR, GestureController.hr_major)
+                features.load(HLabel.MINOR, GestureController.hr_minor)
+                features.compute()
+                handmajor.update_hand_result(
+                    GestureController.hr_major, features.features[HLabel.MAJOR]
+                )
+                handminor.update_hand_result(
+                    GestureController.hr_minor, features.features[HLabel.MINOR]
+                )
+                handmajor.set_finger_state()
+                handminor.set_finger_state()
+                gest_name = handminor.get_gesture(t0)
+                hand_result = handminor.hand_result
+                if gest_name != Gest.PINCH_MINOR:
+                    gest_name = handmajor.get_gesture(t0)
+                    hand_result = handmajor.hand_result
+                t2 = clock()
+                Controller.handle_controls(gest_name, hand_result, t0)
+                t3 = clock()
+                times.add("classify_hands", t1 - t0)
+                times.add("hand_recog", t2 - t1)
+                times.add("handle_controls", t3 - t2)
+            else:
+                Controller.prev_hand = None
+
+            t0 = clock()
+            image = GestureController.draw_hands(
+                prep.preview(image), results.multi_hand_landmarks
+            )
+            t1 = clock()
+            times.add("draw_landmarks", t1 - t0)
+            if display:
+                cv2.imshow("Gesture Controller", image)
+                cv2.waitKey(1)
+                times.add("imshow", clock() - t1)
+
+    if display:
+        cv2.destroyAllWindows()
+    return times
+
+
+def compare_backends(frames, names, fps):
+    """
+    feeds 'frames' at 'fps' like a camera to every hand backend of 'names',
+    returns dict of delivered results, throughput and latency from submit
+    to result callback per backend.
+    """
+    rgb_frames = [cv2.cvtColor(image, cv2.COLOR_BGR2RGB) for image in frames]
+    report = {}
+    for name in names:
+        latencies = []
+        lock = threading.Lock()
+
+        def on_results(results, timestamp):
+            with lock:
+                latencies.append(time.perf_counter() - timestamp)
+
+        with hand_backends.create_backend(name) as backend:
+            backend.submit(rgb_frames[0], time.perf_counter(), on_results)
+            time.sleep(0.5)
+            latencies.clear()
+            start = next_frame = time.perf_counter()
+            for image in rgb_frames:
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_frame += 1.0 / fps
+                backend.submit(image, time.perf_counter(), on_results)
+            time.sleep(0.5)
+            elapsed = time.perf_counter() - start - 0.5
+
+        ms = np.array(latencies) * 1000.0
+        p50, p95 = np.percentile(ms, [50, 95]) if len(ms) else (0.0, 0.0)
+        report[name] = {
+            "submitted": len(rgb_frames),
+            "delivered": len(ms),
+            "throughput_fps": len(ms) / elapsed,
+            "latency_p50_ms": float(p50),
+            "latency_p95_ms": float(p95),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-stage latency benchmark of the gesture controller loop."
+    )
+    parser.add_argument("--video", help="recorded video file, default synthetic")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", default="640x480", help="synthetic frame size")
+    parser.add_argument("--session", help="landmark session used when no hand found")
+    parser.add_argument("--display", action="store_true", help="time cv2.imshow")
+    parser.add_argument("--backend", help="hand backend, see hand_backends.BACKENDS")
+    parser.add_argument("--compare", help="backends to compare, e.g. solutions,tasks")
+    parser.add_argument("--fps", type=float, default=30.0, help="rate of --compare")
+    parser.add_argument("--label", default="", help="stored with the results")
+    parser.add_argument("--output", default="benchmark_gesture.json")
+    args = parser.parse_args()
+
+    if args.video:
+        frames = video_frames(args.video, args.frames)
+    else:
+        width, height = (int(v) for v in args.size.split("x"))
+        frames = synthetic_frames(width, height, args.frames)
+    session = gesture_replay.load_session(args.session) if args.session else None
+
+    if args.compare:
+        backends = compare_backends(list(frames), args.compare.split(","), args.fps)
+        for name, stats in backends.items():
+            print(
+                "%-10s %d/%d delivered %7.1f fps p50=%7.3fms p95=%7.3fms"
+                % (
+                    name,
+                    stats["delivered"],
+                    stats["submitted"],
+                    stats["throughput_fps"],
+                    stats["latency_p50_ms"],
+                    stats["latency_p95_ms"],
+                )
+            )
+        results = {"backends": backends, "fps": args.fps}
+    else:
+        report = run(frames, session, args.display, args.backend).report()
+        for stage, stats in report.items():
+            print(
+                "%-16s n=%-5d p50=%7.3fms p95=%7.3fms p99=%7.3fms %9.1f fps"
+                % (
+                    stage,
+                    stats["count"],
+                    stats["p50_ms"],
+                    stats["p95_ms"],
+                    stats["p99_ms"],
+                    stats["throughput_fps"] or 0.0,
+                )
+            )
+        results = {"backend": args.backend or "solutions", "stages": report}
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "label": args.label,
+                "source": args.video or "synthetic:" + args.size,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                **results,
+            },
+            f,
+            indent=2,
+        )
+    print("Saved results to", args.output)
+
+
+if __name__ == "__main__":
+    main()
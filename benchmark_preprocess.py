@@ -0,0 +1,135 @@
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from types import SimpleNamespace
+from mediapipe.framework.formats import landmark_pb2, classification_pb2
+from frame_prep import FramePrep
+
+SIZES = {"720p": (1280, 720), "1080p": (1920, 1080)}
+
+
+def hand_results(rng):
+    """returns mediapipe-like results with two random hands."""
+    hands = [
+        landmark_pb2.NormalizedLandmarkList(
+            landmark=[
+                landmark_pb2.NormalizedLandmark(x=x, y=y, z=z)
+                for x, y, z in rng.random((21, 3)).tolist()
+            ]
+        )
+        for _ in range(2)
+    ]
+    handedness = [
+        classification_pb2.ClassificationList(
+            classification=[
+                classification_pb2.Classification(index=idx, score=0.9, label=label)
+            ]
+        )
+        for idx, label in enumerate(["Left", "Right"])
+    ]
+    return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+
+def legacy_step(frame, results, show):
+    """preprocessing of the controllers before 'frame_prep.FramePrep'."""
+    image = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+    image.flags.writeable = False
+    # inference runs here
+    image.flags.writeable = True
+    image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    return image
+
+
+def prep_step(prep):
+    """returns step function preprocessing with reused buffers of 'prep'."""
+
+    def step(frame, results, show):
+        prep.to_rgb(frame)
+        # inference runs here
+        prep.mirror_hands(results)
+        if show:
+            return prep.preview(frame)
+        return None
+
+    return step
+
+
+def measure(step, frames, results, show):
+    """
+    returns ms per frame of 'step' and mean peak of bytes it allocated per
+    frame, traced with 'tracemalloc' in a separate untimed pass.
+    """
+    for frame in frames[:3]:
+        step(frame, results, show)
+
+    start = time.perf_counter()
+    for frame in frames:
+        step(frame, results, show)
+    ms = (time.perf_counter() - start) * 1000 / len(frames)
+
+    allocated = []
+    tracemalloc.start()
+    for frame in frames:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        step(frame, results, show)
+        allocated.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return ms, float(np.mean(allocated))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time and allocations of frame preprocessing per frame."
+    )
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--output", default="benchmark_preprocess.json")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = hand_results(rng)
+
+    report = {}
+    for name, (width, height) in SIZES.items():
+        pool = [rng.integers(0, 256, (height, width, 3), np.uint8) for _ in range(4)]
+        frames = [pool[idx % len(pool)] for idx in range(args.frames)]
+        frame_bytes = pool[0].nbytes
+        variants = {
+            "legacy": (legacy_step, True),
+            "prep_preview": (prep_step(FramePrep()), True),
+            "prep_headless": (prep_step(FramePrep()), False),
+        }
+        report[name] = {}
+        for variant, (step, show) in variants.items():
+            ms, allocated = measure(step, frames, results, show)
+            report[name][variant] = {
+                "ms_per_frame": round(ms, 3),
+                "alloc_kb_per_frame": round(allocated / 1024, 1),
+                "frame_buffers_per_frame": round(allocated / frame_bytes, 2),
+            }
+            print(
+                "%-6s %-14s %7.3f ms/frame %10.1f KB/frame %5.2f frame buffers"
+                % (name, variant, ms, allocated / 1024, allocated / frame_bytes)
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "frames": args.frames,
+                "sizes": report,
+            },
+            f,
+            indent=2,
+        )
+    print("Saved results to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import json
+import platform
+import time
+import numpy as np
+from frame_scheduler import FrameScheduler
+
+RATES = (30.0, 60.0)
+
+
+def busy_wait_loop(fps, frames, work):
+    """frame pacing of the gloved controller before 'FrameScheduler'."""
+    start_time = now_time = time.time()
+    starts = []
+    for _ in range(frames):
+        start_time = time.time()
+        while now_time - start_time <= 1.0 / fps:
+            now_time = time.time()
+        starts.append(time.perf_counter())
+        time.sleep(work)
+    return starts
+
+
+def sleep_loop(fps, frames, work):
+    """relative 'time.sleep' of the remaining frame time."""
+    starts = []
+    for _ in range(frames):
+        begin = time.perf_counter()
+        starts.append(begin)
+        time.sleep(work)
+        delay = 1.0 / fps - (time.perf_counter() - begin)
+        if delay > 0:
+            time.sleep(delay)
+    return starts
+
+
+def scheduler_loop(fps, frames, work):
+    scheduler = FrameScheduler(fps)
+    starts = []
+    for _ in range(frames):
+        scheduler.wait()
+        starts.append(time.perf_counter())
+        time.sleep(work)
+    return starts
+
+
+def measure(loop, fps, frames, work):
+    """returns dict of achieved fps, cpu % and frame interval jitter of 'loop'."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    starts = loop(fps, frames, work)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    intervals = np.diff(starts) * 1000
+    # deviation of each frame start from the ideal 1 / fps grid
+    grid = starts[0] + np.arange(len(starts)) / fps
+    drift = (np.array(starts) - grid) * 1000
+    return {
+        "fps": round((len(starts) - 1) / (starts[-1] - starts[0]), 2),
+        "cpu_percent": round(100 * cpu / wall, 1),
+        "interval_std_ms": round(float(intervals.std()), 3),
+        "interval_max_ms": round(float(intervals.max()), 3),
+        "drift_ms": round(float(drift[-1]), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CPU use and timing jitter of frame pacing at 30 and 60 fps."
+    )
+    parser.add_argument("--seconds", type=float, default=5.0, help="per run")
+    parser.add_argument(
+        "--work", type=float, default=0.01, help="seconds of simulated frame work"
+    )
+    parser.add_argument("--output", default="benchmark_scheduler.json")
+    args = parser.parse_args()
+
+    loops = {
+        "busy_wait": busy_wait_loop,
+        "sleep": sleep_loop,
+        "scheduler": scheduler_loop,
+    }
+    report = {}
+    for fps in RATES:
+        frames = int(args.seconds * fps)
+        report["%d" % fps] = {}
+        for name, loop in loops.items():
+            result = measure(loop, fps, frames, args.work)
+            report["%d" % fps][name] = result
+            print(
+                "%2d fps %-10s %6.2f fps %5.1f %% cpu  interval std %6.3f ms"
+                "  max %7.3f ms  drift %7.2f ms"
+                % (
+                    fps,
+                    name,
+                    result["fps"],
+                    result["cpu_percent"],
+                    result["interval_std_ms"],
+                    result["interval_max_ms"],
+                    result["drift_ms"],
+                )
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "work_ms": args.work * 1000,
+                "rates": report,
+            },
+            f,
+            indent=2,
+        )
+    print("Saved results to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from roi_segmenter import ROISegmenter
+
+
+def legacy_crop(frame, corners, hue):
+    """'ROI.cropROI' before 'ROISegmenter'."""
+    pts = np.array(corners)
+
+    rect = cv2.boundingRect(pts)
+    x, y, w, h = rect
+    croped = frame[y : y + h, x : x + w].copy()
+
+    pts = pts - pts.min(axis=0)
+
+    mask = np.zeros(croped.shape[:2], np.uint8)
+    cv2.drawContours(mask, [pts], -1, (255, 255, 255), -1, cv2.LINE_AA)
+
+    dst = cv2.bitwise_and(croped, croped, mask=mask)
+
+    bg = np.ones_like(croped, np.uint8) * 255
+    cv2.bitwise_not(bg, bg, mask=mask)
+
+    kernelOpen = np.ones((3, 3), np.uint8)
+    kernelClose = np.ones((5, 5), np.uint8)
+
+    hsv = cv2.cvtColor(dst, cv2.COLOR_BGR2HSV)
+
+    lower_range = np.array([hue - 5, 50, 50])
+    upper_range = np.array([hue + 5, 255, 255])
+
+    mask = cv2.inRange(hsv, lower_range, upper_range)
+    Opening = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernelOpen)
+    Closing = cv2.morphologyEx(Opening, cv2.MORPH_CLOSE, kernelClose)
+    return Closing
+
+
+def make_rois(rng, count, width, height, size):
+    """returns 'count' jittered quadrilaterals of about 'size' px."""
+    rois = []
+    for _ in range(count):
+        margin = size // 2 + size // 5
+        cx = rng.integers(margin, width - margin)
+        cy = rng.integers(margin, height - margin)
+        offsets = np.array([(-1, 1), (1, 1), (1, -1), (-1, -1)]) * size / 2
+        points = offsets + rng.normal(0, size / 20, (4, 2)) + (cx, cy)
+        rois.append([(int(x), int(y)) for x, y in points])
+    return rois
+
+
+def measure(crop, frames, rois, hue):
+    """returns (ms per frame, mean peak bytes allocated per frame) of 'crop'."""
+    for frame, roi in zip(frames[:3], rois[:3]):
+        crop(frame, roi, hue)
+
+    start = time.perf_counter()
+    for frame, roi in zip(frames, rois):
+        crop(frame, roi, hue)
+    ms = (time.perf_counter() - start) * 1000 / len(frames)
+
+    allocated = []
+    tracemalloc.start()
+    for frame, roi in zip(frames, rois):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        crop(frame, roi, hue)
+        allocated.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return ms, float(np.mean(allocated))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time and allocations of the glove ROI segmentation per frame."
+    )
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", type=int, default=240, help="ROI size in px")
+    parser.add_argument("--output", default="benchmark_segmentation.json")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    width, height = 640, 480
+    pool = [rng.integers(0, 256, (height, width, 3), np.uint8) for _ in range(4)]
+    frames = [pool[idx % len(pool)] for idx in range(args.frames)]
+    rois = make_rois(rng, args.frames, width, height, args.size)
+    hue = 110
+
+    segmenter = ROISegmenter()
+    for frame, roi in zip(frames[:20], rois[:20]):
+        if not np.array_equal(
+            legacy_crop(frame, roi, hue), segmenter.segment(frame, roi, hue)
+        ):
+            raise SystemExit("segmenter output differs from 'cropROI'")
+
+    report = {}
+    variants = {"legacy": legacy_crop, "segmenter": segmenter.segment}
+    for name, crop in variants.items():
+        ms, allocated = measure(crop, frames, rois, hue)
+        report[name] = {
+            "ms_per_frame": round(ms, 3),
+            "alloc_kb_per_frame": round(allocated / 1024, 1),
+        }
+        print("%-10s %7.3f ms/frame %8.1f KB/frame" % (name, ms, allocated / 1024))
+    report["segmenter"].update(segmenter.report())
+    print("segmenter buffers:", segmenter.report())
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "frames": args.frames,
+                "roi_size": args.size,
+                "variants": report,
+            },
+            f,
+            indent=2,
+        )
+    print("Saved results to", args.output)
+
+
+if __name__ == "__main__":
+    main()
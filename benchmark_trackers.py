@@ -0,0 +1,159 @@
+import argparse
+import json
+import platform
+import time
+import cv2
+import numpy as np
+from marker_tracking import MarkerTracker, TRACKERS
+
+
+def load_frames(path, limit):
+    """returns mirrored frames of video 'path', as the gloved controller sees them."""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(cv2.flip(frame, 1))
+    cap.release()
+    return frames
+
+
+def ground_truth(marker, frames, windowed=False):
+    """
+    returns (corners per frame, ms per frame) of detection on every frame,
+    searching around the last corners first if 'windowed'.
+    """
+    type(marker).windowed = windowed
+    marker.corners = None
+    truth = []
+    start = time.perf_counter()
+    for frame in frames:
+        marker.detect(frame)
+        corners = marker.corners
+        truth.append(None if not corners else np.reshape(corners[0], (4, 2)))
+    return truth, (time.perf_counter() - start) * 1000 / len(frames)
+
+
+def run(marker, kind, frames, truth, every, fps):
+    """returns dict of speed and drift of 'kind' against the 'truth' corners."""
+
+    def detect(frame):
+        marker.detect(frame)
+        return marker.corners
+
+    marker.corners = None
+    tracker = MarkerTracker(detect, kind, every)
+    errors, lost = [], 0
+    elapsed = 0.0
+    for idx, frame in enumerate(frames):
+        start = time.perf_counter()
+        corners = tracker.update(frame, idx / fps)
+        elapsed += time.perf_counter() - start
+        if truth[idx] is None:
+            continue
+        if not corners:
+            lost += 1
+        elif tracker.since_detect:
+            # drift only on frames the tracker followed the marker
+            points = np.reshape(corners[0], (4, 2))
+            errors.append(np.linalg.norm(points - truth[idx], axis=1).mean())
+    errors = np.array(errors or [0.0])
+    seen = sum(1 for t in truth if t is not None)
+    return {
+        "ms_per_frame": round(elapsed * 1000 / len(frames), 3),
+        "fps": round(len(frames) / elapsed, 1),
+        "drift_px_mean": round(float(errors.mean()), 2),
+        "drift_px_p95": round(float(np.percentile(errors, 95)), 2),
+        "lost_percent": round(100 * lost / max(seen, 1), 1),
+        **tracker.report(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Speed and drift of marker trackers between full detections."
+    )
+    parser.add_argument("videos", nargs="+", help="recorded videos of the glove")
+    parser.add_argument("--every", type=int, default=5, help="frames per detection")
+    parser.add_argument("--trackers", nargs="+", default=list(TRACKERS))
+    parser.add_argument("--frames", type=int, default=600, help="max. per video")
+    parser.add_argument("--output", default="benchmark_trackers.json")
+    args = parser.parse_args()
+
+    from Gesture_Controller_Gloved import Marker
+
+    marker = Marker()
+    report = {}
+    for path in args.videos:
+        frames = load_frames(path, args.frames)
+        if not frames:
+            print("No frames in", path)
+            continue
+        fps = cv2.VideoCapture(path).get(cv2.CAP_PROP_FPS) or 30.0
+        truth, detect_ms = ground_truth(marker, frames)
+        searched, full = marker.searched, marker.full_searches
+        windowed, windowed_ms = ground_truth(marker, frames, windowed=True)
+        report[path] = {
+            "frames": len(frames),
+            "marker_frames": sum(1 for t in truth if t is not None),
+            "detect_every_frame": {
+                "ms_per_frame": round(detect_ms, 3),
+                "fps": round(1000 / detect_ms, 1),
+            },
+            "windowed_every_frame": {
+                "ms_per_frame": round(windowed_ms, 3),
+                "fps": round(1000 / windowed_ms, 1),
+                "searched_percent": round(
+                    100 * (marker.searched - searched) / len(frames), 1
+                ),
+                "full_searches": marker.full_searches - full,
+                "missed": sum(
+                    1 for w, t in zip(windowed, truth) if w is None and t is not None
+                ),
+            },
+        }
+        print(
+            "%s: full detection %.3f ms/frame, windowed %.3f ms/frame on %.1f %%"
+            " of the frame"
+            % (
+                path,
+                detect_ms,
+                windowed_ms,
+                report[path]["windowed_every_frame"]["searched_percent"],
+            )
+        )
+        for kind in args.trackers:
+            result = run(marker, kind, frames, truth, args.every, fps)
+            report[path][kind] = result
+            print(
+                "  %-6s %7.3f ms/frame %7.1f fps  drift %6.2f px (p95 %6.2f)"
+                "  lost %5.1f %%"
+                % (
+                    kind,
+                    result["ms_per_frame"],
+                    result["fps"],
+                    result["drift_px_mean"],
+                    result["drift_px_p95"],
+                    result["lost_percent"],
+                )
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "opencv": cv2.__version__,
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "detect_every": args.every,
+                "videos": report,
+            },
+            f,
+            indent=2,
+        )
+    print("Saved results to", args.output)
+
+
+if __name__ == "__main__":
+    main()
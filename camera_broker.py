@@ -0,0 +1,383 @@
+import threading
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+import camera_tuner
+
+# control block of 'FrameRing', int64 fields
+SLOTS, HEIGHT, WIDTH, CHANNELS, LATEST, CONTROL_SIZE = range(6)
+HEADER_BYTES = 64
+
+
+class FrameRing:
+    """
+    Ring of frame slots in a 'multiprocessing.shared_memory' block, written
+    by one producer and read without copying by any number of consumers,
+    in this or other processes ('FrameRing(name=...)').
+
+    Every slot carries the sequence number and 'time.perf_counter'
+    timestamp of its frame. A slot is marked with sequence -1 while it is
+    written, 'latest' never returns a slot being written. A frame returned
+    by 'latest' is a view into the ring, it stays valid until 'slots' newer
+    frames were published, check with 'valid' if a consumer may be slower.
+
+    Attributes
+    ----------
+    shape : tuple
+        (height, width, channels) of every frame.
+    slots : int
+        no. of frames kept.
+    """
+
+    def __init__(self, shape=None, slots=8, name=None):
+        if name is None:
+            height, width, channels = shape
+            frame_bytes = height * width * channels
+            size = HEADER_BYTES + 16 * slots + frame_bytes * slots
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+            control = np.ndarray(CONTROL_SIZE, np.int64, self.shm.buf)
+            control[:] = (slots, height, width, channels, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+            control = np.ndarray(CONTROL_SIZE, np.int64, self.shm.buf)
+
+        self.control = control
+        self.slots = int(control[SLOTS])
+        self.shape = tuple(int(v) for v in control[HEIGHT : CHANNELS + 1])
+        offset = HEADER_BYTES
+        self.seqs = np.ndarray(self.slots, np.int64, self.shm.buf, offset)
+        offset += 8 * self.slots
+        self.stamps = np.ndarray(self.slots, np.float64, self.shm.buf, offset)
+        offset += 8 * self.slots
+        self.frames = np.ndarray(
+            (self.slots,) + self.shape, np.uint8, self.shm.buf, offset
+        )
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def begin(self):
+        """returns (seq, frame buffer) of the next slot to write."""
+        seq = int(self.control[LATEST]) + 1
+        slot = seq % self.slots
+        self.seqs[slot] = -1
+        return seq, self.frames[slot]
+
+    def publish(self, seq, timestamp):
+        """makes frame 'seq' written after 'begin' visible to consumers."""
+        slot = seq % self.slots
+        self.stamps[slot] = timestamp
+        self.seqs[slot] = seq
+        self.control[LATEST] = seq
+
+    def latest(self):
+        """returns (seq, timestamp, frame) of newest frame, None if none yet."""
+        while True:
+            seq = int(self.control[LATEST])
+            if seq == 0:
+                return None
+            slot = seq % self.slots
+            timestamp = float(self.stamps[slot])
+            if self.seqs[slot] == seq:
+                return seq, timestamp, self.frames[slot]
+
+    def valid(self, seq):
+        """returns True if frame 'seq' was not overwritten yet."""
+        return self.seqs[seq % self.slots] == seq
+
+    def close(self):
+        """detaches from the shared block, the creating ring also frees it."""
+        self.control = self.seqs = self.stamps = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # a consumer still holds a frame view, mapping is freed with it
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+class CameraSource:
+    """
+    Frames of camera 'index' opened with its 'camera_tuner' profile, or of
+    any other 'cv2.VideoCapture' source.
+    """
+
+    def __init__(self, index=0):
+        self.index = index
+        self.cap = None
+
+    def open(self):
+        """opens the source, returns (height, width, channels) of its frames."""
+        self.cap = camera_tuner.open_capture(self.index)
+        success, frame = self.cap.read()
+        if not success:
+            self.cap.release()
+            raise RuntimeError("cannot open camera %r" % self.index)
+        return frame.shape
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def read(self, out):
+        """reads next frame into 'out', returns False if none could be read."""
+        success, frame = self.cap.read(out)
+        if success and frame is not out:
+            np.copyto(out, frame)
+        return success
+
+    def close(self):
+        self.cap.release()
+
+
+class VideoFileSource(CameraSource):
+    """
+    Frames of video file 'path' paced at its frame rate, restarts at the end
+    if 'loop' is set. Stands in for the camera in tests and benchmarks.
+    """
+
+    def __init__(self, path, loop=True):
+        super().__init__(path)
+        self.loop = loop
+        self.next_frame = None
+
+    def open(self):
+        shape = super().open()
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.interval = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        self.next_frame = time.perf_counter()
+        return shape
+
+    def read(self, out):
+        delay = self.next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame = max(self.next_frame, time.perf_counter()) + self.interval
+        if super().read(out):
+            return True
+        if not self.loop:
+            return False
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return super().read(out)
+
+
+class SyntheticSource:
+    """
+    Generated frames of a bright square moving over a dark background at
+    'fps', for tests without a camera.
+    """
+
+    def __init__(self, width=640, height=480, fps=30.0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.count = 0
+
+    def open(self):
+        self.next_frame = time.perf_counter()
+        return (self.height, self.width, 3)
+
+    def get(self, prop):
+        return {
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+            cv2.CAP_PROP_FPS: self.fps,
+        }.get(prop, 0.0)
+
+    def read(self, out):
+        delay = self.next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame = max(self.next_frame, time.perf_counter()) + 1.0 / self.fps
+        size = self.height // 4
+        x = self.count * 4 % (self.width - size)
+        y = (self.height - size) // 2
+        out.fill(32)
+        out[y : y + size, x : x + size] = 224
+        self.count += 1
+        return True
+
+    def close(self):
+        pass
+
+
+class CameraBroker:
+    """
+    Owns a frame source and publishes each frame once into a 'FrameRing'
+    from its own thread, read by every consumer, so several controllers
+    can use one camera.
+
+    Consumers call 'acquire' before and 'release' after use, the source is
+    opened by the first and closed after the last consumer. After 'warm'
+    the source stays open and publishing is only paused while there is no
+    consumer, so the next 'acquire' gets frames without reopening it.
+
+    Attributes
+    ----------
+    ring : Object of 'FrameRing'
+        shared frames, None while the source is closed.
+    keep_open : bool
+        True to pause instead of closing the source after the last consumer.
+    paused : bool
+        True while the source is open but not read.
+    frames : int
+        no. of frames published.
+    failed : int
+        no. of failed reads of the source.
+    """
+
+    def __init__(self, source, slots=8):
+        self.source = source
+        self.slots = slots
+        self.ring = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.cond = threading.Condition()
+        self.consumers = 0
+        self.running = False
+        self.keep_open = False
+        self.paused = False
+        self.frames = 0
+        self.failed = 0
+
+    def acquire(self):
+        """registers a consumer, opens the source and starts publishing if needed."""
+        with self.lock:
+            self.open(paused=False)
+            self.consumers += 1
+            return self.ring
+
+    def release(self):
+        """unregisters a consumer, stops or pauses the source after the last one."""
+        with self.lock:
+            self.consumers -= 1
+            if self.consumers == 0:
+                self.stop()
+
+    def warm(self):
+        """opens the source ahead of the first consumer and keeps it open."""
+        with self.lock:
+            self.keep_open = True
+            self.open(paused=self.consumers == 0)
+
+    def close(self):
+        """closes the source kept open by 'warm' once no consumer is left."""
+        with self.lock:
+            self.keep_open = False
+            if self.consumers == 0:
+                self.stop()
+
+    def open(self, paused):
+        if self.thread is None:
+            self.ring = FrameRing(self.source.open(), self.slots)
+            self.running = True
+            self.paused = paused
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        with self.cond:
+            self.paused = self.paused and paused
+            self.cond.notify_all()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        with self.cond:
+            if self.keep_open:
+                self.paused = True
+                return
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join()
+        self.thread = None
+
+    def run(self):
+        ring = self.ring
+        try:
+            while self.running:
+                if self.paused:
+                    with self.cond:
+                        self.cond.wait_for(lambda: not self.paused or not self.running)
+                    continue
+                seq, buffer = ring.begin()
+                if not self.source.read(buffer):
+                    self.failed += 1
+                    if self.failed == 1:
+                        print("Ignoring Empty Camera Frame.")
+                    time.sleep(0.01)
+                    continue
+                ring.publish(seq, time.perf_counter())
+                self.frames += 1
+                with self.cond:
+                    self.cond.notify_all()
+        finally:
+            self.source.close()
+            with self.cond:
+                self.ring = None
+                self.cond.notify_all()
+            ring.close()
+
+    def wait_newer(self, seq, timeout=1.0):
+        """returns (seq, timestamp, frame) of a frame newer than 'seq', or None."""
+        with self.cond:
+            self.cond.wait_for(
+                lambda: self.ring is None or self.ring.control[LATEST] > seq, timeout
+            )
+            if self.ring is None or self.ring.control[LATEST] <= seq:
+                return None
+            return self.ring.latest()
+
+
+class BrokerCapture:
+    """
+    'cv2.VideoCapture'-like reader of a 'CameraBroker', can be passed to a
+    controller in place of its own capture.
+
+    'read' blocks until a frame newer than the last one read is published
+    and returns a view into the shared ring, it must not be written to.
+
+    Attributes
+    ----------
+    seq : int
+        sequence number of the last frame read.
+    timestamp : float
+        'time.perf_counter' timestamp of the last frame read.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        ring = self.broker.acquire()
+        self.opened = True
+        # starts after the newest frame, a reader does not get a frame
+        # published before it was created
+        self.seq = int(ring.control[LATEST]) if ring is not None else 0
+        self.timestamp = None
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        """returns (success, frame), 'image' is ignored, frames are not copied."""
+        if not self.opened:
+            return False, None
+        newest = self.broker.wait_newer(self.seq)
+        if newest is None:
+            return False, None
+        self.seq, self.timestamp, frame = newest
+        return True, frame
+
+    def get(self, prop):
+        ring = self.broker.ring
+        if ring is not None and prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(ring.shape[1])
+        if ring is not None and prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(ring.shape[0])
+        return float(self.broker.source.get(prop))
+
+    def release(self):
+        if self.opened:
+            self.opened = False
+            self.broker.release()
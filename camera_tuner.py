@@ -0,0 +1,498 @@
+import argparse
+import json
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+# candidate capture modes, probed in every combination
+FOURCCS = ("MJPG", "YUYV")
+SIZES = ((640, 480), (1280, 720))
+RATES = (60, 30)
+BUFFERS = (1, 2, 4)
+
+PROFILES_PATH = os.path.join(os.path.expanduser("~"), ".phoenix", "cameras.json")
+
+
+def fourcc_code(name):
+    return cv2.VideoWriter_fourcc(*name)
+
+
+def fourcc_name(code):
+    """returns 4 character name of FOURCC 'code' as reported by 'cap.get'."""
+    code = int(code)
+    return "".join(chr((code >> 8 * i) & 0xFF) for i in range(4))
+
+
+def device_key(index):
+    """
+    returns key of camera 'index' in the profile file, with the device
+    name where the platform reports it, so a swapped camera is probed again.
+    """
+    name = ""
+    sysfs = "/sys/class/video4linux/video%d/name" % index
+    if os.path.exists(sysfs):
+        with open(sysfs) as f:
+            name = f.read().strip()
+    return "%d:%s" % (index, name)
+
+
+def profiles_path(path=None):
+    return path or os.environ.get("PHOENIX_CAMERA_PROFILES") or PROFILES_PATH
+
+
+def load_profiles(path=None):
+    """returns dict of stored profiles per device key, empty if none."""
+    try:
+        with open(profiles_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_profiles(profiles, path=None):
+    path = profiles_path(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profiles, f, indent=2)
+
+
+def apply_profile(cap, profile):
+    """sets the mode of 'profile' on 'cap', FOURCC before size and rate."""
+    cap.set(cv2.CAP_PROP_FOURCC, fourcc_code(profile["fourcc"]))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile["width"])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile["height"])
+    cap.set(cv2.CAP_PROP_FPS, profile["fps"])
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, profile["buffersize"])
+
+
+class CaptureTuner:
+    """
+    Probes the capture modes of an opened camera and picks the one with the
+    lowest capture-to-read latency that still delivers 'min_fps'.
+
+    Every mode is read twice: back to back for the delivered frame rate,
+    then with 'work' seconds of simulated processing between reads, so
+    frames queued by the driver show up as latency. Latency is the age of
+    the frame by its 'CAP_PROP_POS_MSEC' capture timestamp where the backend
+    stamps frames on the monotonic clock (V4L2), otherwise it is estimated
+    from the reads returning without waiting for a new frame.
+
+    'clock' and 'sleep' default to 'time.monotonic' and 'time.sleep', a
+    'FakeCapture' passes its own to probe without real time passing.
+    'cancelled' is checked before every mode, if it returns True the probe
+    stops and returns None.
+
+    Attributes
+    ----------
+    results : list
+        measurement of every probed mode, as stored in a profile.
+    """
+
+    def __init__(
+        self,
+        cap,
+        min_fps=24.0,
+        work=0.04,
+        frames=30,
+        warmup=5,
+        clock=None,
+        sleep=None,
+        cancelled=None,
+    ):
+        self.cap = cap
+        self.min_fps = min_fps
+        self.work = work
+        self.frames = frames
+        self.warmup = warmup
+        self.clock = clock or time.monotonic
+        self.sleep = sleep or time.sleep
+        self.cancelled = cancelled or (lambda: False)
+        self.results = []
+
+    def configure(self, fourcc, width, height, fps, buffersize):
+        """
+        sets a mode, returns the mode the driver actually took as
+        (fourcc, width, height, fps, buffersize), None if it gives no frames.
+        """
+        apply_profile(
+            self.cap,
+            {
+                "fourcc": fourcc,
+                "width": width,
+                "height": height,
+                "fps": fps,
+                "buffersize": buffersize,
+            },
+        )
+        if not self.cap.read()[0]:
+            return None
+        return (
+            fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            round(self.cap.get(cv2.CAP_PROP_FPS) or fps),
+            int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE) or buffersize),
+        )
+
+    def measure(self, mode):
+        """returns profile dict of configured 'mode' with measured fps and latency."""
+        for _ in range(self.warmup):
+            self.cap.read()
+
+        start = self.clock()
+        delivered = 0
+        for _ in range(self.frames):
+            delivered += bool(self.cap.read()[0])
+        elapsed = self.clock() - start
+        measured_fps = delivered / elapsed if elapsed > 0 else 0.0
+
+        interval = 1.0 / max(measured_fps, 1.0)
+        ages, instant = [], 0
+        for _ in range(self.frames):
+            self.sleep(self.work)
+            before = self.clock()
+            success = self.cap.read()[0]
+            now = self.clock()
+            if not success:
+                continue
+            if now - before < interval / 4:
+                instant += 1
+            age = now * 1000 - self.cap.get(cv2.CAP_PROP_POS_MSEC)
+            if 0 <= age < 1000:
+                ages.append(age)
+        if len(ages) > self.frames // 2:
+            latency = float(np.median(ages))
+        else:
+            # reads served from the driver queue are a whole queue behind
+            queued = instant / self.frames * mode[4]
+            latency = (queued + 0.5) * interval * 1000
+
+        fourcc, width, height, fps, buffersize = mode
+        return {
+            "fourcc": fourcc,
+            "width": width,
+            "height": height,
+            "fps": fps,
+            "buffersize": buffersize,
+            "measured_fps": round(measured_fps, 1),
+            "latency_ms": round(latency, 1),
+        }
+
+    def score(self, profile):
+        return (
+            profile["measured_fps"] < self.min_fps,
+            profile["latency_ms"],
+            -profile["measured_fps"],
+        )
+
+    def probe(self):
+        """returns best profile of all candidate modes, None if none gave frames."""
+        self.results = []
+        seen = set()
+        for fourcc in FOURCCS:
+            for width, height in SIZES:
+                for fps in RATES:
+                    if self.cancelled():
+                        return None
+                    mode = self.configure(fourcc, width, height, fps, BUFFERS[0])
+                    if mode is None or mode in seen:
+                        continue
+                    seen.add(mode)
+                    self.results.append(self.measure(mode))
+        if not self.results:
+            return None
+
+        # buffer size only matters for the best mode, probe it there
+        best = min(self.results, key=self.score)
+        for buffersize in BUFFERS[1:]:
+            if self.cancelled():
+                return None
+            mode = self.configure(
+                best["fourcc"], best["width"], best["height"], best["fps"], buffersize
+            )
+            if mode is None or mode in seen:
+                continue
+            seen.add(mode)
+            self.results.append(self.measure(mode))
+        best = dict(min(self.results, key=self.score))
+        best["probed"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        apply_profile(self.cap, best)
+        return best
+
+
+class ProfileProbe(threading.Thread):
+    """
+    Probes camera 'index' on a background thread and stores its profile,
+    while no capture of 'open_capture' uses the camera: a capture opened
+    during the probe cancels it after the current mode, the probe starts
+    over once the camera is released again.
+
+    'open_camera' opens the camera, other keyword arguments are passed to
+    'CaptureTuner'.
+
+    Attributes
+    ----------
+    users : int
+        no. of open captures of the camera.
+    profile : dict
+        stored profile, None until the probe finished.
+    """
+
+    def __init__(self, index, path=None, open_camera=None, **options):
+        super().__init__(daemon=True)
+        self.index = index
+        self.path = path
+        self.open_camera = open_camera or cv2.VideoCapture
+        self.options = options
+        self.cond = threading.Condition()
+        self.users = 0
+        self.probing = False
+        self.profile = None
+
+    def acquire(self, timeout=5.0):
+        """registers a user, waits up to 'timeout' seconds for the probe to stop."""
+        with self.cond:
+            self.users += 1
+            self.cond.wait_for(lambda: not self.probing, timeout)
+
+    def release(self):
+        with self.cond:
+            self.users -= 1
+            self.cond.notify_all()
+
+    def cancelled(self):
+        return self.users > 0
+
+    def run(self):
+        while self.profile is None:
+            with self.cond:
+                self.cond.wait_for(lambda: self.users == 0)
+                self.probing = True
+            try:
+                print("Probing capture modes of camera %d..." % self.index)
+                cap = self.open_camera(self.index)
+                tuner = CaptureTuner(cap, cancelled=self.cancelled, **self.options)
+                profile = tuner.probe() if cap.isOpened() else None
+                cap.release()
+            finally:
+                with self.cond:
+                    self.probing = False
+                    self.cond.notify_all()
+            if profile is not None:
+                profiles = load_profiles(self.path)
+                profiles[device_key(self.index)] = profile
+                save_profiles(profiles, self.path)
+                self.profile = profile
+                print("Camera %d profile stored:" % self.index, json.dumps(profile))
+            elif not self.cancelled():
+                print("Camera %d gave no frames, not probed." % self.index)
+                return
+
+
+class ProbedCapture:
+    """
+    'cv2.VideoCapture' of a camera that holds off the 'ProfileProbe' of
+    the camera until it is released, other attributes are the capture's.
+    """
+
+    def __init__(self, cap, probe):
+        self.cap = cap
+        self.probe = probe
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+    def release(self):
+        if self.probe is not None:
+            self.probe.release()
+            self.probe = None
+        self.cap.release()
+
+
+# 'ProfileProbe' of every camera without a stored profile, by (index, path)
+probes = {}
+probes_lock = threading.Lock()
+
+
+def open_capture(index=0, reprobe=False, path=None, open_camera=None, **options):
+    """
+    returns 'cv2.VideoCapture' of camera 'index' set to its stored profile.
+    A camera without one is opened in its default mode right away and
+    probed in the background by a 'ProfileProbe' once it is released, so
+    the next capture gets the profile. 'open_camera' and 'options' are
+    passed to the 'ProfileProbe'.
+    """
+    open_camera = open_camera or cv2.VideoCapture
+    if not isinstance(index, int):
+        return open_camera(index)
+    profiles = load_profiles(path)
+    key = device_key(index)
+    if not reprobe and key in profiles:
+        cap = open_camera(index)
+        if cap.isOpened():
+            apply_profile(cap, profiles[key])
+        return cap
+    with probes_lock:
+        probe = probes.get((index, path))
+        start = probe is None or (reprobe and not probe.is_alive())
+        if start:
+            probe = ProfileProbe(index, path, open_camera, **options)
+            probes[(index, path)] = probe
+        # the capture is registered before the probe starts so it never
+        # competes with the probe for the camera
+        probe.acquire()
+        if start:
+            probe.start()
+    return ProbedCapture(open_camera(index), probe)
+
+
+class FakeCapture:
+    """
+    'cv2.VideoCapture'-like camera on a virtual clock for testing the
+    tuner, frames are captured every 1 / fps seconds into a driver queue
+    of 'CAP_PROP_BUFFERSIZE' frames, frames captured while it is full are
+    dropped, like V4L2 does. Pass 'now' and 'sleep' to 'CaptureTuner'.
+
+    Attributes
+    ----------
+    modes : dict
+        highest fps per supported (fourcc, width, height), the first is
+        the default mode.
+    decode : dict
+        seconds to decode a frame per fourcc.
+    """
+
+    def __init__(self, modes=None, decode=None, buffersize=4):
+        self.modes = modes or {
+            ("YUYV", 640, 480): 30,
+            ("YUYV", 1280, 720): 10,
+            ("MJPG", 640, 480): 60,
+            ("MJPG", 1280, 720): 30,
+        }
+        self.decode = decode or {"YUYV": 0.0005, "MJPG": 0.002}
+        self.fourcc, self.width, self.height = next(iter(self.modes))
+        self.fps = self.modes[(self.fourcc, self.width, self.height)]
+        self.buffersize = buffersize
+        self.time = 0.0
+        self.queue = []
+        self.last_capture = 0.0
+        self.stamp = 0.0
+        self.opened = True
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.time += max(seconds, 0.0)
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        mode = (self.fourcc, self.width, self.height)
+        if prop == cv2.CAP_PROP_FOURCC:
+            name = fourcc_name(value)
+            sizes = [m for m in self.modes if m[0] == name]
+            if not sizes:
+                return False
+            mode = (name, self.width, self.height)
+            if mode not in self.modes:
+                mode = sizes[0]
+        elif prop == cv2.CAP_PROP_FRAME_WIDTH:
+            sizes = [m for m in self.modes if m[:2] == (self.fourcc, int(value))]
+            if not sizes:
+                return False
+            mode = sizes[0]
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            mode = (self.fourcc, self.width, int(value))
+            if mode not in self.modes:
+                return False
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = min(int(value), self.modes[mode])
+            return True
+        elif prop == cv2.CAP_PROP_BUFFERSIZE:
+            self.buffersize = max(int(value), 1)
+            self.queue = self.queue[: self.buffersize]
+            return True
+        else:
+            return False
+        if mode != (self.fourcc, self.width, self.height):
+            self.fourcc, self.width, self.height = mode
+            self.fps = min(self.fps, self.modes[mode])
+            self.queue = []
+        return True
+
+    def get(self, prop):
+        return float(
+            {
+                cv2.CAP_PROP_FOURCC: fourcc_code(self.fourcc),
+                cv2.CAP_PROP_FRAME_WIDTH: self.width,
+                cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+                cv2.CAP_PROP_FPS: self.fps,
+                cv2.CAP_PROP_BUFFERSIZE: self.buffersize,
+                cv2.CAP_PROP_POS_MSEC: self.stamp * 1000,
+            }.get(prop, 0.0)
+        )
+
+    def capture(self):
+        """queues frames captured up to now, while the queue has room."""
+        interval = 1.0 / self.fps
+        while self.last_capture + interval <= self.time:
+            self.last_capture += interval
+            if len(self.queue) < self.buffersize:
+                self.queue.append(self.last_capture)
+
+    def read(self, image=None):
+        if not self.opened:
+            return False, None
+        self.capture()
+        if not self.queue:
+            self.time = self.last_capture + 1.0 / self.fps
+            self.capture()
+        self.stamp = self.queue.pop(0)
+        self.time += self.decode[self.fourcc]
+        if image is None or image.shape != (self.height, self.width, 3):
+            image = np.zeros((self.height, self.width, 3), np.uint8)
+        return True, image
+
+    def release(self):
+        self.opened = False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Probes capture modes of a camera and stores the best one."
+    )
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--profiles", help="profile file, default %s" % PROFILES_PATH)
+    parser.add_argument("--fake", action="store_true", help="probe a FakeCapture")
+    args = parser.parse_args()
+
+    if args.fake:
+        cap = FakeCapture()
+        tuner = CaptureTuner(cap, clock=cap.now, sleep=cap.sleep)
+        best = tuner.probe()
+    else:
+        cap = cv2.VideoCapture(args.camera)
+        if not cap.isOpened():
+            raise SystemExit("cannot open camera %d" % args.camera)
+        tuner = CaptureTuner(cap)
+        best = tuner.probe()
+        if best is not None:
+            profiles = load_profiles(args.profiles)
+            profiles[device_key(args.camera)] = best
+            save_profiles(profiles, args.profiles)
+    cap.release()
+
+    for result in tuner.results:
+        print(
+            "%(fourcc)s %(width)dx%(height)d @%(fps)d buffers %(buffersize)d: "
+            "%(measured_fps).1f fps, %(latency_ms).1f ms" % result
+        )
+    print("best:", json.dumps(best))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import math
+import threading
+import time
+import input_backend
+
+
+class CursorActuator(threading.Thread):
+    """
+    Moves the cursor toward the latest requested target at a fixed rate on
+    its own thread, so callers never wait for cursor animation.
+
+    Attributes
+    ----------
+    rate : float
+        update rate in Hz.
+    smoothing : float
+        time constant in seconds of the exponential glide toward target,
+        independent of 'rate'.
+    max_age : float
+        targets older than this (seconds) are dropped instead of animated.
+    target : tuple
+        latest requested (x, y), None if nothing requested yet.
+    position : tuple
+        (x, y) cursor position as last set by this actuator.
+    dropped : int
+        no. of targets replaced or expired before being reached.
+    """
+
+    def __init__(self, rate=120.0, smoothing=0.03, max_age=0.25, move=None):
+        super().__init__(daemon=True)
+        self.rate = rate
+        self.smoothing = smoothing
+        self.max_age = max_age
+        self.move = move or (lambda x, y: input_backend.get_backend().move_to(x, y))
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.target = None
+        self.target_time = 0.0
+        self.position = None
+        self.pending = False
+        self.active = False
+        self.dropped = 0
+        self.running = True
+
+    def move_to(self, x, y):
+        """sets new target (x, y), returns immediately."""
+        with self.lock:
+            if self.pending:
+                self.dropped += 1
+            self.target = (x, y)
+            self.target_time = time.perf_counter()
+            self.pending = True
+            self.active = True
+        self.wake.set()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+    def run(self):
+        period = 1.0 / self.rate
+        alpha = 1.0 - math.exp(-period / self.smoothing)
+        if self.position is None:
+            self.position = tuple(input_backend.get_backend().position())
+        deadline = time.perf_counter()
+
+        while self.running:
+            self.wake.clear()
+            with self.lock:
+                target, target_time = self.target, self.target_time
+                active = self.active
+                self.pending = False
+                if active and time.perf_counter() - target_time > self.max_age:
+                    self.dropped += 1
+                    self.active = active = False
+
+            if not active:
+                self.wake.wait()
+                deadline = time.perf_counter()
+                continue
+
+            x, y = self.position
+            dx, dy = target[0] - x, target[1] - y
+            if dx * dx + dy * dy <= 0.25:
+                self.position = target
+            else:
+                self.position = (x + dx * alpha, y + dy * alpha)
+            new_x, new_y = round(self.position[0]), round(self.position[1])
+            if (round(x), round(y)) != (new_x, new_y):
+                self.move(new_x, new_y)
+
+            if self.position == target:
+                with self.lock:
+                    if not self.pending:
+                        self.active = False
+                continue
+
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.perf_counter()
@@ -0,0 +1,182 @@
+import math
+
+# tunable cursor profiles, 'filter' names an entry of 'FILTERS', 'gain'
+# scales filtered hand motion into cursor motion, every other key is passed
+# to the filter.
+PROFILES = {
+    "default": {
+        "filter": "one_euro",
+        "gain": 1.5,
+        "min_cutoff": 1.0,
+        "beta": 0.02,
+        "d_cutoff": 1.0,
+    },
+    "precise": {
+        "filter": "one_euro",
+        "gain": 1.0,
+        "min_cutoff": 0.5,
+        "beta": 0.005,
+        "d_cutoff": 1.0,
+    },
+    "kalman": {
+        "filter": "kalman",
+        "gain": 1.5,
+        "process_noise": 2.0e6,
+        "measurement_noise": 16.0,
+    },
+    "legacy": {"filter": "step", "gain": 1.0},
+}
+
+
+def smoothing_factor(cutoff, dt):
+    """returns exponential smoothing factor of a low-pass at 'cutoff' Hz."""
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    One Euro filter on 2D points, cutoff frequency rises with speed so slow
+    motion is smoothed strongly and fast motion has little lag.
+
+    Parameters
+    ----------
+    min_cutoff : float
+        cutoff in Hz at zero speed, lower removes more jitter.
+    beta : float
+        cutoff increase per px/s of speed, higher reduces lag.
+    d_cutoff : float
+        cutoff in Hz used for the speed estimate.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.t_prev = None
+        self.x_prev = None
+        self.dx_prev = (0.0, 0.0)
+
+    def filter(self, x, y, t):
+        """returns filtered (x, y) of point measured at time 't' (seconds)."""
+        if self.t_prev is None:
+            self.t_prev, self.x_prev = t, (x, y)
+            return x, y
+        dt = max(t - self.t_prev, 1e-4)
+        px, py = self.x_prev
+
+        a_d = smoothing_factor(self.d_cutoff, dt)
+        dx = self.dx_prev[0] + a_d * ((x - px) / dt - self.dx_prev[0])
+        dy = self.dx_prev[1] + a_d * ((y - py) / dt - self.dx_prev[1])
+
+        cutoff = self.min_cutoff + self.beta * math.hypot(dx, dy)
+        a = smoothing_factor(cutoff, dt)
+        fx, fy = px + a * (x - px), py + a * (y - py)
+
+        self.t_prev, self.x_prev, self.dx_prev = t, (fx, fy), (dx, dy)
+        return fx, fy
+
+
+class KalmanFilter:
+    """
+    Constant-velocity Kalman filter on 2D points, both axes are filtered
+    independently with state (position, velocity).
+
+    Parameters
+    ----------
+    process_noise : float
+        acceleration variance in px^2/s^4, higher follows faster changes.
+    measurement_noise : float
+        measurement variance in px^2, higher smooths more.
+    """
+
+    def __init__(self, process_noise=2.0e6, measurement_noise=16.0):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.reset()
+
+    def reset(self):
+        self.t_prev = None
+        self.state = None
+
+    def filter(self, x, y, t):
+        """returns filtered (x, y) of point measured at time 't' (seconds)."""
+        if self.t_prev is None:
+            self.t_prev = t
+            # per axis: position, velocity, covariance (p00, p01, p11)
+            self.state = [[x, 0.0, self.r, 0.0, 1.0e6], [y, 0.0, self.r, 0.0, 1.0e6]]
+            return x, y
+        dt = max(t - self.t_prev, 1e-4)
+        self.t_prev = t
+        out = []
+        for axis, z in zip(self.state, (x, y)):
+            pos, vel, p00, p01, p11 = axis
+            # predict
+            pos += vel * dt
+            p00 += dt * (2 * p01 + dt * p11) + self.q * dt**4 / 4
+            p01 += dt * p11 + self.q * dt**3 / 2
+            p11 += self.q * dt**2
+            # update
+            s = p00 + self.r
+            k0, k1 = p00 / s, p01 / s
+            innovation = z - pos
+            pos += k0 * innovation
+            vel += k1 * innovation
+            p00, p01, p11 = (1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01
+            axis[:] = [pos, vel, p00, p01, p11]
+            out.append(pos)
+        return tuple(out)
+
+
+class StepFilter:
+    """
+    Original frame-based damping: per-frame hand displacement is dropped
+    below 5 px, scaled by 0.07 * distance up to 30 px and by 2.1 beyond.
+    Depends on frame rate, kept for comparison.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.raw_prev = None
+        self.out = None
+
+    def filter(self, x, y, t):
+        if self.raw_prev is None:
+            self.raw_prev, self.out = (x, y), (x, y)
+            return x, y
+        dx, dy = x - self.raw_prev[0], y - self.raw_prev[1]
+        self.raw_prev = (x, y)
+        distsq = dx**2 + dy**2
+        if distsq <= 25:
+            ratio = 0
+        elif distsq <= 900:
+            ratio = 0.07 * (distsq ** (1 / 2))
+        else:
+            ratio = 2.1
+        self.out = (self.out[0] + dx * ratio, self.out[1] + dy * ratio)
+        return self.out
+
+
+FILTERS = {
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+    "step": StepFilter,
+}
+
+
+def make_filter(profile):
+    """
+    returns (filter, gain) for 'profile', name of an entry in 'PROFILES'
+    or a dict of the same form.
+    """
+    if isinstance(profile, str):
+        profile = PROFILES[profile]
+    params = dict(profile)
+    name = params.pop("filter")
+    gain = params.pop("gain", 1.0)
+    return FILTERS[name](**params), gain
@@ -0,0 +1,214 @@
+import threading
+import time
+import numpy as np
+import mediapipe as mp
+import camera_broker
+import hand_backends
+import vision_workers
+
+# 'vision_workers.KINDS' key and default options of every pooled model,
+# the hands options match the defaults of 'GestureController.hands_model'
+MODELS = {
+    "hands": {
+        "max_num_hands": 2,
+        "model_complexity": 1,
+        "min_detection_confidence": 0.5,
+        "min_tracking_confidence": 0.5,
+    },
+    "face_mesh": {"refine_landmarks": True},
+}
+
+# seconds 'DetectorPool.get' waits for the warm-up before giving up
+WARMUP_TIMEOUT = 30.0
+
+
+def model_key(kind, options):
+    """returns key of the pooled model of 'kind' loaded with 'options'."""
+    options = dict(options)
+    if kind == "hands":
+        options["backend"] = hand_backends.backend_name(options.get("backend"))
+    return kind, tuple(sorted(options.items()))
+
+
+def load_model(kind, options, workers=False):
+    """
+    returns new model of 'kind' for 'options', in a worker process if
+    'workers' is set. Option 'backend' selects the hand backend, only the
+    'solutions' one runs in a worker process.
+    """
+    options = dict(options)
+    backend = options.pop("backend", None)
+    if kind == "hands" and hand_backends.backend_name(backend) != "solutions":
+        return hand_backends.create_backend(backend, **options)
+    if workers:
+        return vision_workers.VisionWorker(kind, **options)
+    return vision_workers.KINDS[kind][0](mp, options)
+
+
+class PooledModel:
+    """
+    Model of a 'DetectorPool' handed to a controller, used like the
+    mediapipe solution. Closing it (or leaving its 'with' block) only
+    pauses it, the model itself stays loaded for the next activation.
+    """
+
+    def __init__(self, pool, kind, model):
+        self.pool = pool
+        self.kind = kind
+        self.model = model
+        self.asynchronous = getattr(model, "asynchronous", False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def process(self, image):
+        results = self.model.process(image)
+        self.pool.activated(self.kind)
+        return results
+
+    def submit(self, image, timestamp, callback):
+        """submits to an asynchronous model, see 'hand_backends.HandBackend'."""
+
+        def on_results(results, timestamp):
+            self.pool.activated(self.kind)
+            callback(results, timestamp)
+
+        self.model.submit(image, timestamp, on_results)
+
+    def close(self):
+        pass
+
+
+class DetectorPool:
+    """
+    Long-lived camera and detector models shared by all activations of the
+    gesture and eye controllers.
+
+    'start' loads the models in the background, runs a dummy inference on
+    each to warm it up and opens the camera of 'broker' paused, so starting
+    a controller only resumes the stream. Stopping a controller pauses the
+    camera and keeps the models.
+
+    Models are pooled per kind and options, 'start' loads each kind with
+    its 'MODELS' options, other options are loaded on first use.
+
+    Attributes
+    ----------
+    broker : Object of 'camera_broker.CameraBroker'
+        shared camera, opened by 'start'.
+    workers : bool
+        True to run the models in 'vision_workers.VisionWorker' processes.
+    ready : Object of 'threading.Event'
+        set once the warm-up finished, successfully or not.
+    error : Exception
+        error the warm-up failed with, None if it did not fail.
+    warmup_time : float
+        seconds 'start' took to load and warm up everything.
+    activations : list
+        (kind, warm, seconds) from every 'activate' call to the first frame
+        processed by the model of 'kind', warm is True if the pool was
+        ready when activated.
+    """
+
+    def __init__(self, broker, kinds=("hands", "face_mesh"), workers=False):
+        self.broker = broker
+        self.kinds = kinds
+        self.workers = workers
+        self.models = {}
+        self.ready = threading.Event()
+        self.warmup_time = None
+        self.error = None
+        self.pending = {}
+        self.activations = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        """loads and warms up models and camera on a background thread."""
+        threading.Thread(target=self.warm_up, daemon=True).start()
+
+    def warm_up(self):
+        start = time.perf_counter()
+        try:
+            try:
+                self.broker.warm()
+            except RuntimeError as e:
+                print("Camera not prewarmed: %s" % e)
+            shape = self.broker.ring.shape if self.broker.ring else (480, 640, 3)
+            dummy = np.zeros(shape, np.uint8)
+            for kind in self.kinds:
+                model = load_model(kind, MODELS[kind], self.workers)
+                model.process(dummy)
+                self.models[model_key(kind, MODELS[kind])] = PooledModel(
+                    self, kind, model
+                )
+        except Exception as e:
+            self.error = e
+            print("Detector pool warm-up failed: %s" % e)
+        finally:
+            # a failed warm-up must not block 'get' forever
+            self.warmup_time = time.perf_counter() - start
+            self.ready.set()
+        if self.error is None:
+            print("Detector pool ready in %.0f ms." % (self.warmup_time * 1000))
+
+    def get(self, kind, timeout=WARMUP_TIMEOUT, **options):
+        """
+        returns 'PooledModel' of 'kind' for 'options', default 'MODELS',
+        waits up to 'timeout' seconds until the pool is ready. A model the
+        pool has none of yet is loaded cold and kept, in this process if
+        the warm-up failed.
+        """
+        if not self.ready.wait(timeout):
+            raise RuntimeError("detector pool not ready after %.0f s" % timeout)
+        options = options or MODELS[kind]
+        key = model_key(kind, options)
+        if key not in self.models:
+            print("Loading %s cold, the pool has none for %s." % (kind, options))
+            workers = self.workers and self.error is None
+            model = load_model(kind, options, workers)
+            self.models[key] = PooledModel(self, kind, model)
+        return self.models[key]
+
+    def capture(self):
+        """returns new 'camera_broker.BrokerCapture' of the shared camera."""
+        return camera_broker.BrokerCapture(self.broker)
+
+    def activate(self, kind):
+        """starts timing an activation until the first frame of 'kind'."""
+        with self.lock:
+            self.pending[kind] = (self.ready.is_set(), time.perf_counter())
+
+    def activated(self, kind):
+        if kind not in self.pending:
+            return
+        with self.lock:
+            warm, start = self.pending.pop(kind, (None, None))
+            if start is None:
+                return
+            seconds = time.perf_counter() - start
+            self.activations.append((kind, warm, seconds))
+        print(
+            "%s activated in %.0f ms (%s)."
+            % (kind, seconds * 1000, "warm" if warm else "cold")
+        )
+
+    def report(self):
+        """returns dict of warm-up and mean cold / warm activation ms per kind."""
+        report = {"warmup_ms": round((self.warmup_time or 0.0) * 1000, 1)}
+        for kind, warm, seconds in self.activations:
+            key = "%s_%s_ms" % (kind, "warm" if warm else "cold")
+            report.setdefault(key, []).append(seconds * 1000)
+        for key, values in report.items():
+            if isinstance(values, list):
+                report[key] = round(float(np.mean(values)), 1)
+        return report
+
+    def close(self):
+        for pooled in self.models.values():
+            pooled.model.close()
+        self.models = {}
+        self.ready.clear()
+        self.broker.close()
@@ -1,63 +1,154 @@
 import cv2
 import mediapipe as mp
-import pyautogui
+import time
+import camera_tuner
+import frame_prep
+import input_backend
+import metrics
+import preview
+import vision_workers
 from threading import Thread
 
+# face mesh landmarks of the iris the cursor follows and of the eyelids
+# that click, the same eyes as on the mirrored frame the face mesh used to
+# run on, now that it runs on the unmirrored frame
+IRIS = slice(469, 473)
+EYELIDS = (374, 386)
+
+
+def draw_marks(image, marks):
+    """draws (x, y, color) 'marks' as circles on 'image' and returns it."""
+    for x, y, color in marks:
+        cv2.circle(image, (x, y), 3, color)
+    return image
+
 
 class EyeController:
     gc_mode = False
+    render_mode = "window"
+    preview_rate = 10.0
+    # 'frame_scheduler.FrameScheduler', paces the loop if set, else the camera
+    frame_scheduler = None
+    # 'idle_gate.IdleScheduler', skips inference while no face moves in view
+    idle_scheduler = None
+    # run face mesh inference in a 'vision_workers.VisionWorker' process
+    inference_workers = False
+    # 'detector_pool.DetectorPool', its prewarmed face mesh is used if set
+    detector_pool = None
+    # frame counts and capture, inference and actuation latency
+    stats = metrics.StageMetrics("eye")
 
-    def __init__(self):
-        self.face_mesh = mp.solutions.face_mesh.FaceMesh(refine_landmarks=True)
+    def __init__(self, cam=None):
+        # 'cam' is any 'cv2.VideoCapture'-like capture, e.g. a shared
+        # 'camera_broker.BrokerCapture', camera 0 is opened with its
+        # 'camera_tuner' profile if None
+        if EyeController.detector_pool:
+            # taken from the pool in 'start', off the caller's thread
+            self.face_mesh = None
+        elif EyeController.inference_workers:
+            self.face_mesh = vision_workers.VisionWorker(
+                "face_mesh", refine_landmarks=True
+            )
+        else:
+            self.face_mesh = mp.solutions.face_mesh.FaceMesh(refine_landmarks=True)
         self.mp_drawing = mp.solutions.drawing_utils
 
-        self.cam = cv2.VideoCapture(0)
-        self.screen_w, self.screen_h = pyautogui.size()
+        self.cam = cam if cam is not None else camera_tuner.open_capture(0)
+        self.inputs = input_backend.get_backend()
+        self.screen_w, self.screen_h = self.inputs.size()
 
     def start(self):
         EyeController.gc_mode = True
+        renderer = preview.make_renderer(
+            EyeController.render_mode, EyeController.preview_rate, stop_keys=(27,)
+        )
+        scheduler = EyeController.idle_scheduler
+        prep = frame_prep.FramePrep()
+        stats = EyeController.stats
+        pacer = EyeController.frame_scheduler
+        if pacer:
+            pacer.reset()
+        if self.face_mesh is None:
+            self.face_mesh = EyeController.detector_pool.get("face_mesh")
         while EyeController.gc_mode:
 
-            ret, image = self.cam.read()
+            if pacer:
+                skipped = pacer.wait()
+                if skipped:
+                    stats.drop("overrun", skipped)
+            if scheduler:
+                scheduler.wait()
+            with stats.time("capture"):
+                ret, image = prep.read(self.cam)
             if not ret:
+                stats.drop("empty")
                 break
+            stats.frame()
+            if scheduler and not scheduler.should_infer(image):
+                stats.drop("idle")
+                if EyeController.render_mode == "window":
+                    cv2.waitKey(1)
+                continue
 
-            image = cv2.flip(image, 1)
             window_h, window_w, _ = image.shape
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            processed_image = self.face_mesh.process(rgb_image)
+            with stats.time("inference"):
+                processed_image = self.face_mesh.process(prep.to_rgb(image))
             all_faces_landmarks_points = processed_image.multi_face_landmarks
+            prep.mirror_landmarks(all_faces_landmarks_points)
+            marks = []
+            if scheduler:
+                scheduler.update(bool(all_faces_landmarks_points))
 
             if all_faces_landmarks_points:
                 one_face_landmark_point = all_faces_landmarks_points[0].landmark
 
-                for id, landmark_point in enumerate(one_face_landmark_point[474:478]):
+                for id, landmark_point in enumerate(one_face_landmark_point[IRIS]):
                     x = int(landmark_point.x * window_w)
                     y = int(landmark_point.y * window_h)
 
                     if id == 1:
                         mouse_x = int(self.screen_w / window_w * x)
                         mouse_y = int(self.screen_h / window_h * y)
-                        pyautogui.moveTo(mouse_x, mouse_y)
+                        with stats.time("actuation"):
+                            self.inputs.move_to(mouse_x, mouse_y)
 
-                    cv2.circle(image, (x, y), 3, (0, 0, 225))
+                    marks.append((x, y, (0, 0, 225)))
 
-                left_eye = [one_face_landmark_point[145], one_face_landmark_point[159]]
+                left_eye = [one_face_landmark_point[i] for i in EYELIDS]
                 for landmark_point in left_eye:
                     x = int(landmark_point.x * window_w)
                     y = int(landmark_point.y * window_h)
-                    cv2.circle(image, (x, y), 3, (0, 225, 225))
+                    marks.append((x, y, (0, 225, 225)))
 
                 if left_eye[0].y - left_eye[1].y < 0.01:
-                    pyautogui.click()
-                    pyautogui.sleep(2)
+                    self.inputs.click()
+                    time.sleep(2)
                     print("Mouse clicked")
 
-            cv2.imshow("Eye Control Mouse", image)
-            key = cv2.waitKey(100)
-            if key == 27:
-                break
+            if EyeController.render_mode == "window":
+                cv2.imshow("Eye Control Mouse", draw_marks(prep.preview(image), marks))
+                key = cv2.waitKey(100)
+                if key == 27:
+                    break
+            elif renderer is not None:
+                if renderer.due():
+                    view = prep.preview(image, copy=True)
+                    renderer.submit(
+                        lambda view=view, marks=marks: [
+                            ("Eye Control Mouse", draw_marks(view, marks))
+                        ]
+                    )
+                if renderer.stop_requested:
+                    break
 
+        if renderer is not None:
+            renderer.stop()
+        if pacer:
+            print("Frame scheduler:", pacer.report())
+        if scheduler:
+            print("Idle scheduler:", scheduler.report())
+        self.face_mesh.close()
         self.cam.release()
-        cv2.destroyAllWindows()
+        if EyeController.render_mode == "window":
+            preview.destroy_windows(["Eye Control Mouse"])
         EyeController.gc_mode = False
\ No newline at end of file
@@ -0,0 +1,118 @@
+import threading
+import time
+
+
+class LatestFrame:
+    """
+    Single-slot hand-off buffer, a newer item always replaces an older one
+    that was not taken yet ("latest frame wins").
+
+    Attributes
+    ----------
+    seq : int
+        sequence number of the newest item put into the slot.
+    dropped : int
+        no. of items overwritten before a consumer took them.
+    closed : bool
+        true once 'close' is called, wakes up all waiting consumers.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.item = None
+        self.seq = 0
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        """stores 'item' as newest, counts the previous one as dropped if unread."""
+        with self.cond:
+            if self.item is not None:
+                self.dropped += 1
+            self.item = item
+            self.seq += 1
+            self.cond.notify_all()
+
+    def take(self, timeout=None):
+        """
+        returns (seq, item) of newest unread item and empties the slot.
+
+        Blocks until an item is available, returns None on timeout or
+        when the slot is closed.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.item is not None or self.closed, timeout)
+            if self.item is None:
+                return None
+            item, self.item = self.item, None
+            return self.seq, item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class CaptureThread(threading.Thread):
+    """
+    Continuously grabs frames from 'cap' into a 'LatestFrame' slot so the
+    driver queue never fills up while downstream stages are busy.
+
+    Items put into the slot are tuples (timestamp, image), timestamp
+    taken with 'time.perf_counter' right after the read returned. If given,
+    'pace' is called before every read and may sleep to lower the rate.
+    """
+
+    def __init__(self, cap, slot, pace=None):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.slot = slot
+        self.pace = pace
+        self.running = True
+        self.frames = 0
+        self.failed = 0
+
+    def run(self):
+        while self.running and self.cap.isOpened():
+            if self.pace is not None:
+                self.pace()
+            success, image = self.cap.read()
+            if not success:
+                self.failed += 1
+                if self.failed == 1:
+                    print("Ignoring Empty Camera Frame.")
+                continue
+            self.frames += 1
+            self.slot.put((time.perf_counter(), image))
+        self.slot.close()
+
+    def stop(self):
+        self.running = False
+
+
+class StageThread(threading.Thread):
+    """
+    Runs 'handler(item)' for the newest item of 'slot' until stopped,
+    items that arrive while 'handler' is busy are dropped by the slot.
+    """
+
+    def __init__(self, slot, handler):
+        super().__init__(daemon=True)
+        self.slot = slot
+        self.handler = handler
+        self.running = True
+        self.handled = 0
+
+    def run(self):
+        while self.running:
+            taken = self.slot.take(timeout=0.5)
+            if taken is None:
+                if self.slot.closed:
+                    break
+                continue
+            self.handler(taken[1])
+            self.handled += 1
+
+    def stop(self):
+        self.running = False
+        self.slot.close()
@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+
+HANDEDNESS_SWAP = {"Left": "Right", "Right": "Left"}
+
+
+class FramePrep:
+    """
+    Prepares camera frames for mediapipe without per-frame allocations.
+
+    Frames are read and converted to RGB into buffers that are reused for
+    every frame, the image is never flipped. With 'mirror' set, landmarks
+    are mirrored instead ('x' becomes '1 - x') and handedness labels are
+    swapped, which gives the same results as running on a flipped image.
+    A mirrored BGR image is only produced by 'preview' when a preview is
+    actually shown.
+
+    Attributes
+    ----------
+    mirror : bool
+        True to mirror results like a selfie view, default True.
+    frame : ndarray
+        reused capture buffer of 'read'.
+    rgb : ndarray
+        reused, read-only RGB buffer returned by 'to_rgb'.
+    view : ndarray
+        reused BGR buffer returned by 'preview'.
+    """
+
+    def __init__(self, mirror=True):
+        self.mirror = mirror
+        self.frame = None
+        self.rgb = None
+        self.view = None
+
+    def read(self, cap):
+        """returns (success, frame) of 'cap.read' into the reused 'frame' buffer."""
+        success, frame = cap.read(self.frame)
+        if success:
+            self.frame = frame
+        return success, frame
+
+    def to_rgb(self, frame):
+        """returns BGR 'frame' converted to RGB in the reused 'rgb' buffer."""
+        if self.rgb is None or self.rgb.shape != frame.shape:
+            self.rgb = np.empty(frame.shape, np.uint8)
+        self.rgb.flags.writeable = True
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, self.rgb)
+        self.rgb.flags.writeable = False
+        return self.rgb
+
+    def mirror_landmarks(self, landmark_lists):
+        """mirrors x of every landmark of 'landmark_lists' in place."""
+        if not self.mirror:
+            return
+        for landmarks in landmark_lists or []:
+            for lm in landmarks.landmark:
+                lm.x = 1.0 - lm.x
+
+    def mirror_hands(self, results):
+        """mirrors landmarks and swaps handedness of hand 'results' in place."""
+        if not self.mirror:
+            return results
+        self.mirror_landmarks(results.multi_hand_landmarks)
+        for handedness in results.multi_handedness or []:
+            for category in handedness.classification:
+                category.label = HANDEDNESS_SWAP.get(category.label, category.label)
+        return results
+
+    def preview(self, frame, copy=False):
+        """
+        returns BGR 'frame' mirrored like the landmarks, in the reused 'view'
+        buffer or in a new array if 'copy' is set (e.g. when it is drawn on
+        another thread).
+        """
+        if copy:
+            return cv2.flip(frame, 1) if self.mirror else frame.copy()
+        if self.view is None or self.view.shape != frame.shape:
+            self.view = np.empty(frame.shape, np.uint8)
+        if self.mirror:
+            cv2.flip(frame, 1, self.view)
+        else:
+            np.copyto(self.view, frame)
+        return self.view
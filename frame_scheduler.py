@@ -0,0 +1,83 @@
+import time
+from collections import deque
+import numpy as np
+
+
+class FrameScheduler:
+    """
+    Paces a loop at 'fps' on absolute deadlines, frame k is due at
+    start + k / fps, so waiting does not accumulate drift.
+
+    'wait' sleeps until shortly before the deadline and spins the rest,
+    the spin margin is the 90th percentile of how much the OS oversleeps
+    (plus 'spin'), so the loop wakes precisely with the CPU idle for most
+    of the wait.
+
+    If a frame overran by more than 'max_lag' frame intervals, the missed
+    deadlines are skipped and the schedule continues from the next one in
+    phase, instead of running frames back to back to catch up.
+
+    Attributes
+    ----------
+    frames : int
+        no. of deadlines met (waited for).
+    skipped : int
+        no. of deadlines skipped after overruns.
+    lateness : deque
+        seconds 'wait' returned after each deadline, last 'history' frames.
+    """
+
+    def __init__(self, fps=30.0, spin=0.0005, max_lag=1.0, history=1000):
+        self.interval = 1.0 / fps
+        self.spin = spin
+        self.max_lag = max_lag
+        self.oversleep = 0.001
+        self.deadline = None
+        self.frames = 0
+        self.skipped = 0
+        self.lateness = deque(maxlen=history)
+
+    def reset(self):
+        """starts a new schedule with the next 'wait' due immediately."""
+        self.deadline = None
+
+    def wait(self):
+        """blocks until the next frame is due, returns no. of deadlines skipped."""
+        now = time.perf_counter()
+        if self.deadline is None:
+            self.deadline = now
+        skipped = 0
+        lag = now - self.deadline
+        if lag > self.max_lag * self.interval:
+            skipped = int(lag / self.interval)
+            self.deadline += skipped * self.interval
+            self.skipped += skipped
+
+        margin = min(self.oversleep + self.spin, self.interval / 4)
+        if self.deadline - now > margin:
+            target = self.deadline - margin
+            time.sleep(target - now)
+            # tracks the 90th percentile of the oversleep in 0.1 ms steps
+            if time.perf_counter() - target > self.oversleep:
+                self.oversleep += 0.0001
+            else:
+                self.oversleep = max(self.oversleep - 0.0001 / 9, 0.0)
+        while time.perf_counter() < self.deadline:
+            pass
+
+        self.lateness.append(max(time.perf_counter() - self.deadline, 0.0))
+        self.frames += 1
+        self.deadline += self.interval
+        return skipped
+
+    def report(self):
+        """returns dict of frames, skipped deadlines and lateness jitter in ms."""
+        report = {"frames": self.frames, "skipped": self.skipped}
+        if self.lateness:
+            lateness = np.array(self.lateness) * 1000
+            report["jitter_ms"] = {
+                "mean": round(float(lateness.mean()), 3),
+                "p99": round(float(np.percentile(lateness, 99)), 3),
+                "max": round(float(lateness.max()), 3),
+            }
+        return report
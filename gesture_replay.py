@@ -0,0 +1,196 @@
+import sys
+import time
+from contextlib import contextmanager
+import numpy as np
+import input_backend
+import vision_workers
+from Gesture_Controller import Controller, GestureController, HandRecog, HLabel
+from hand_tracking import HandTracker
+
+LABELS = vision_workers.LABELS
+
+
+class SessionRecorder:
+    """
+    Records mediapipe hand landmarks and handedness of every frame, saved
+    as a compressed '.npz' session.
+
+    Session arrays
+    --------------
+    timestamps : (N,) float64
+        'time.perf_counter' of every frame.
+    hand_count : (N,) int8
+        no. of hands detected in every frame.
+    landmarks : (N, 2, 21, 3) float32
+        x, y, z of every landmark, in mediapipe's order of hands.
+    labels : (N, 2) int8
+        handedness, index into 'LABELS'.
+    scores : (N, 2) float32
+        handedness score.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.timestamps = []
+        self.hand_count = []
+        self.landmarks = []
+        self.labels = []
+        self.scores = []
+
+    def add(self, results, timestamp=None):
+        """appends landmarks of 'results' returned by 'mp_hands.Hands.process'."""
+        landmarks = np.zeros((2, 21, 3), np.float32)
+        labels = np.zeros(2, np.int8)
+        scores = np.zeros(2, np.float32)
+        hands = results.multi_hand_landmarks or []
+        handedness = results.multi_handedness or []
+        count = min(len(hands), 2)
+        for idx in range(count):
+            landmarks[idx].flat = [
+                v for lm in hands[idx].landmark for v in (lm.x, lm.y, lm.z)
+            ]
+            classification = handedness[idx].classification[0]
+            labels[idx] = LABELS.index(classification.label)
+            scores[idx] = classification.score
+
+        self.timestamps.append(time.perf_counter() if timestamp is None else timestamp)
+        self.hand_count.append(count)
+        self.landmarks.append(landmarks)
+        self.labels.append(labels)
+        self.scores.append(scores)
+
+    def save(self):
+        np.savez_compressed(
+            self.path,
+            timestamps=np.array(self.timestamps, np.float64),
+            hand_count=np.array(self.hand_count, np.int8),
+            landmarks=np.array(self.landmarks, np.float32).reshape(-1, 2, 21, 3),
+            labels=np.array(self.labels, np.int8).reshape(-1, 2),
+            scores=np.array(self.scores, np.float32).reshape(-1, 2),
+        )
+        print("Saved %d frames to %s" % (len(self.timestamps), self.path))
+
+
+def load_session(path):
+    """returns list of mediapipe-like results objects stored in session 'path'."""
+    data = np.load(path)
+    frames = []
+    for idx in range(len(data["timestamps"])):
+        count = data["hand_count"][idx]
+        results = vision_workers.hand_results(
+            data["landmarks"][idx, :count],
+            data["labels"][idx, :count],
+            data["scores"][idx, :count],
+        )
+        results.timestamp = float(data["timestamps"][idx])
+        frames.append(results)
+    return frames
+
+
+class MockActuator(input_backend.FakeBackend):
+    """
+    Input backend that also stands in for the system volume / brightness
+    controls of 'Controller', logs every call instead of executing it.
+
+    Attributes
+    ----------
+    events : list
+        (frame, name, args) tuples in the order they were emitted.
+    frame : int
+        index of frame being replayed, stamped on every event.
+    """
+
+    def __init__(self, screen_size=(1920, 1080)):
+        super().__init__(screen_size)
+        self.frame = 0
+
+    def log(self, name, *args):
+        self.events.append((self.frame, name, args))
+
+    def changesystembrightness(self):
+        self.log("brightness", Controller.pinchlv)
+
+    def changesystemvolume(self):
+        self.log("volume", Controller.pinchlv)
+
+
+CONTROLLER_DEFAULTS = {
+    name: value
+    for name, value in vars(Controller).items()
+    if not name.startswith("_") and not callable(value)
+}
+
+
+def reset_controller():
+    """restores all 'Controller' state and the hand tracker to their defaults."""
+    for name, value in CONTROLLER_DEFAULTS.items():
+        setattr(Controller, name, value)
+    GestureController.tracker = HandTracker()
+
+
+@contextmanager
+def mock_controls(actuator):
+    """routes all actuation of 'Controller' to 'actuator' while active."""
+    saved = {
+        "changesystembrightness": Controller.changesystembrightness,
+        "changesystemvolume": Controller.changesystemvolume,
+        "move_cursor": Controller.move_cursor,
+    }
+    saved["backend"] = input_backend.set_backend(actuator)
+    Controller.move_cursor = actuator.move_to
+    Controller.changesystembrightness = actuator.changesystembrightness
+    Controller.changesystemvolume = actuator.changesystemvolume
+    try:
+        yield actuator
+    finally:
+        input_backend.set_backend(saved["backend"])
+        Controller.changesystembrightness = saved["changesystembrightness"]
+        Controller.changesystemvolume = saved["changesystemvolume"]
+        Controller.move_cursor = saved["move_cursor"]
+
+
+def replay(frames, actuator=None):
+    """
+    feeds 'frames' from 'load_session' through 'HandRecog' and 'Controller'
+    as fast as possible.
+
+    Returns
+    -------
+    tuple(list, float)
+        events logged by the actuator and gesture logic throughput in frames/s.
+    """
+    actuator = actuator or MockActuator()
+    reset_controller()
+    handmajor = HandRecog(HLabel.MAJOR)
+    handminor = HandRecog(HLabel.MINOR)
+    with mock_controls(actuator):
+        start = time.perf_counter()
+        for idx, results in enumerate(frames):
+            actuator.frame = idx
+            if results.multi_hand_landmarks:
+                gest_name, hand_result = GestureController.process_hands(
+                    results, handmajor, handminor, results.timestamp
+                )
+                Controller.handle_controls(gest_name, hand_result, results.timestamp)
+            else:
+                Controller.prev_hand = None
+        elapsed = time.perf_counter() - start
+
+    fps = len(frames) / elapsed if elapsed > 0 else float("inf")
+    return actuator.events, fps
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("record", "replay"):
+        print("usage: python gesture_replay.py record|replay <session.npz>")
+        sys.exit(1)
+
+    if sys.argv[1] == "record":
+        GestureController.recorder = SessionRecorder(sys.argv[2])
+        GestureController().start()
+    else:
+        frames = load_session(sys.argv[2])
+        events, fps = replay(frames)
+        for event in events:
+            print(*event)
+        print("%d frames, %d events, %.1f frames/s" % (len(frames), len(events), fps))
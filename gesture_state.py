@@ -0,0 +1,66 @@
+class GestureDebouncer:
+    """
+    Confirms gestures by elapsed time instead of frame count, so the delay
+    from a gesture to its action does not depend on the camera frame rate.
+
+    'rules' maps a gesture to a dict with any of
+
+    dwell : float
+        seconds a new gesture must be seen before it is confirmed.
+    release : float
+        seconds a different gesture must be seen before this one, once
+        confirmed, is left. Adds hysteresis to gestures that are easy to
+        lose for a frame or two, e.g. a fist while dragging.
+    min_confidence : float
+        frames with a lower detection confidence are ignored, they neither
+        start nor confirm a gesture.
+
+    missing keys are taken from 'rules["default"]'.
+
+    Attributes
+    ----------
+    state : int
+        confirmed gesture.
+    candidate : int
+        gesture seen in the last accepted frame.
+    since : float
+        timestamp at which 'candidate' was first seen.
+    """
+
+    DEFAULT_RULE = {"dwell": 0.1, "release": 0.0, "min_confidence": 0.0}
+
+    def __init__(self, rules, initial):
+        self.rules = rules
+        self.initial = initial
+        self.reset()
+
+    def reset(self):
+        self.state = self.initial
+        self.candidate = self.initial
+        self.since = None
+
+    def rule(self, gesture, key):
+        """returns value of 'key' in the rule for 'gesture'."""
+        rule = self.rules.get(gesture, {})
+        if key in rule:
+            return rule[key]
+        return self.rules.get("default", {}).get(key, self.DEFAULT_RULE[key])
+
+    def hold_time(self, gesture):
+        """returns seconds 'gesture' must be seen to replace 'state'."""
+        return max(self.rule(gesture, "dwell"), self.rule(self.state, "release"))
+
+    def update(self, gesture, timestamp, confidence=1.0):
+        """
+        feeds 'gesture' seen at 'timestamp' (seconds) with detection
+        'confidence', returns confirmed gesture.
+        """
+        if confidence < self.rule(gesture, "min_confidence"):
+            return self.state
+        if gesture != self.candidate or self.since is None:
+            self.candidate = gesture
+            self.since = timestamp
+        held = timestamp - self.since
+        if gesture != self.state and held >= self.hold_time(gesture):
+            self.state = gesture
+        return self.state
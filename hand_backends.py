@@ -0,0 +1,189 @@
+import os
+import threading
+import numpy as np
+import mediapipe as mp
+import vision_workers
+
+TASK_MODEL_URL = (
+    "https://storage.googleapis.com/mediapipe-models/hand_landmarker/"
+    "hand_landmarker/float16/latest/hand_landmarker.task"
+)
+
+
+class HandBackend:
+    """
+    Hand landmark model returning results like 'mp_hands.Hands.process'.
+
+    'submit' hands an RGB frame captured at 'timestamp' (seconds) to the
+    model, 'callback(results, timestamp)' is called with its results, on
+    the caller's thread by synchronous backends and on a model thread by
+    asynchronous ones. Asynchronous backends may drop frames while busy,
+    their callback is then never called for those frames.
+
+    Attributes
+    ----------
+    asynchronous : bool
+        True if 'submit' returns before the results are ready.
+    """
+
+    asynchronous = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def process(self, image):
+        """returns results for RGB 'image', waiting for them."""
+        raise NotImplementedError
+
+    def submit(self, image, timestamp, callback):
+        callback(self.process(image), timestamp)
+
+    def close(self):
+        pass
+
+
+class SolutionsBackend(HandBackend):
+    """Legacy synchronous 'mp.solutions.hands.Hands' graph."""
+
+    def __init__(
+        self,
+        max_num_hands=2,
+        model_complexity=1,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+    ):
+        self.hands = mp.solutions.hands.Hands(
+            max_num_hands=max_num_hands,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+
+    def process(self, image):
+        return self.hands.process(image)
+
+    def close(self):
+        self.hands.close()
+
+
+class TasksBackend(HandBackend):
+    """
+    MediaPipe Tasks 'HandLandmarker' in LIVE_STREAM mode, frames are
+    detected asynchronously and results delivered to the callback of
+    'submit' as soon as they are ready, newer frames replace frames the
+    model had no time for.
+
+    The Tasks API has no model complexity setting, 'model_complexity'
+    selects the model file of 'model_paths' instead, downloaded from
+    'TASK_MODEL_URL' (or a lighter variant) by the user.
+
+    Attributes
+    ----------
+    submitted : int
+        no. of frames submitted.
+    delivered : int
+        no. of results delivered.
+    """
+
+    asynchronous = True
+    model_paths = {
+        0: os.path.join("models", "hand_landmarker_lite.task"),
+        1: os.path.join("models", "hand_landmarker.task"),
+    }
+
+    def __init__(
+        self,
+        max_num_hands=2,
+        model_complexity=1,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+        model_path=None,
+    ):
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        model_path = model_path or TasksBackend.model_paths[model_complexity]
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                "hand landmarker model %r not found, download it from %s"
+                % (model_path, TASK_MODEL_URL)
+            )
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self.on_result,
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_ms = -1
+        self.submitted = 0
+        self.delivered = 0
+
+    def submit(self, image, timestamp, callback):
+        timestamp_ms = max(int(timestamp * 1000), self.last_ms + 1)
+        self.last_ms = timestamp_ms
+        with self.lock:
+            self.pending[timestamp_ms] = (timestamp, callback)
+            self.submitted += 1
+        frame = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
+        self.landmarker.detect_async(frame, timestamp_ms)
+
+    def on_result(self, result, image, timestamp_ms):
+        with self.lock:
+            timestamp, callback = self.pending.pop(timestamp_ms, (None, None))
+            # frames submitted before this one were dropped by the model
+            for stale in [ms for ms in self.pending if ms < timestamp_ms]:
+                del self.pending[stale]
+            self.delivered += 1
+        if callback is not None:
+            callback(TasksBackend.to_results(result), timestamp)
+
+    def to_results(result):
+        """returns 'HandLandmarkerResult' converted to solutions-like results."""
+        landmarks = np.array(
+            [[(lm.x, lm.y, lm.z) for lm in hand] for hand in result.hand_landmarks],
+            np.float32,
+        ).reshape(-1, 21, 3)
+        categories = [hand[0] for hand in result.handedness]
+        labels = [vision_workers.LABELS.index(c.category_name) for c in categories]
+        scores = [c.score for c in categories]
+        return vision_workers.hand_results(landmarks, labels, scores)
+
+    def process(self, image, timeout=1.0):
+        done = threading.Event()
+        box = []
+
+        def deliver(results, timestamp):
+            box.append(results)
+            done.set()
+
+        self.submit(image, self.last_ms / 1000 + 0.001, deliver)
+        if done.wait(timeout):
+            return box[0]
+        return vision_workers.hand_results([], [], [])
+
+    def close(self):
+        self.landmarker.close()
+
+
+BACKENDS = {"solutions": SolutionsBackend, "tasks": TasksBackend}
+
+
+def backend_name(name=None):
+    """
+    returns 'name' of a hand backend, default from environment variable
+    'PHOENIX_HAND_BACKEND' or 'solutions'.
+    """
+    return name or os.environ.get("PHOENIX_HAND_BACKEND") or "solutions"
+
+
+def create_backend(name=None, **options):
+    """returns new hand backend named 'name' ('solutions' or 'tasks')."""
+    return BACKENDS[backend_name(name)](**options)
@@ -0,0 +1,89 @@
+import numpy as np
+
+# landmark pairs (A, B) measured on every frame, distances are taken in the
+# x-y plane and signed positive when A lies above B in the image.
+#   0-3  finger tip -> middle knuckle (index, middle, ring, pinky)
+#   4-7  middle knuckle -> wrist
+#   8    index tip -> thumb tip
+#   9    index tip -> middle tip
+#   10   index base knuckle -> middle base knuckle
+PAIR_A = np.array([8, 12, 16, 20, 5, 9, 13, 17, 8, 8, 5])
+PAIR_B = np.array([5, 9, 13, 17, 0, 0, 0, 0, 4, 12, 9])
+
+FINGER_BITS = np.array([8, 4, 2, 1])
+
+
+class HandFeatures:
+    """
+    Computes gesture features of all hands in one vectorized pass.
+
+    Landmarks of every hand are copied once per frame into a preallocated
+    '(max_hands, 21, 3)' array, 'compute' then fills one feature vector per
+    hand, layout of a vector is given by the 'RATIO', 'PINCH', 'SPREAD' and
+    'DZ' indices.
+
+    Attributes
+    ----------
+    landmarks : ndarray
+        (max_hands, 21, 3) float32, x, y, z of every landmark.
+    present : ndarray
+        (max_hands,) bool, true if slot holds a hand for current frame.
+    features : ndarray
+        (max_hands, SIZE) float32, feature vector of every slot.
+    """
+
+    RATIO = slice(0, 4)
+    PINCH = 4
+    SPREAD = 5
+    DZ = 6
+    SIZE = 7
+
+    def __init__(self, max_hands=2):
+        self.landmarks = np.zeros((max_hands, 21, 3), np.float32)
+        self.present = np.zeros(max_hands, bool)
+        self.features = np.zeros((max_hands, HandFeatures.SIZE), np.float32)
+
+    def load(self, slot, hand_result):
+        """copies landmarks of 'hand_result' (mediapipe landmark list) into 'slot'."""
+        if hand_result is None:
+            self.present[slot] = False
+            return
+        self.landmarks[slot].flat = [
+            v for lm in hand_result.landmark for v in (lm.x, lm.y, lm.z)
+        ]
+        self.present[slot] = True
+
+    def load_array(self, slot, landmarks):
+        """copies a (21, 3) array of landmarks into 'slot', None clears it."""
+        if landmarks is None:
+            self.present[slot] = False
+            return
+        self.landmarks[slot] = landmarks
+        self.present[slot] = True
+
+    def compute(self):
+        """
+        fills 'features' for all slots at once and returns it.
+
+        Slots without a hand are computed too (on stale data) and should be
+        ignored using 'present'.
+        """
+        lm = self.landmarks
+        diff = lm[:, PAIR_A, :2] - lm[:, PAIR_B, :2]
+        dist = np.sqrt(np.einsum("hpk,hpk->hp", diff, diff))
+        signed = np.where(lm[:, PAIR_A, 1] < lm[:, PAIR_B, 1], dist, -dist)
+
+        tip = signed[:, 0:4]
+        base = signed[:, 4:8]
+        base = np.where(base == 0, 0.01, base)
+        self.features[:, HandFeatures.RATIO] = np.round(tip / base, 1)
+
+        self.features[:, HandFeatures.PINCH] = dist[:, 8]
+        spread_base = np.where(dist[:, 10] == 0, 0.01, dist[:, 10])
+        self.features[:, HandFeatures.SPREAD] = dist[:, 9] / spread_base
+        self.features[:, HandFeatures.DZ] = np.abs(lm[:, 8, 2] - lm[:, 12, 2])
+        return self.features
+
+    def finger_state(features):
+        """returns bitmask of open fingers (index is MSB) from a feature vector."""
+        return int(np.dot(features[HandFeatures.RATIO] > 0.5, FINGER_BITS))
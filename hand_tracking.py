@@ -0,0 +1,142 @@
+import itertools
+import math
+import time
+
+
+class HandTrack:
+    """
+    One hand followed over frames.
+
+    Attributes
+    ----------
+    track_id : int
+        id of the hand, kept as long as the hand is tracked.
+    label : str
+        'Left' or 'Right', switches only with consistent evidence.
+    right : float
+        smoothed probability of the hand being a right hand.
+    score : float
+        handedness score of the last detection.
+    wrist : tuple
+        normalized (x, y) of the wrist in the last detection.
+    landmarks : Object
+        landmarks of the last detection.
+    last_seen : float
+        timestamp of the last detection.
+    """
+
+    def __init__(self, track_id, label, score, wrist, landmarks, timestamp):
+        self.track_id = track_id
+        self.label = label
+        self.right = score if label == "Right" else 1.0 - score
+        self.score = score
+        self.wrist = wrist
+        self.landmarks = landmarks
+        self.last_seen = timestamp
+
+
+class HandTracker:
+    """
+    Associates hands detected by mediapipe with tracks, so hand identity
+    and handedness stay stable when the detected label flickers.
+
+    Detections are matched to tracks by nearest wrist within
+    'max_distance', the label of a track only switches once its smoothed
+    right-hand probability leaves 0.5 by more than 'hysteresis'. Two hands
+    seen together always get different labels.
+
+    Attributes
+    ----------
+    tracks : list
+        'HandTrack' of every hand seen within 'max_age' seconds.
+    switches : int
+        no. of label switches of tracked hands.
+    """
+
+    def __init__(self, max_distance=0.25, max_age=0.5, smoothing=0.3, hysteresis=0.2):
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.smoothing = smoothing
+        self.hysteresis = hysteresis
+        self.tracks = []
+        self.next_id = 1
+        self.last_update = None
+        self.switches = 0
+
+    def detections(results):
+        """returns (label, score, wrist, landmarks) of every hand in 'results'."""
+        found = []
+        hands = results.multi_hand_landmarks or []
+        handedness = results.multi_handedness or []
+        for landmarks, classes in zip(hands, handedness):
+            category = classes.classification[0]
+            wrist = landmarks.landmark[0]
+            wrist = (wrist.x, wrist.y)
+            found.append((category.label, category.score, wrist, landmarks))
+        return found
+
+    def match(self, found):
+        """returns [(track, detection idx)] of nearest wrists within 'max_distance'."""
+        best, best_cost = [], math.inf
+        size = min(len(self.tracks), len(found))
+        for tracks in itertools.permutations(self.tracks, size):
+            for picks in itertools.permutations(range(len(found)), size):
+                pairs = [
+                    (track, idx)
+                    for track, idx in zip(tracks, picks)
+                    if math.dist(track.wrist, found[idx][2]) <= self.max_distance
+                ]
+                cost = sum(math.dist(t.wrist, found[i][2]) for t, i in pairs)
+                cost += self.max_distance * (size - len(pairs))
+                if cost < best_cost:
+                    best, best_cost = pairs, cost
+        return best
+
+    def update(self, results, timestamp=None):
+        """
+        associates hands of 'results' seen at 'timestamp' (seconds) with
+        tracks, returns tracks of this frame in detection order.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self.last_update is not None and timestamp < self.last_update:
+            self.tracks = []
+        self.last_update = timestamp
+        self.tracks = [
+            track
+            for track in self.tracks
+            if timestamp - track.last_seen <= self.max_age
+        ]
+
+        found = HandTracker.detections(results)
+        seen = [None] * len(found)
+        for track, idx in self.match(found):
+            label, score, wrist, landmarks = found[idx]
+            evidence = score if label == "Right" else 1.0 - score
+            track.right += self.smoothing * (evidence - track.right)
+            track.score, track.wrist, track.landmarks = score, wrist, landmarks
+            track.last_seen = timestamp
+            seen[idx] = track
+        for idx, track in enumerate(seen):
+            if track is None:
+                label, score, wrist, landmarks = found[idx]
+                seen[idx] = HandTrack(
+                    self.next_id, label, score, wrist, landmarks, timestamp
+                )
+                self.next_id += 1
+                self.tracks.append(seen[idx])
+
+        for track in seen:
+            if track.right > 0.5 + self.hysteresis and track.label != "Right":
+                track.label = "Right"
+                self.switches += 1
+            elif track.right < 0.5 - self.hysteresis and track.label != "Left":
+                track.label = "Left"
+                self.switches += 1
+        if len(seen) == 2 and seen[0].label == seen[1].label:
+            # the hand with weaker evidence for the shared label gets the other
+            if seen[0].label == "Right":
+                min(seen, key=lambda track: track.right).label = "Left"
+            else:
+                max(seen, key=lambda track: track.right).label = "Right"
+        return seen
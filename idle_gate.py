@@ -0,0 +1,147 @@
+import threading
+import time
+import cv2
+import numpy as np
+
+
+class IdleScheduler:
+    """
+    Switches a vision loop between 'active' and 'idle' mode.
+
+    In active mode every frame runs full inference. When no target (hand,
+    face) was seen for 'idle_after' seconds the loop goes idle: frames are
+    read at 'idle_fps' only and full inference runs only when a downscaled
+    frame difference exceeds 'motion_threshold'. Motion keeps the loop
+    active for 'wake_hold' seconds, a seen target for 'idle_after' seconds.
+
+    Attributes
+    ----------
+    mode : str
+        'active' or 'idle'.
+    stats : dict
+        per mode: frames, inferences, wall and cpu seconds.
+    wake_latencies : list
+        seconds from motion gate firing in idle mode to first frame with a
+        target.
+    """
+
+    def __init__(
+        self,
+        idle_after=5.0,
+        idle_fps=5.0,
+        motion_threshold=4.0,
+        wake_hold=1.0,
+        gate_size=(64, 48),
+    ):
+        self.idle_after = idle_after
+        self.idle_fps = idle_fps
+        self.motion_threshold = motion_threshold
+        self.wake_hold = wake_hold
+        self.gate_size = gate_size
+
+        now = time.perf_counter()
+        self.mode = "active"
+        self.active_until = now + idle_after
+        self.prev_small = None
+        self.small = None
+        self.gray = None
+        self.next_frame = now
+        self.woke_at = None
+        self.wake_latencies = []
+        self.lock = threading.Lock()
+
+        self.stats = {
+            mode: {"frames": 0, "inferences": 0, "wall": 0.0, "cpu": 0.0}
+            for mode in ("active", "idle")
+        }
+        self.mark_wall = now
+        self.mark_cpu = time.process_time()
+
+    def account(self, now):
+        """adds wall and process cpu time since last call to current mode."""
+        cpu = time.process_time()
+        stats = self.stats[self.mode]
+        stats["wall"] += now - self.mark_wall
+        stats["cpu"] += cpu - self.mark_cpu
+        self.mark_wall, self.mark_cpu = now, cpu
+
+    def set_mode(self, mode, now):
+        if mode != self.mode:
+            self.account(now)
+            self.mode = mode
+            if mode == "idle":
+                self.prev_small = None
+                self.woke_at = None
+
+    def wait(self):
+        """sleeps until next frame is due, only paces the loop in idle mode."""
+        if self.mode != "idle":
+            return
+        delay = self.next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame = max(self.next_frame, time.perf_counter()) + 1 / self.idle_fps
+
+    def motion(self, frame):
+        """returns mean absolute difference of downscaled grey 'frame' to last one."""
+        self.small = cv2.resize(frame, self.gate_size, self.small, 0, 0, cv2.INTER_AREA)
+        self.gray = cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, self.gray)
+        if self.prev_small is None:
+            self.prev_small = self.gray.copy()
+            return 0.0
+        diff = cv2.absdiff(self.gray, self.prev_small)
+        np.copyto(self.prev_small, self.gray)
+        return float(diff.mean())
+
+    def should_infer(self, frame):
+        """returns True if full inference should run on 'frame'."""
+        with self.lock:
+            now = time.perf_counter()
+            if now >= self.active_until:
+                self.set_mode("idle", now)
+            infer = True
+            if self.mode == "idle":
+                infer = self.motion(frame) >= self.motion_threshold
+                if infer:
+                    self.woke_at = now
+                    self.active_until = now + self.wake_hold
+                    self.set_mode("active", now)
+            # a wake frame counts as active, like the inference it runs
+            self.stats[self.mode]["frames"] += 1
+            self.stats[self.mode]["inferences"] += infer
+            return infer
+
+    def update(self, seen):
+        """reports whether inference found a target in the last frame."""
+        if not seen:
+            return
+        with self.lock:
+            now = time.perf_counter()
+            self.active_until = now + self.idle_after
+            if self.woke_at is not None:
+                self.wake_latencies.append(now - self.woke_at)
+                self.woke_at = None
+            self.set_mode("active", now)
+
+    def report(self):
+        """returns dict of per-mode frames, inferences, cpu % and wake latency."""
+        with self.lock:
+            self.account(time.perf_counter())
+            report = {}
+            for mode, stats in self.stats.items():
+                report[mode] = {
+                    "frames": stats["frames"],
+                    "inferences": stats["inferences"],
+                    "seconds": round(stats["wall"], 2),
+                    "cpu_percent": round(100 * stats["cpu"] / stats["wall"], 1)
+                    if stats["wall"] > 0
+                    else 0.0,
+                }
+            if self.wake_latencies:
+                latencies = np.array(self.wake_latencies) * 1000
+                report["wake_latency_ms"] = {
+                    "count": len(latencies),
+                    "mean": round(float(latencies.mean()), 1),
+                    "max": round(float(latencies.max()), 1),
+                }
+            return report
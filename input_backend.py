@@ -0,0 +1,511 @@
+import os
+import sys
+import threading
+import time
+
+# shifted characters of a US keyboard layout and the key producing them
+SHIFTED = dict(zip('~!@#$%^&*()_+{}|:"<>?', "`1234567890-=[]\\;',./"))
+
+# pyautogui key names of non-character keys mapped to X keysym names
+KEYSYMS = {
+    "alt": "Alt_L",
+    "altleft": "Alt_L",
+    "altright": "Alt_R",
+    "backspace": "BackSpace",
+    "capslock": "Caps_Lock",
+    "ctrl": "Control_L",
+    "ctrlleft": "Control_L",
+    "ctrlright": "Control_R",
+    "del": "Delete",
+    "delete": "Delete",
+    "down": "Down",
+    "end": "End",
+    "enter": "Return",
+    "esc": "Escape",
+    "escape": "Escape",
+    "home": "Home",
+    "insert": "Insert",
+    "left": "Left",
+    "menu": "Menu",
+    "pagedown": "Next",
+    "pageup": "Prior",
+    "pause": "Pause",
+    "prtsc": "Print",
+    "printscreen": "Print",
+    "return": "Return",
+    "right": "Right",
+    "scrlk": "Scroll_Lock",
+    "scrolllock": "Scroll_Lock",
+    "shift": "Shift_L",
+    "shiftleft": "Shift_L",
+    "shiftright": "Shift_R",
+    "space": "space",
+    "tab": "Tab",
+    "up": "Up",
+    "win": "Super_L",
+    "winleft": "Super_L",
+    "winright": "Super_R",
+}
+KEYSYMS.update({"f%d" % n: "F%d" % n for n in range(1, 13)})
+
+# characters whose X keysym name differs from the character itself
+CHAR_KEYSYMS = {
+    " ": "space",
+    "`": "grave",
+    "-": "minus",
+    "=": "equal",
+    "[": "bracketleft",
+    "]": "bracketright",
+    "\\": "backslash",
+    ";": "semicolon",
+    "'": "apostrophe",
+    ",": "comma",
+    ".": "period",
+    "/": "slash",
+    "\n": "Return",
+    "\t": "Tab",
+}
+
+# X keysym names whose evdev KEY_* name differs
+EVDEV_NAMES = {
+    "Alt_L": "LEFTALT",
+    "Alt_R": "RIGHTALT",
+    "BackSpace": "BACKSPACE",
+    "Caps_Lock": "CAPSLOCK",
+    "Control_L": "LEFTCTRL",
+    "Control_R": "RIGHTCTRL",
+    "Escape": "ESC",
+    "Next": "PAGEDOWN",
+    "Prior": "PAGEUP",
+    "Print": "SYSRQ",
+    "Return": "ENTER",
+    "Scroll_Lock": "SCROLLLOCK",
+    "Shift_L": "LEFTSHIFT",
+    "Shift_R": "RIGHTSHIFT",
+    "Super_L": "LEFTMETA",
+    "Super_R": "RIGHTMETA",
+    "bracketleft": "LEFTBRACE",
+    "bracketright": "RIGHTBRACE",
+    "period": "DOT",
+}
+
+
+def split_shift(char):
+    """returns (unshifted character, True if shift is needed) for 'char'."""
+    if char.isalpha() and char.isupper():
+        return char.lower(), True
+    if char in SHIFTED:
+        return SHIFTED[char], True
+    return char, False
+
+
+class InputBackend:
+    """
+    Injects mouse and keyboard input.
+
+    Key names follow pyautogui ('ctrl', 'enter', 'winleft', 'a', ...),
+    coordinates are screen pixels and 'scroll' counts wheel notches,
+    positive scrolls up. Every public call is sent to the OS as one batch.
+    Keys the backend has no code for are reported and skipped, like
+    pyautogui does.
+    """
+
+    def size(self):
+        raise NotImplementedError
+
+    def position(self):
+        raise NotImplementedError
+
+    def move_to(self, x, y):
+        raise NotImplementedError
+
+    def mouse_down(self, button="left"):
+        raise NotImplementedError
+
+    def mouse_up(self, button="left"):
+        raise NotImplementedError
+
+    def scroll(self, clicks):
+        raise NotImplementedError
+
+    def key_down(self, key):
+        raise NotImplementedError
+
+    def key_up(self, key):
+        raise NotImplementedError
+
+    def click(self, button="left", clicks=1):
+        for _ in range(clicks):
+            self.mouse_down(button)
+            self.mouse_up(button)
+
+    def double_click(self, button="left"):
+        self.click(button, clicks=2)
+
+    def press(self, key):
+        self.key_down(key)
+        self.key_up(key)
+
+    def hotkey(self, *keys):
+        for key in keys:
+            self.key_down(key)
+        for key in reversed(keys):
+            self.key_up(key)
+
+    def write(self, text, interval=0.0):
+        """types 'text' character by character, waits 'interval' seconds between."""
+        for char in text:
+            self.type_char(char)
+            if interval:
+                time.sleep(interval)
+
+    def type_char(self, char):
+        char, shift = split_shift(char)
+        if shift:
+            self.hotkey("shift", char)
+        else:
+            self.press(char)
+
+
+class PyAutoGUIBackend(InputBackend):
+    """
+    Portable fallback built on pyautogui, skips its 'PAUSE' sleep and
+    caches screen size.
+    """
+
+    def __init__(self):
+        import pyautogui
+
+        pyautogui.FAILSAFE = False
+        self.gui = pyautogui
+        self.screen = tuple(pyautogui.size())
+        self.notch = 120 if sys.platform == "win32" else 1
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        return tuple(self.gui.position())
+
+    def move_to(self, x, y):
+        self.gui.moveTo(x, y, _pause=False)
+
+    def mouse_down(self, button="left"):
+        self.gui.mouseDown(button=button, _pause=False)
+
+    def mouse_up(self, button="left"):
+        self.gui.mouseUp(button=button, _pause=False)
+
+    def click(self, button="left", clicks=1):
+        self.gui.click(button=button, clicks=clicks, interval=0.0, _pause=False)
+
+    def scroll(self, clicks):
+        self.gui.scroll(clicks * self.notch, _pause=False)
+
+    def key_down(self, key):
+        self.gui.keyDown(key.lower(), _pause=False)
+
+    def key_up(self, key):
+        self.gui.keyUp(key.lower(), _pause=False)
+
+    def press(self, key):
+        self.gui.press(key.lower(), _pause=False)
+
+    def hotkey(self, *keys):
+        self.gui.hotkey(*[key.lower() for key in keys], _pause=False)
+
+    def write(self, text, interval=0.0):
+        self.gui.write(text, interval=interval, _pause=False)
+
+    def type_char(self, char):
+        self.gui.write(char, _pause=False)
+
+
+class XTestBackend(InputBackend):
+    """
+    Linux / X11 backend injecting events through the XTest extension of
+    python-xlib, events of one call are flushed to the server together.
+    """
+
+    BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+    def __init__(self, display_name=None):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+
+        self.X = X
+        self.XK = XK
+        self.xtest = xtest
+        self.display = display.Display(display_name)
+        if not self.display.has_extension("XTEST"):
+            raise RuntimeError("X server has no XTEST extension")
+        screen = self.display.screen()
+        self.root = screen.root
+        self.screen = (screen.width_in_pixels, screen.height_in_pixels)
+        self.keycodes = {}
+        self.lock = threading.Lock()
+
+    def keycode(self, key):
+        """returns X keycode of pyautogui key name 'key', cached, None if unknown."""
+        if key not in self.keycodes:
+            name = KEYSYMS.get(key.lower(), CHAR_KEYSYMS.get(key, key))
+            keysym = self.XK.string_to_keysym(name)
+            if keysym == 0 and len(key) == 1:
+                keysym = ord(key)
+            keycode = self.display.keysym_to_keycode(keysym) or None
+            if keycode is None:
+                print("No keycode for key %r, ignored." % key)
+            self.keycodes[key] = keycode
+        return self.keycodes[key]
+
+    def send(self, *events):
+        """fakes all (type, detail, kwargs) 'events' and flushes once."""
+        with self.lock:
+            for event_type, detail, kwargs in events:
+                self.xtest.fake_input(self.display, event_type, detail, **kwargs)
+            self.display.sync()
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        pointer = self.root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def move_to(self, x, y):
+        self.send((self.X.MotionNotify, 0, {"x": int(x), "y": int(y)}))
+
+    def mouse_down(self, button="left"):
+        self.send((self.X.ButtonPress, XTestBackend.BUTTONS[button], {}))
+
+    def mouse_up(self, button="left"):
+        self.send((self.X.ButtonRelease, XTestBackend.BUTTONS[button], {}))
+
+    def click(self, button="left", clicks=1):
+        detail = XTestBackend.BUTTONS[button]
+        self.send(
+            *[
+                (event_type, detail, {})
+                for _ in range(clicks)
+                for event_type in (self.X.ButtonPress, self.X.ButtonRelease)
+            ]
+        )
+
+    def scroll(self, clicks):
+        detail = 4 if clicks > 0 else 5
+        self.send(
+            *[
+                (event_type, detail, {})
+                for _ in range(abs(int(clicks)))
+                for event_type in (self.X.ButtonPress, self.X.ButtonRelease)
+            ]
+        )
+
+    def key_down(self, key):
+        keycode = self.keycode(key)
+        if keycode:
+            self.send((self.X.KeyPress, keycode, {}))
+
+    def key_up(self, key):
+        keycode = self.keycode(key)
+        if keycode:
+            self.send((self.X.KeyRelease, keycode, {}))
+
+    def press(self, key):
+        keycode = self.keycode(key)
+        if keycode:
+            self.send((self.X.KeyPress, keycode, {}), (self.X.KeyRelease, keycode, {}))
+
+    def hotkey(self, *keys):
+        keycodes = [self.keycode(key) for key in keys]
+        keycodes = [keycode for keycode in keycodes if keycode]
+        self.send(
+            *[(self.X.KeyPress, keycode, {}) for keycode in keycodes],
+            *[(self.X.KeyRelease, keycode, {}) for keycode in reversed(keycodes)],
+        )
+
+
+class UInputBackend(InputBackend):
+    """
+    Linux backend writing to a virtual absolute-pointer and keyboard device
+    through python-evdev's uinput, works without X (Wayland, console).
+
+    uinput cannot read the cursor back, 'position' returns the last
+    position set by this backend.
+    """
+
+    BUTTONS = {"left": "BTN_LEFT", "middle": "BTN_MIDDLE", "right": "BTN_RIGHT"}
+
+    def __init__(self, screen_size=None):
+        from evdev import AbsInfo, UInput, ecodes
+
+        self.e = ecodes
+        if screen_size is None:
+            screen_size = PyAutoGUIBackend().size()
+        self.screen = tuple(screen_size)
+        keys = [code for name, code in ecodes.ecodes.items() if name.startswith("KEY_")]
+        buttons = [ecodes.ecodes[name] for name in UInputBackend.BUTTONS.values()]
+        self.device = UInput(
+            {
+                ecodes.EV_KEY: keys + buttons,
+                ecodes.EV_ABS: [
+                    (ecodes.ABS_X, AbsInfo(0, 0, self.screen[0] - 1, 0, 0, 0)),
+                    (ecodes.ABS_Y, AbsInfo(0, 0, self.screen[1] - 1, 0, 0, 0)),
+                ],
+                ecodes.EV_REL: [ecodes.REL_WHEEL],
+            },
+            name="phoenix-input",
+        )
+        self.cursor = (self.screen[0] // 2, self.screen[1] // 2)
+        self.lock = threading.Lock()
+
+    def code(self, key):
+        """returns evdev key code of pyautogui key name 'key', None if unknown."""
+        name = KEYSYMS.get(key.lower(), CHAR_KEYSYMS.get(key, key))
+        name = EVDEV_NAMES.get(name, name)
+        code = self.e.ecodes.get("KEY_" + name.upper())
+        if code is None:
+            print("No key code for key %r, ignored." % key)
+        return code
+
+    def send(self, *events):
+        """writes all (type, code, value) 'events' followed by one SYN_REPORT."""
+        with self.lock:
+            for event_type, code, value in events:
+                self.device.write(event_type, code, value)
+            self.device.syn()
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        return self.cursor
+
+    def move_to(self, x, y):
+        self.cursor = (int(x), int(y))
+        self.send(
+            (self.e.EV_ABS, self.e.ABS_X, self.cursor[0]),
+            (self.e.EV_ABS, self.e.ABS_Y, self.cursor[1]),
+        )
+
+    def button(self, button):
+        return self.e.ecodes[UInputBackend.BUTTONS[button]]
+
+    def mouse_down(self, button="left"):
+        self.send((self.e.EV_KEY, self.button(button), 1))
+
+    def mouse_up(self, button="left"):
+        self.send((self.e.EV_KEY, self.button(button), 0))
+
+    def scroll(self, clicks):
+        self.send((self.e.EV_REL, self.e.REL_WHEEL, int(clicks)))
+
+    def key_down(self, key):
+        code = self.code(key)
+        if code is not None:
+            self.send((self.e.EV_KEY, code, 1))
+
+    def key_up(self, key):
+        code = self.code(key)
+        if code is not None:
+            self.send((self.e.EV_KEY, code, 0))
+
+
+class FakeBackend(InputBackend):
+    """
+    In-memory backend for tests, logs every call in 'events' as
+    (name, args) tuples and keeps a virtual cursor.
+    """
+
+    def __init__(self, screen_size=(1920, 1080)):
+        self.screen = tuple(screen_size)
+        self.cursor = (self.screen[0] // 2, self.screen[1] // 2)
+        self.events = []
+
+    def log(self, name, *args):
+        self.events.append((name, args))
+
+    def size(self):
+        return self.screen
+
+    def position(self):
+        return self.cursor
+
+    def move_to(self, x, y):
+        self.cursor = (x, y)
+        self.log("move_to", round(x), round(y))
+
+    def mouse_down(self, button="left"):
+        self.log("mouse_down", button)
+
+    def mouse_up(self, button="left"):
+        self.log("mouse_up", button)
+
+    def click(self, button="left", clicks=1):
+        self.log("click", button, clicks)
+
+    def scroll(self, clicks):
+        self.log("scroll", clicks)
+
+    def key_down(self, key):
+        self.log("key_down", key)
+
+    def key_up(self, key):
+        self.log("key_up", key)
+
+    def press(self, key):
+        self.log("press", key)
+
+    def hotkey(self, *keys):
+        self.log("hotkey", *keys)
+
+    def write(self, text, interval=0.0):
+        self.log("write", text)
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGUIBackend,
+    "xtest": XTestBackend,
+    "uinput": UInputBackend,
+    "fake": FakeBackend,
+}
+
+backend = None
+backend_lock = threading.Lock()
+
+
+def create_backend(name=None):
+    """
+    returns new backend named 'name', default from environment variable
+    'PHOENIX_INPUT_BACKEND'. Without a name, Linux tries XTest then uinput
+    and every platform falls back to pyautogui.
+    """
+    name = name or os.environ.get("PHOENIX_INPUT_BACKEND")
+    if name:
+        return BACKENDS[name]()
+    if sys.platform.startswith("linux"):
+        candidates = [XTestBackend] if os.environ.get("DISPLAY") else []
+        for candidate in candidates + [UInputBackend]:
+            try:
+                return candidate()
+            except Exception as e:
+                print("Input backend %s unavailable: %s" % (candidate.__name__, e))
+    return PyAutoGUIBackend()
+
+
+def get_backend():
+    """returns process-wide input backend, created on first use."""
+    global backend
+    if backend is None:
+        with backend_lock:
+            if backend is None:
+                backend = create_backend()
+    return backend
+
+
+def set_backend(new_backend):
+    """replaces process-wide input backend, returns the previous one."""
+    global backend
+    with backend_lock:
+        previous, backend = backend, new_backend
+    return previous
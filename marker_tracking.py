@@ -0,0 +1,199 @@
+import time
+import cv2
+import numpy as np
+
+# constructor names of OpenCV's bounding box trackers, in 'cv2' or 'cv2.legacy'
+BOX_TRACKERS = {
+    "kcf": "TrackerKCF_create",
+    "mosse": "TrackerMOSSE_create",
+    "csrt": "TrackerCSRT_create",
+}
+
+
+def create_box_tracker(kind):
+    """returns new OpenCV tracker of 'kind', from 'cv2.legacy' if needed."""
+    name = BOX_TRACKERS[kind]
+    for module in (cv2, getattr(cv2, "legacy", None)):
+        if module is not None and hasattr(module, name):
+            return getattr(module, name)()
+    raise ValueError("%s tracker is not available in this OpenCV build" % kind)
+
+
+class BoxTracker:
+    """
+    Follows the marker with an OpenCV bounding box tracker ('kcf', 'mosse'
+    or 'csrt'). The tracked box only gives position and size, so the
+    corners of the last detection are moved and scaled with it, keeping
+    the marker's rotation. Confidence is 1 while the tracker reports the
+    target found.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.tracker = None
+        self.points = None
+        self.box = None
+
+    def init(self, frame, gray, points):
+        x, y, w, h = cv2.boundingRect(points)
+        self.tracker = create_box_tracker(self.kind)
+        self.tracker.init(frame, (x, y, w, h))
+        self.points = points
+        self.box = (x, y, w, h)
+
+    def update(self, frame, gray):
+        """returns (corners, confidence), corners None if the target was lost."""
+        ok, box = self.tracker.update(frame)
+        if not ok:
+            return None, 0.0
+        x0, y0, w0, h0 = self.box
+        x, y, w, h = box
+        scale = np.sqrt((w * h) / max(w0 * h0, 1))
+        center0 = np.array([x0 + w0 / 2, y0 + h0 / 2], np.float32)
+        center = np.array([x + w / 2, y + h / 2], np.float32)
+        return (self.points - center0) * scale + center, 1.0
+
+
+class FlowTracker:
+    """
+    Follows the four marker corners with pyramidal Lucas-Kanade optical
+    flow. Every corner is tracked forward and back, corners that do not
+    return within 'max_error' px are unreliable and moved with the mean
+    motion of the others. Confidence is the fraction of reliable corners.
+    """
+
+    def __init__(self, max_error=1.0, win_size=(21, 21), levels=3):
+        self.max_error = max_error
+        self.params = {
+            "winSize": win_size,
+            "maxLevel": levels,
+            "criteria": (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+        }
+        self.prev_gray = None
+        self.points = None
+
+    def init(self, frame, gray, points):
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
+            self.prev_gray = np.empty_like(gray)
+        np.copyto(self.prev_gray, gray)
+        self.points = points
+
+    def update(self, frame, gray):
+        """returns (corners, confidence), corners None if the target was lost."""
+        start = self.points.reshape(-1, 1, 2)
+        moved, found, _ = cv2.calcOpticalFlowPyrLK(
+            self.prev_gray, gray, start, None, **self.params
+        )
+        back, found_back, _ = cv2.calcOpticalFlowPyrLK(
+            gray, self.prev_gray, moved, None, **self.params
+        )
+        error = np.linalg.norm((back - start).reshape(-1, 2), axis=1)
+        good = (found.ravel() == 1) & (found_back.ravel() == 1)
+        good &= error < self.max_error
+        confidence = float(good.mean())
+        if good.sum() < 3:
+            return None, confidence
+
+        motion = (moved - start).reshape(-1, 2)
+        motion[~good] = motion[good].mean(axis=0)
+        self.points = self.points + motion
+        np.copyto(self.prev_gray, gray)
+        return self.points, confidence
+
+
+TRACKERS = {
+    "lk": FlowTracker,
+    "kcf": lambda: BoxTracker("kcf"),
+    "mosse": lambda: BoxTracker("mosse"),
+    "csrt": lambda: BoxTracker("csrt"),
+}
+
+
+class MarkerTracker:
+    """
+    Hybrid ArUco marker tracking: full marker detection runs every
+    'detect_every' frames, or on every frame while the tracker's confidence
+    is below 'min_confidence' or the marker is lost. In between the marker
+    is followed by the cheaper tracker named 'tracker' in 'TRACKERS'.
+
+    'detect(frame)' returns marker corners like 'aruco.detectMarkers', only
+    the first marker is tracked. Without a detection for 'lost_after'
+    seconds the marker is considered lost.
+
+    Attributes
+    ----------
+    detections : int
+        no. of frames full detection ran on.
+    misses : int
+        no. of those frames without a marker.
+    tracked : int
+        no. of frames the marker was followed by the tracker.
+    confidence : float
+        confidence of the last tracker update, 1 after a detection.
+    """
+
+    def __init__(
+        self, detect, tracker="lk", detect_every=5, min_confidence=0.75, lost_after=2.0
+    ):
+        self.detect = detect
+        self.kind = tracker
+        self.tracker = TRACKERS[tracker]()
+        self.detect_every = detect_every
+        self.min_confidence = min_confidence
+        self.lost_after = lost_after
+        self.gray = None
+        self.detections = 0
+        self.misses = 0
+        self.tracked = 0
+        self.reset()
+
+    def reset(self):
+        self.points = None
+        self.since_detect = 0
+        self.last_detection = 0.0
+        self.confidence = 0.0
+
+    def update(self, frame, timestamp=None):
+        """returns corners of the marker in 'frame', None if it is lost."""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        self.gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, self.gray)
+
+        if (
+            self.points is None
+            or self.since_detect >= self.detect_every
+            or self.confidence < self.min_confidence
+        ):
+            corners = self.detect(frame)
+            self.detections += 1
+            if corners:
+                self.points = np.array(corners[0], np.float32).reshape(4, 2)
+                self.tracker.init(frame, self.gray, self.points)
+                self.since_detect = 0
+                self.last_detection = timestamp
+                self.confidence = 1.0
+                return corners
+            self.misses += 1
+
+        if self.points is None:
+            return None
+        if timestamp - self.last_detection > self.lost_after:
+            self.reset()
+            return None
+        points, self.confidence = self.tracker.update(frame, self.gray)
+        if points is None:
+            self.reset()
+            return None
+        self.points = points
+        self.since_detect += 1
+        self.tracked += 1
+        return [points.reshape(1, 4, 2).astype(np.float32)]
+
+    def report(self):
+        """returns dict of detection, miss and tracked frame counts."""
+        return {
+            "tracker": self.kind,
+            "detections": self.detections,
+            "misses": self.misses,
+            "tracked": self.tracked,
+        }
@@ -0,0 +1,297 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+METRICS_PORT = int(os.environ.get("PHOENIX_METRICS_PORT", 9464))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 'le' bounds in seconds of the exported histogram buckets
+EXPORT_BOUNDS = (
+    0.0005,
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.033,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+)
+
+
+def format_labels(labels, extra=None):
+    items = sorted(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{%s}" % ",".join('%s="%s"' % (key, value) for key, value in items)
+
+
+class Counter:
+    """Monotonic count, e.g. of frames read or dropped."""
+
+    kind = "counter"
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def samples(self):
+        return [(self.name, self.labels, self.value)]
+
+
+class Gauge:
+    """Value that can go up and down, e.g. current frames per second."""
+
+    kind = "gauge"
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self):
+        return [(self.name, self.labels, self.value)]
+
+
+class Histogram:
+    """
+    Latency histogram with HDR-style log-linear buckets: every doubling of
+    the value is split into 2 ** ('sub_bits' - 1) equal buckets, so any
+    quantile is accurate to about 1 / 2 ** ('sub_bits' - 1) of its value
+    from 'unit' up to 'highest' seconds, with a fixed, small array of counts
+    and no allocation per observation.
+
+    It is exported with the buckets of 'EXPORT_BOUNDS', quantiles are
+    available from 'quantile'.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, labels, unit=1e-6, highest=60.0, sub_bits=7):
+        self.name = name
+        self.labels = labels
+        self.unit = unit
+        self.sub_bits = sub_bits
+        self.highest = int(highest / unit)
+        self.counts = np.zeros(self.index(self.highest) + 1, np.int64)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def index(self, units):
+        """returns bucket index of integer value 'units'."""
+        shift = units.bit_length() - self.sub_bits
+        if shift <= 0:
+            return units
+        return (shift << (self.sub_bits - 1)) + (units >> shift)
+
+    def lower(self, index):
+        """returns lowest integer value in bucket 'index'."""
+        if index < 1 << self.sub_bits:
+            return index
+        shift = (index >> (self.sub_bits - 1)) - 1
+        return (index - (shift << (self.sub_bits - 1))) << shift
+
+    def observe(self, seconds):
+        units = min(max(int(seconds / self.unit), 0), self.highest)
+        with self.lock:
+            self.counts[self.index(units)] += 1
+            self.count += 1
+            self.sum += seconds
+            self.max = max(self.max, seconds)
+
+    @contextmanager
+    def time(self):
+        """observes the seconds spent in the 'with' block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q):
+        """returns lower bound in seconds of the 'q' quantile, 0 if empty."""
+        if not self.count:
+            return 0.0
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, q * self.count))
+        return self.lower(min(index, len(self.counts) - 1)) * self.unit
+
+    def samples(self):
+        with self.lock:
+            cumulative = np.cumsum(self.counts)
+            count, total = self.count, self.sum
+        samples = []
+        for bound in EXPORT_BOUNDS:
+            # last bucket whose values are all at most 'bound'
+            index = self.index(min(int(bound / self.unit), self.highest) + 1) - 1
+            le = {"le": repr(bound)}
+            samples.append((self.name + "_bucket", self.labels, cumulative[index], le))
+        samples.append((self.name + "_bucket", self.labels, count, {"le": "+Inf"}))
+        samples.append((self.name + "_sum", self.labels, total))
+        samples.append((self.name + "_count", self.labels, count))
+        return samples
+
+
+class Registry:
+    """
+    Metrics of this process by name and labels, rendered in the Prometheus
+    text exposition format.
+    """
+
+    def __init__(self):
+        self.families = {}
+        self.lock = threading.Lock()
+
+    def get(self, cls, name, help, labels):
+        """returns metric 'name' with 'labels', created as 'cls' if new."""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            kind, _, metrics = self.families.setdefault(name, (cls.kind, help, {}))
+            if kind != cls.kind:
+                raise ValueError("%s is a %s, not a %s" % (name, kind, cls.kind))
+            if key not in metrics:
+                metrics[key] = cls(name, labels)
+            return metrics[key]
+
+    def counter(self, name, help="", **labels):
+        return self.get(Counter, name, help, labels)
+
+    def gauge(self, name, help="", **labels):
+        return self.get(Gauge, name, help, labels)
+
+    def histogram(self, name, help="", **labels):
+        return self.get(Histogram, name, help, labels)
+
+    def render(self):
+        """returns all metrics in Prometheus text format."""
+        lines = []
+        with self.lock:
+            families = [
+                (name, kind, help, list(metrics.values()))
+                for name, (kind, help, metrics) in sorted(self.families.items())
+            ]
+        for name, kind, help, metrics in families:
+            lines.append("# HELP %s %s" % (name, help))
+            lines.append("# TYPE %s %s" % (name, kind))
+            for metric in metrics:
+                for sample in metric.samples():
+                    name, labels, value = sample[:3]
+                    extra = sample[3] if len(sample) > 3 else None
+                    lines.append(
+                        "%s%s %s" % (name, format_labels(labels, extra), float(value))
+                    )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class StageMetrics:
+    """
+    Metrics of one vision loop: frames read and dropped, frames per second
+    and a latency histogram per stage, labelled with 'controller'.
+
+    Attributes
+    ----------
+    frames : Object of 'Counter'
+        frames read from the camera.
+    fps : Object of 'Gauge'
+        frames read per second over the last 'window' seconds.
+    """
+
+    def __init__(self, controller, window=1.0, registry=REGISTRY):
+        self.controller = controller
+        self.window = window
+        self.registry = registry
+        self.frames = registry.counter(
+            "phoenix_frames_total", "camera frames read", controller=controller
+        )
+        self.fps = registry.gauge(
+            "phoenix_fps", "camera frames read per second", controller=controller
+        )
+        self.window_start = time.perf_counter()
+        self.window_frames = 0
+
+    def frame(self):
+        """counts a frame read, updates 'fps' once per 'window'."""
+        self.frames.inc()
+        self.window_frames += 1
+        now = time.perf_counter()
+        if now - self.window_start >= self.window:
+            self.fps.set(self.window_frames / (now - self.window_start))
+            self.window_start, self.window_frames = now, 0
+
+    def drop(self, reason, amount=1):
+        """counts 'amount' frames dropped for 'reason'."""
+        self.registry.counter(
+            "phoenix_dropped_frames_total",
+            "camera frames dropped",
+            controller=self.controller,
+            reason=reason,
+        ).inc(amount)
+
+    def stage(self, stage):
+        """returns latency 'Histogram' of 'stage'."""
+        return self.registry.histogram(
+            "phoenix_stage_seconds",
+            "latency of a processing stage",
+            controller=self.controller,
+            stage=stage,
+        )
+
+    def time(self, stage):
+        """observes the seconds spent in the 'with' block as 'stage'."""
+        return self.stage(stage).time()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=METRICS_PORT, host="127.0.0.1", registry=REGISTRY):
+    """
+    serves 'registry' at http://host:port/metrics from a daemon thread,
+    returns the server, None if the port is taken.
+    """
+    handler = type("Handler", (MetricsHandler,), {"registry": registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        print("Metrics endpoint not started: %s" % e)
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,159 @@
+import threading
+import time
+import cv2
+
+RENDER_MODES = ("window", "preview", "headless")
+
+
+def destroy_windows(names):
+    """closes the windows 'names', skipping windows that were never shown."""
+    for name in names:
+        try:
+            cv2.destroyWindow(name)
+        except cv2.error:
+            pass
+    if names:
+        # lets HighGUI process the close events
+        cv2.waitKey(1)
+
+
+class Preview:
+    """
+    Preview windows of one controller shown at a capped rate by the shared
+    'PreviewRenderer' thread.
+
+    The controller 'submit's a draw callable per frame, it is only kept if
+    a preview is due and is called on the render thread, returning a list
+    of (window name, BGR image) to show. Drawing, colour conversion and
+    window updates therefore cost nothing on frames that are not shown.
+
+    Attributes
+    ----------
+    rate : float
+        max. no. of previews shown per second.
+    stop_keys : tuple
+        key codes that set 'stop_requested' when pressed in a window.
+    stop_requested : bool
+        true once one of 'stop_keys' was pressed.
+    shown : int
+        no. of previews shown.
+    windows : set
+        names of the windows shown, closed by 'stop'.
+    """
+
+    def __init__(self, renderer, rate=10.0, stop_keys=(13,)):
+        self.renderer = renderer
+        self.rate = rate
+        self.stop_keys = stop_keys
+        self.next_due = 0.0
+        self.draw = None
+        self.closed = False
+        self.done = threading.Event()
+        self.stop_requested = False
+        self.shown = 0
+        self.windows = set()
+
+    def due(self):
+        """returns True if a submitted frame would be shown."""
+        return time.perf_counter() >= self.next_due
+
+    def submit(self, draw):
+        """hands 'draw' to the render thread if a preview is due."""
+        if self.due():
+            self.next_due = time.perf_counter() + 1.0 / self.rate
+            with self.renderer.cond:
+                self.draw = draw
+                self.renderer.cond.notify_all()
+
+    def stop(self):
+        """closes the windows of this preview on the render thread."""
+        with self.renderer.cond:
+            self.closed = True
+            self.renderer.cond.notify_all()
+        while not self.done.wait(0.5) and self.renderer.is_alive():
+            pass
+
+
+class PreviewRenderer(threading.Thread):
+    """
+    Single thread showing the 'Preview' windows of all controllers, HighGUI
+    is not thread-safe so no other thread may create or close them. Ends
+    once its last preview is stopped.
+
+    Attributes
+    ----------
+    previews : list
+        'Preview's not stopped yet.
+    finished : bool
+        true once the thread ended or is about to, no previews are added.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.cond = threading.Condition()
+        self.previews = []
+        self.finished = False
+
+    def attach(self, rate, stop_keys):
+        """returns new 'Preview' drawn by this thread, None if it finished."""
+        with self.cond:
+            if self.finished:
+                return None
+            view = Preview(self, rate, stop_keys)
+            self.previews.append(view)
+            return view
+
+    def run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(
+                    lambda: any(v.draw or v.closed for v in self.previews)
+                    or not self.previews
+                )
+                closing = [v for v in self.previews if v.closed]
+                self.previews = [v for v in self.previews if not v.closed]
+                draws = [(v, v.draw) for v in self.previews if v.draw]
+                for view, _ in draws:
+                    view.draw = None
+                if not self.previews:
+                    self.finished = True
+
+            for view, draw in draws:
+                for name, image in draw():
+                    cv2.imshow(name, image)
+                    view.windows.add(name)
+                view.shown += 1
+            if draws:
+                key = cv2.waitKey(1) & 0xFF
+                for view in self.previews:
+                    if key in view.stop_keys:
+                        view.stop_requested = True
+            for view in closing:
+                destroy_windows(view.windows)
+                view.done.set()
+            if self.finished:
+                break
+
+
+# 'PreviewRenderer' shared by all controllers, started with the first preview
+renderer = None
+renderer_lock = threading.Lock()
+
+
+def make_renderer(render_mode, rate, stop_keys=(13,)):
+    """
+    returns 'Preview' on the shared render thread for 'preview' mode,
+    otherwise None.
+    """
+    global renderer
+    if render_mode not in RENDER_MODES:
+        raise ValueError("unknown render mode %r" % render_mode)
+    if render_mode != "preview":
+        return None
+    with renderer_lock:
+        view = renderer.attach(rate, stop_keys) if renderer else None
+        if view is None:
+            renderer = PreviewRenderer()
+            view = renderer.attach(rate, stop_keys)
+            renderer.start()
+    return view
@@ -0,0 +1,104 @@
+import cv2
+import numpy as np
+
+
+def buffer_view(buffer, shape):
+    """returns contiguous 'shape' view at the start of flat 'buffer'."""
+    return buffer[: int(np.prod(shape))].reshape(shape)
+
+
+class ROISegmenter:
+    """
+    Segments the glove inside the hand ROI polygon of a frame by hue,
+    like 'ROI.cropROI' did, without allocating per frame.
+
+    All intermediate images are contiguous views into flat buffers sized
+    to the largest ROI seen so far (plus headroom), every OpenCV call
+    writes into them through 'dst', the morphology kernels and polygon
+    points are created once. The returned mask is a view into these
+    buffers, valid until the next 'segment' call, copy it to keep it.
+
+    Attributes
+    ----------
+    capacity : int
+        pixels the buffers hold.
+    frames : int
+        no. of frames segmented.
+    allocations : int
+        no. of buffer allocations, each time the ROI outgrew the buffers.
+    frame_allocations : int
+        no. of buffer allocations of the last frame.
+    """
+
+    def __init__(self, open_size=3, close_size=5, hue_range=5):
+        self.kernel_open = np.ones((open_size, open_size), np.uint8)
+        self.kernel_close = np.ones((close_size, close_size), np.uint8)
+        self.hue_range = hue_range
+        self.points = np.zeros((4, 2), np.int32)
+        self.contour = np.zeros((4, 2), np.int32)
+        self.capacity = 0
+        self.frames = 0
+        self.allocations = 0
+        self.frame_allocations = 0
+
+    def reserve(self, pixels):
+        """grows the buffers to hold an ROI of 'pixels' pixels."""
+        if pixels <= self.capacity:
+            return
+        # headroom, so a slowly growing ROI does not reallocate every frame
+        pixels += pixels // 4
+        self.polygon = np.empty(pixels, np.uint8)
+        self.masked = np.empty(pixels * 3, np.uint8)
+        self.hsv = np.empty(pixels * 3, np.uint8)
+        self.hue_mask = np.empty(pixels, np.uint8)
+        self.opened = np.empty(pixels, np.uint8)
+        self.closed = np.empty(pixels, np.uint8)
+        self.capacity = pixels
+        self.allocations += 1
+        self.frame_allocations += 1
+
+    def segment(self, frame, corners, hue):
+        """
+        returns mask of pixels within 'hue_range' of 'hue' (OpenCV hue)
+        inside polygon 'corners' of 'frame', cropped to its bounding box.
+        """
+        self.frames += 1
+        self.frame_allocations = 0
+        self.points[:] = corners
+        x, y, w, h = cv2.boundingRect(self.points)
+        crop = frame[y : y + h, x : x + w]
+        h, w = crop.shape[:2]
+        self.reserve(h * w)
+
+        polygon = buffer_view(self.polygon, (h, w))
+        polygon.fill(0)
+        np.subtract(self.points, (x, y), out=self.contour)
+        cv2.drawContours(polygon, [self.contour], -1, 255, -1, cv2.LINE_AA)
+
+        masked = buffer_view(self.masked, (h, w, 3))
+        masked.fill(0)
+        cv2.bitwise_and(crop, crop, dst=masked, mask=polygon)
+        hsv = buffer_view(self.hsv, (h, w, 3))
+        cv2.cvtColor(masked, cv2.COLOR_BGR2HSV, dst=hsv)
+
+        hue_mask = buffer_view(self.hue_mask, (h, w))
+        cv2.inRange(
+            hsv,
+            (hue - self.hue_range, 50, 50),
+            (hue + self.hue_range, 255, 255),
+            dst=hue_mask,
+        )
+        opened = buffer_view(self.opened, (h, w))
+        cv2.morphologyEx(hue_mask, cv2.MORPH_OPEN, self.kernel_open, dst=opened)
+        closed = buffer_view(self.closed, (h, w))
+        cv2.morphologyEx(opened, cv2.MORPH_CLOSE, self.kernel_close, dst=closed)
+        return closed
+
+    def report(self):
+        """returns dict of frames, buffer allocations and capacity."""
+        return {
+            "frames": self.frames,
+            "allocations": self.allocations,
+            "allocations_per_frame": round(self.allocations / max(self.frames, 1), 4),
+            "capacity_pixels": self.capacity,
+        }
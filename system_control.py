@@ -0,0 +1,203 @@
+import os
+import sys
+import threading
+
+LEVELS = ("brightness", "volume")
+
+
+class SystemBackend:
+    """
+    Reads and sets system levels, all levels are floats in [0, 1].
+    'open' is called once on the service thread before any other call.
+    """
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def get_level(self, kind):
+        raise NotImplementedError
+
+    def set_level(self, kind, level):
+        raise NotImplementedError
+
+
+class WindowsSystemBackend(SystemBackend):
+    """
+    Volume through pycaw and brightness through screen_brightness_control,
+    the audio endpoint is activated once and reused.
+    """
+
+    def open(self):
+        import comtypes
+        from ctypes import cast, POINTER
+        from comtypes import CLSCTX_ALL
+        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+        import screen_brightness_control as sbcontrol
+
+        comtypes.CoInitialize()
+        self.comtypes = comtypes
+        self.sbcontrol = sbcontrol
+        devices = AudioUtilities.GetSpeakers()
+        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+        self.volume = cast(interface, POINTER(IAudioEndpointVolume))
+
+    def close(self):
+        self.volume = None
+        self.comtypes.CoUninitialize()
+
+    def get_level(self, kind):
+        if kind == "volume":
+            return self.volume.GetMasterVolumeLevelScalar()
+        brightness = self.sbcontrol.get_brightness(display=0)
+        if isinstance(brightness, list):
+            brightness = brightness[0]
+        return brightness / 100.0
+
+    def set_level(self, kind, level):
+        if kind == "volume":
+            self.volume.SetMasterVolumeLevelScalar(level, None)
+        else:
+            self.sbcontrol.set_brightness(int(100 * level), display=0)
+
+
+class FakeSystemBackend(SystemBackend):
+    """
+    In-memory backend for tests and platforms without a real one.
+
+    Attributes
+    ----------
+    levels : dict
+        current level of every kind.
+    applied : list
+        (kind, level) of every 'set_level' call.
+    """
+
+    def __init__(self, brightness=0.5, volume=0.5):
+        self.levels = {"brightness": brightness, "volume": volume}
+        self.applied = []
+
+    def get_level(self, kind):
+        return self.levels[kind]
+
+    def set_level(self, kind, level):
+        self.levels[kind] = level
+        self.applied.append((kind, level))
+
+
+class SystemControlService(threading.Thread):
+    """
+    Applies brightness and volume changes on a background thread.
+
+    Requests only update a pending target per kind, a burst of requests
+    that arrives while a change is being applied is coalesced into one
+    change to the latest target. A relative change is applied to the level
+    read from the backend when its batch is applied.
+
+    Attributes
+    ----------
+    levels : dict
+        last level read or applied per kind.
+    requested : int
+        no. of 'adjust' / 'set_level' calls.
+    applied : int
+        no. of levels actually sent to the backend.
+    """
+
+    def __init__(self, backend):
+        super().__init__(daemon=True)
+        self.backend = backend
+        self.cond = threading.Condition()
+        self.pending = {}
+        self.levels = {}
+        self.requested = 0
+        self.applied = 0
+        self.running = True
+
+    def adjust(self, kind, delta):
+        """moves level of 'kind' by 'delta', returns immediately."""
+        with self.cond:
+            absolute, value = self.pending.get(kind, (False, 0.0))
+            self.pending[kind] = (absolute, value + delta)
+            self.requested += 1
+            self.cond.notify()
+
+    def set_level(self, kind, level):
+        """sets level of 'kind' to 'level', returns immediately."""
+        with self.cond:
+            self.pending[kind] = (True, level)
+            self.requested += 1
+            self.cond.notify()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+
+    def run(self):
+        self.backend.open()
+        try:
+            while True:
+                with self.cond:
+                    self.cond.wait_for(lambda: self.pending or not self.running)
+                    if not self.running:
+                        break
+                    pending, self.pending = self.pending, {}
+
+                for kind, (absolute, value) in pending.items():
+                    try:
+                        if not absolute:
+                            # read once per batch, the level may have been
+                            # changed outside, e.g. by the keyboard's keys
+                            self.levels[kind] = self.backend.get_level(kind)
+                            value += self.levels[kind]
+                        value = min(max(value, 0.0), 1.0)
+                        self.backend.set_level(kind, value)
+                    except Exception as e:
+                        # e.g. a monitor without DDC/CI, only this change
+                        # is lost, the service keeps running
+                        print("Failed to set %s: %s" % (kind, e))
+                        self.levels.pop(kind, None)
+                        continue
+                    self.levels[kind] = value
+                    self.applied += 1
+        finally:
+            self.backend.close()
+
+
+service = None
+service_lock = threading.Lock()
+
+
+def create_backend(name=None):
+    """
+    returns backend named 'name' ('windows' or 'fake'), default from
+    environment variable 'PHOENIX_SYSTEM_BACKEND' or by platform.
+    """
+    name = name or os.environ.get("PHOENIX_SYSTEM_BACKEND")
+    if name is None:
+        name = "windows" if sys.platform == "win32" else "fake"
+    if name == "windows":
+        return WindowsSystemBackend()
+    return FakeSystemBackend()
+
+
+def get_service():
+    """returns process-wide running 'SystemControlService', started on first use."""
+    global service
+    if service is None:
+        with service_lock:
+            if service is None:
+                service = SystemControlService(create_backend())
+                service.start()
+    return service
+
+
+def set_service(new_service):
+    """replaces process-wide service, returns the previous one."""
+    global service
+    with service_lock:
+        previous, service = service, new_service
+    return previous
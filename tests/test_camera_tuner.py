@@ -0,0 +1,57 @@
+import cv2
+import camera_tuner
+from camera_tuner import CaptureTuner, FakeCapture
+
+
+def test_probe_picks_lowest_latency_mode_with_enough_fps():
+    cap = FakeCapture()
+
+    best = CaptureTuner(cap, clock=cap.now, sleep=cap.sleep).probe()
+
+    # MJPG @60 queues up frames behind the work, YUYV 720p is too slow
+    assert (best["fourcc"], best["width"], best["height"]) == ("YUYV", 640, 480)
+    assert best["fps"] == 30 and best["buffersize"] == 1
+    assert best["measured_fps"] >= 24.0
+    assert camera_tuner.fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)) == "YUYV"
+    assert cap.get(cv2.CAP_PROP_FRAME_WIDTH) == 640
+    assert cap.get(cv2.CAP_PROP_FRAME_HEIGHT) == 480
+    assert cap.get(cv2.CAP_PROP_FPS) == 30
+    assert cap.get(cv2.CAP_PROP_BUFFERSIZE) == 1
+
+
+def test_probe_uses_mjpg_when_only_it_keeps_up():
+    cap = FakeCapture(modes={("YUYV", 1280, 720): 10, ("MJPG", 1280, 720): 30})
+
+    best = CaptureTuner(cap, clock=cap.now, sleep=cap.sleep).probe()
+
+    assert (best["fourcc"], best["width"], best["fps"]) == ("MJPG", 1280, 30)
+
+
+def test_open_capture_probes_in_background_once_released(tmp_path, monkeypatch):
+    monkeypatch.setattr(camera_tuner, "probes", {})
+    fake = FakeCapture()
+
+    def open_camera(index):
+        fake.opened = True
+        return fake
+
+    path = str(tmp_path / "cameras.json")
+    options = {"open_camera": open_camera, "clock": fake.now, "sleep": fake.sleep}
+
+    # no profile yet, the camera opens in its default mode without probing
+    cap = camera_tuner.open_capture(0, path=path, **options)
+    assert cap.isOpened() and cap.get(cv2.CAP_PROP_BUFFERSIZE) == 4
+    probe = camera_tuner.probes[(0, path)]
+    probe.join(0.2)
+    assert probe.is_alive() and camera_tuner.load_profiles(path) == {}
+
+    cap.release()
+    probe.join(10)
+    assert not probe.is_alive()
+    profile = camera_tuner.load_profiles(path)[camera_tuner.device_key(0)]
+    assert (profile["fourcc"], profile["buffersize"]) == ("YUYV", 1)
+
+    # the next capture gets the stored profile
+    fake.set(cv2.CAP_PROP_BUFFERSIZE, 4)
+    cap = camera_tuner.open_capture(0, path=path, **options)
+    assert cap is fake and cap.get(cv2.CAP_PROP_BUFFERSIZE) == 1
@@ -0,0 +1,60 @@
+import pytest
+import detector_pool
+from Gesture_Controller import GestureController
+
+
+class FakeBroker:
+    ring = None
+
+    def warm(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeModel:
+    def __init__(self, kind, options, workers):
+        self.kind = kind
+        self.options = options
+        self.workers = workers
+
+    def process(self, image):
+        return None
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(detector_pool, "load_model", FakeModel)
+    monkeypatch.delenv("PHOENIX_HAND_BACKEND", raising=False)
+    pool = detector_pool.DetectorPool(FakeBroker(), workers=True)
+    pool.warm_up()
+    yield pool
+    pool.close()
+
+
+def test_controller_defaults_use_prewarmed_hands(pool, monkeypatch):
+    monkeypatch.setattr(GestureController, "detector_pool", pool)
+    warm = pool.get("hands")
+
+    assert GestureController.hands_model() is warm
+    assert len(pool.models) == 2
+
+
+def test_hands_model_follows_controller_options(pool, monkeypatch):
+    monkeypatch.setattr(GestureController, "detector_pool", pool)
+    monkeypatch.setattr(GestureController, "max_hands", 1)
+    monkeypatch.setattr(GestureController, "model_complexity", 0)
+    monkeypatch.setattr(GestureController, "hand_backend", "tasks")
+
+    model = GestureController.hands_model()
+
+    assert model is not pool.get("hands")
+    assert model.model.options["backend"] == "tasks"
+    assert model.model.options["max_num_hands"] == 1
+    assert model.model.options["model_complexity"] == 0
+    # loaded once, the next activation reuses it
+    assert GestureController.hands_model() is model
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+import frame_scheduler
+from frame_scheduler import FrameScheduler
+
+
+class FakeClock:
+    """'time' stand-in whose clock only advances by sleeping and reading it."""
+
+    def __init__(self, tick=1e-5, oversleep=0.0005):
+        self.now = 0.0
+        self.tick = tick
+        self.oversleep = oversleep
+
+    def perf_counter(self):
+        self.now += self.tick
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.0) + self.oversleep
+
+
+def test_frame_scheduler_keeps_deadlines(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(frame_scheduler, "time", clock)
+    scheduler = FrameScheduler(fps=50.0)
+
+    starts = []
+    for _ in range(20):
+        assert scheduler.wait() == 0
+        starts.append(clock.now)
+        clock.now += 0.012  # work shorter than the 20 ms interval
+    # frames start on their absolute deadlines, no drift accumulates
+    offsets = np.array(starts) - starts[0] - 0.02 * np.arange(20)
+    assert np.abs(offsets).max() < 0.001
+
+    clock.now += 0.1  # overrun past the next 4 deadlines
+    assert scheduler.wait() == 4
+    # the schedule continues in phase after the skipped deadlines
+    scheduler.wait()
+    phase = (clock.now - starts[0]) / 0.02
+    assert phase == pytest.approx(round(phase), abs=0.05)
+    report = scheduler.report()
+    assert report["frames"] == 22 and report["skipped"] == 4
+
+
+def test_frame_scheduler_reset_starts_a_new_schedule(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(frame_scheduler, "time", clock)
+    scheduler = FrameScheduler(fps=50.0)
+    scheduler.wait()
+
+    clock.now += 5.0  # e.g. paused between activations
+    scheduler.reset()
+    # due immediately, without counting the pause as skipped deadlines
+    start = clock.now
+    assert scheduler.wait() == 0
+    assert clock.now - start < 0.001
+    assert scheduler.skipped == 0
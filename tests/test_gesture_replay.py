@@ -0,0 +1,100 @@
+import numpy as np
+import gesture_replay
+from Gesture_Controller import GESTURE_RULES, Gest
+
+FPS = 30.0
+
+
+def hand(x, spread, dz=0.0):
+    """
+    returns (21, 3) landmarks of a right hand with index and middle finger
+    open, 'spread' apart, wrist at 'x', the middle tip 'dz' behind the index.
+    """
+    points = np.zeros((21, 3), np.float32)
+    points[:, :2] = (x, 0.8)
+    for idx, offset in zip((5, 9, 13, 17), (-0.05, 0.0, 0.05, 0.1)):
+        points[idx, :2] = (x + offset, 0.6)
+    points[4, :2] = (x - 0.2, 0.65)
+    points[8, :2] = (x - 0.05 - spread / 2, 0.3)
+    points[12] = (x - 0.05 + spread / 2, 0.3, dz)
+    points[16, :2] = (x + 0.05, 0.7)
+    points[20, :2] = (x + 0.1, 0.7)
+    return points
+
+
+def pinky_hand(x):
+    """returns (21, 3) landmarks of a right hand with only the pinky open."""
+    points = hand(x, spread=0.15)
+    points[8, :2] = (x - 0.05, 0.7)
+    points[12, :2] = (x, 0.7)
+    points[20, :2] = (x + 0.1, 0.3)
+    return points
+
+
+def save_session(path, hands):
+    """saves one right hand per frame of 'hands', None for no hand, at 'FPS'."""
+    count = len(hands)
+    landmarks = np.zeros((count, 2, 21, 3), np.float32)
+    hand_count = np.zeros(count, np.int8)
+    for idx, points in enumerate(hands):
+        if points is not None:
+            landmarks[idx, 0] = points
+            hand_count[idx] = 1
+    np.savez_compressed(
+        path,
+        timestamps=np.arange(count) / FPS,
+        hand_count=hand_count,
+        landmarks=landmarks,
+        labels=np.full((count, 2), gesture_replay.LABELS.index("Right"), np.int8),
+        scores=np.full((count, 2), 0.9, np.float32),
+    )
+
+
+def test_replay_moves_cursor_then_clicks(tmp_path):
+    # V gesture moving right arms the controller and moves the cursor,
+    # closing the fingers (MID gesture) then clicks once
+    moving = [hand(0.5 + 0.005 * idx, spread=0.15) for idx in range(30)]
+    closed = [hand(0.65, spread=0.02, dz=0.2) for _ in range(15)]
+    path = tmp_path / "session.npz"
+    save_session(path, moving + closed)
+
+    events, fps = gesture_replay.replay(gesture_replay.load_session(path))
+
+    moves = [(frame, args) for frame, name, args in events if name == "move_to"]
+    clicks = [(frame, args) for frame, name, args in events if name == "click"]
+    assert moves[0][0] == round(GESTURE_RULES[Gest.V_GEST]["dwell"] * FPS)
+    xs = [args[0] for frame, args in moves if frame < len(moving)]
+    assert xs == sorted(xs) and xs[-1] > xs[0]
+    assert len(clicks) == 1
+    frame, args = clicks[0]
+    assert args == ("left", 1)
+    assert frame >= len(moving) + GESTURE_RULES[Gest.MID]["dwell"] * FPS
+    assert events[-1] == (frame, "click", args)
+    assert fps > 0
+
+
+def test_replay_cursor_ignores_motion_of_other_gestures(tmp_path):
+    # the hand moves left with only the pinky open between two V gestures,
+    # the cursor continues from where the first V gesture left it
+    first = [hand(0.5, spread=0.15) for _ in range(10)]
+    pinky = [pinky_hand(0.5 - 0.01 * idx) for idx in range(30)]
+    second = [hand(0.2, spread=0.15) for _ in range(10)]
+    path = tmp_path / "session.npz"
+    save_session(path, first + pinky + second)
+
+    events, _ = gesture_replay.replay(gesture_replay.load_session(path))
+
+    moves = [(frame, args) for frame, name, args in events if name == "move_to"]
+    before = [args for frame, args in moves if frame < len(first) + len(pinky)]
+    after = [args for frame, args in moves if frame >= len(first) + len(pinky)]
+    assert before and after
+    assert after == [before[-1]] * len(after)
+
+
+def test_replay_without_hands_emits_nothing(tmp_path):
+    path = tmp_path / "empty.npz"
+    save_session(path, [None] * 10)
+
+    events, _ = gesture_replay.replay(gesture_replay.load_session(path))
+
+    assert events == []
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+import pytest
+from gesture_state import GestureDebouncer
+from Gesture_Controller import Controller
+
+NONE, FIST, V = 0, 1, 2
+RULES = {
+    "default": {"dwell": 0.1},
+    FIST: {"dwell": 0.2, "release": 0.3},
+    V: {"min_confidence": 0.5},
+}
+
+
+def feed(debouncer, gesture, start, stop, step=0.01, confidence=1.0):
+    """feeds 'gesture' every 'step' seconds in [start, stop), returns states."""
+    count = int(round((stop - start) / step))
+    return [
+        debouncer.update(gesture, start + idx * step, confidence)
+        for idx in range(count)
+    ]
+
+
+def test_gesture_confirmed_after_dwell_regardless_of_frame_rate():
+    for step in (1 / 15, 1 / 30, 1 / 60):
+        debouncer = GestureDebouncer(RULES, NONE)
+        states = feed(debouncer, V, 0.0, 0.3, step)
+        first = states.index(V) * step
+        assert first == pytest.approx(0.1, abs=step)
+
+
+def test_flicker_resets_dwell():
+    debouncer = GestureDebouncer(RULES, NONE)
+    assert debouncer.update(V, 0.0) == NONE
+    assert debouncer.update(V, 0.08) == NONE
+    assert debouncer.update(NONE, 0.09) == NONE
+    assert debouncer.update(V, 0.1) == NONE
+    assert debouncer.update(V, 0.19) == NONE
+    assert debouncer.update(V, 0.2) == V
+
+
+def test_release_hysteresis_keeps_confirmed_gesture():
+    debouncer = GestureDebouncer(RULES, NONE)
+    feed(debouncer, FIST, 0.0, 0.3)
+    assert debouncer.state == FIST
+    # losing the fist for less than its release time keeps it
+    assert set(feed(debouncer, NONE, 0.3, 0.5)) == {FIST}
+    feed(debouncer, FIST, 0.5, 0.6)
+    states = feed(debouncer, NONE, 0.6, 1.0)
+    assert states[:29] == [FIST] * 29 and states[-1] == NONE
+
+
+def test_low_confidence_frames_are_ignored():
+    debouncer = GestureDebouncer(RULES, NONE)
+    assert set(feed(debouncer, V, 0.0, 0.3, confidence=0.4)) == {NONE}
+    assert debouncer.since is None
+    assert debouncer.update(V, 0.3) == NONE
+    assert debouncer.update(V, 0.4) == V
+
+
+@pytest.fixture
+def pinch(monkeypatch):
+    """returns function feeding an index tip at 'y' to 'pinch_control'."""
+    for name, value in (
+        ("pinchdirectionflag", None),
+        ("prevpinchlv", 0),
+        ("pinchlv", 0),
+        ("pinchsince", None),
+        ("pinch_interval", 0.15),
+        ("pinch_threshold", 0.3),
+    ):
+        monkeypatch.setattr(Controller, name, value)
+    steps = []
+
+    def tip(y):
+        landmarks = [SimpleNamespace(x=0.5, y=0.5, z=0.0) for _ in range(21)]
+        landmarks[8] = SimpleNamespace(x=0.5, y=y, z=0.0)
+        return SimpleNamespace(landmark=landmarks)
+
+    Controller.pinch_control_init(tip(0.5))
+
+    def feed_pinch(y, timestamp):
+        Controller.pinch_control(
+            tip(y),
+            lambda: steps.append(("x", Controller.pinchlv)),
+            lambda: steps.append(("y", Controller.pinchlv)),
+            timestamp,
+        )
+        return steps
+
+    return feed_pinch
+
+
+def test_pinch_steps_after_stable_interval(pinch):
+    assert pinch(0.4, 0.0) == []
+    assert pinch(0.4, 0.1) == []
+    assert pinch(0.4, 0.15) == [("y", 1.0)]
+    # held out of the dead zone it repeats every 'pinch_interval'
+    assert pinch(0.4, 0.3) == [("y", 1.0), ("y", 1.0)]
+
+
+def test_pinch_stops_in_dead_zone(pinch):
+    pinch(0.4, 0.0)
+    pinch(0.4, 0.15)
+    # back near the start, the stale level must not step again
+    pinch(0.5, 0.2)
+    assert (Controller.prevpinchlv, Controller.pinchsince) == (0, None)
+    pinch(0.5, 0.4)
+    assert pinch(0.5, 1.0) == [("y", 1.0)]
+    # moving out again steps once stable
+    pinch(0.6, 1.1)
+    assert pinch(0.6, 1.3) == [("y", 1.0), ("y", -1.0)]
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from hand_tracking import HandTracker
+from vision_workers import LABELS, hand_results
+from Gesture_Controller import GestureController
+
+FPS = 30.0
+
+
+def frame(*hands):
+    """returns mediapipe-like results of (label, score, (x, y) wrist) 'hands'."""
+    landmarks = np.zeros((len(hands), 21, 3), np.float32)
+    for points, (_, _, wrist) in zip(landmarks, hands):
+        points[:, :2] = wrist
+    labels = [LABELS.index(label) for label, _, _ in hands]
+    scores = [score for _, score, _ in hands]
+    return hand_results(landmarks, labels, scores)
+
+
+def crossing(count):
+    """
+    yields frames of a right hand moving left above a left hand moving
+    right, the detector swaps their labels while they overlap and lists
+    them in changing order.
+    """
+    for idx in range(count):
+        right = (0.7 - 0.02 * idx, 0.4)
+        left = (0.3 + 0.02 * idx, 0.6)
+        swapped = abs(right[0] - left[0]) < 0.1
+        hands = [
+            ("Left" if swapped else "Right", 0.8, right),
+            ("Right" if swapped else "Left", 0.8, left),
+        ]
+        yield frame(*(hands[::-1] if idx % 3 else hands))
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    tracker = HandTracker()
+    monkeypatch.setattr(GestureController, "tracker", tracker)
+    monkeypatch.setattr(GestureController, "dom_hand", True)
+    for name in ("hr_major", "hr_minor", "major_track", "minor_track"):
+        monkeypatch.setattr(GestureController, name, None, raising=False)
+    return tracker
+
+
+def test_crossing_hands_keep_identity_and_label(tracker):
+    results = list(crossing(20))
+    first = {t.label: t.track_id for t in tracker.update(results[0], 0.0)}
+
+    for idx, result in enumerate(results[1:], 1):
+        tracks = tracker.update(result, idx / FPS)
+        ids = {t.label: t.track_id for t in tracks}
+        assert ids == first
+        right = next(t for t in tracks if t.label == "Right")
+        assert right.wrist[1] == pytest.approx(0.4)
+    assert tracker.switches == 0
+
+
+def test_hand_reappearing_keeps_its_track(tracker):
+    both = frame(("Right", 0.9, (0.7, 0.5)), ("Left", 0.9, (0.3, 0.5)))
+    tracks = tracker.update(both, 0.0)
+    left_id = next(t.track_id for t in tracks if t.label == "Left")
+
+    # the left hand is lost for a few frames, then detected once as right
+    right_only = frame(("Right", 0.9, (0.7, 0.5)))
+    for idx in range(1, 6):
+        assert [t.label for t in tracker.update(right_only, idx / FPS)] == ["Right"]
+    flipped = frame(("Right", 0.9, (0.7, 0.5)), ("Right", 0.7, (0.32, 0.5)))
+    tracks = tracker.update(flipped, 6 / FPS)
+    assert [(t.label, t.track_id) for t in tracks][1] == ("Left", left_id)
+
+    # lost for longer than 'max_age' it comes back as a new hand
+    for idx in range(7, 30):
+        tracker.update(right_only, idx / FPS)
+    tracks = tracker.update(both, 30 / FPS)
+    left = next(t for t in tracks if t.label == "Left")
+    assert left.track_id != left_id
+
+
+def test_major_and_minor_hand_stay_assigned(tracker):
+    majors, minors = set(), set()
+    results = list(crossing(20))
+    # the left (minor) hand drops out for a few frames mid-crossing
+    for idx in range(8, 11):
+        results[idx] = frame(("Right", 0.8, (0.7 - 0.02 * idx, 0.4)))
+
+    for idx, result in enumerate(results):
+        GestureController.classify_hands(result, idx / FPS)
+        majors.add(GestureController.major_track)
+        minors.add(GestureController.minor_track)
+        assert GestureController.hr_major is not None
+        if 8 <= idx < 11:
+            assert GestureController.hr_minor is None
+        else:
+            assert GestureController.hr_minor.landmark[0].y == pytest.approx(0.6)
+
+    assert len(majors) == 1
+    assert len(minors - {None}) == 1
@@ -0,0 +1,34 @@
+import numpy as np
+import idle_gate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self):
+        return self.now
+
+
+def test_wake_frame_counts_under_active_mode(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(idle_gate.time, "perf_counter", clock.perf_counter)
+    scheduler = idle_gate.IdleScheduler(idle_after=1.0)
+    dark = np.zeros((48, 64, 3), np.uint8)
+    bright = np.full((48, 64, 3), 255, np.uint8)
+
+    assert scheduler.should_infer(dark)
+    clock.now += 2.0
+    # goes idle, the first idle frame only primes the motion gate
+    assert not scheduler.should_infer(dark)
+    assert not scheduler.should_infer(dark)
+    assert scheduler.mode == "idle"
+    # motion wakes the loop, the frame and its inference are active
+    assert scheduler.should_infer(bright)
+    assert scheduler.mode == "active"
+
+    stats = scheduler.stats
+    assert (stats["active"]["frames"], stats["active"]["inferences"]) == (2, 2)
+    assert (stats["idle"]["frames"], stats["idle"]["inferences"]) == (2, 0)
+    for mode in stats.values():
+        assert mode["inferences"] <= mode["frames"]
@@ -0,0 +1,88 @@
+import types
+import pytest
+import input_backend
+from input_backend import FakeBackend, InputBackend
+
+
+@pytest.fixture
+def fake():
+    backend = FakeBackend(screen_size=(800, 600))
+    previous = input_backend.set_backend(backend)
+    yield backend
+    input_backend.set_backend(previous)
+
+
+class KeyLog(InputBackend):
+    """backend recording only the primitive key calls of 'InputBackend'."""
+
+    def __init__(self):
+        self.events = []
+
+    def key_down(self, key):
+        self.events.append(("key_down", key))
+
+    def key_up(self, key):
+        self.events.append(("key_up", key))
+
+
+def test_fake_backend_records_events(fake):
+    inputs = input_backend.get_backend()
+    assert inputs is fake
+    inputs.move_to(10.4, 20.6)
+    inputs.click(button="right")
+    inputs.scroll(-3)
+    inputs.hotkey("ctrl", "c")
+    inputs.press("tab")
+
+    assert fake.position() == (10.4, 20.6)
+    assert fake.events == [
+        ("move_to", (10, 21)),
+        ("click", ("right", 1)),
+        ("scroll", (-3,)),
+        ("hotkey", ("ctrl", "c")),
+        ("press", ("tab",)),
+    ]
+
+
+def test_hotkey_releases_in_reverse_order():
+    inputs = KeyLog()
+    inputs.hotkey("ctrl", "shift", "esc")
+    inputs.type_char("A")
+
+    assert inputs.events == [
+        ("key_down", "ctrl"),
+        ("key_down", "shift"),
+        ("key_down", "esc"),
+        ("key_up", "esc"),
+        ("key_up", "shift"),
+        ("key_up", "ctrl"),
+        ("key_down", "shift"),
+        ("key_down", "a"),
+        ("key_up", "a"),
+        ("key_up", "shift"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "command, event",
+    [
+        ("copy", ("hotkey", ("ctrl", "c"))),
+        ("paste", ("hotkey", ("ctrl", "v"))),
+        ("insert tab", ("press", ("tab",))),
+        ("insert whitespace", ("press", ("space",))),
+        ("backspace", ("press", ("backspace",))),
+    ],
+)
+def test_voice_commands_use_input_backend(fake, monkeypatch, command, event):
+    for module in ("pyttsx3", "speech_recognition", "wikipedia", "mediapipe"):
+        pytest.importorskip(module)
+    import Phoenix
+
+    ui = types.SimpleNamespace(addUserMsg=lambda msg: None)
+    monkeypatch.setattr(Phoenix, "app", types.SimpleNamespace(eel=ui))
+    monkeypatch.setattr(Phoenix, "reply", lambda message: None)
+    monkeypatch.setattr(Phoenix, "is_awake", True)
+
+    Phoenix.respond("phoenix " + command)
+
+    assert fake.events == [event]
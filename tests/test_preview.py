@@ -0,0 +1,77 @@
+import threading
+import numpy as np
+import preview
+
+
+class FakeHighGUI:
+    """records the HighGUI calls of the render thread, 'key' is pressed once."""
+
+    def __init__(self, monkeypatch):
+        self.shown = {}
+        self.destroyed = []
+        self.threads = set()
+        self.key = -1
+        for name in ("imshow", "waitKey", "destroyWindow"):
+            monkeypatch.setattr(preview.cv2, name, getattr(self, name))
+
+    def imshow(self, name, image):
+        self.threads.add(threading.get_ident())
+        self.shown[name] = self.shown.get(name, 0) + 1
+
+    def waitKey(self, delay):
+        self.threads.add(threading.get_ident())
+        key, self.key = self.key, -1
+        return key
+
+    def destroyWindow(self, name):
+        self.threads.add(threading.get_ident())
+        self.destroyed.append(name)
+
+
+def show(view, name):
+    view.next_due = 0.0
+    view.submit(lambda: [(name, np.zeros((4, 4, 3), np.uint8))])
+
+
+def wait_until(condition, timeout=2.0):
+    event = threading.Event()
+    while not condition() and timeout > 0:
+        event.wait(0.01)
+        timeout -= 0.01
+    return condition()
+
+
+def test_previews_share_one_thread_and_close_own_windows(monkeypatch):
+    gui = FakeHighGUI(monkeypatch)
+    monkeypatch.setattr(preview, "renderer", None)
+    gesture = preview.make_renderer("preview", 10.0)
+    eye = preview.make_renderer("preview", 10.0, stop_keys=(27,))
+    assert gesture.renderer is eye.renderer
+
+    show(gesture, "Gesture Controller")
+    show(eye, "Eye Control Mouse")
+    assert wait_until(lambda: gesture.shown and eye.shown)
+
+    gui.key = 27
+    show(gesture, "Gesture Controller")
+    assert wait_until(lambda: eye.stop_requested)
+    assert not gesture.stop_requested
+
+    eye.stop()
+    assert gui.destroyed == ["Eye Control Mouse"]
+    show(gesture, "Gesture Controller")
+    assert wait_until(lambda: gesture.shown == 3)
+    gesture.stop()
+    assert gui.destroyed == ["Eye Control Mouse", "Gesture Controller"]
+    assert gui.threads == {gesture.renderer.ident}
+    assert wait_until(lambda: not gesture.renderer.is_alive())
+
+    # the next preview starts a new render thread
+    view = preview.make_renderer("preview", 10.0)
+    assert view.renderer is not gesture.renderer
+    view.stop()
+
+
+def test_make_renderer_modes():
+    assert preview.make_renderer("window", 10.0) is None
+    assert preview.make_renderer("headless", 10.0) is None
@@ -0,0 +1,74 @@
+import time
+import pytest
+from system_control import FakeSystemBackend, SystemControlService
+
+
+class BrokenBrightnessBackend(FakeSystemBackend):
+    """fake backend that cannot read the brightness, like a monitor without DDC/CI."""
+
+    def get_level(self, kind):
+        if kind == "brightness":
+            raise OSError("no DDC/CI")
+        return super().get_level(kind)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            pytest.fail("timed out")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def service():
+    services = []
+
+    def start(backend):
+        services.append(SystemControlService(backend))
+        return services[-1]
+
+    yield start
+    for started in services:
+        started.stop()
+        started.join(timeout=1.0)
+
+
+def test_burst_of_adjusts_is_one_set_level(service):
+    backend = FakeSystemBackend(volume=0.5)
+    control = service(backend)
+    # queued before the service thread runs, so they arrive as one burst
+    for _ in range(5):
+        control.adjust("volume", 0.02)
+    control.start()
+
+    wait_until(lambda: control.applied == 1)
+    assert control.requested == 5
+    assert backend.applied == [("volume", pytest.approx(0.6))]
+
+
+def test_relative_change_reads_current_level(service):
+    backend = FakeSystemBackend(volume=0.5)
+    control = service(backend)
+    control.start()
+    control.adjust("volume", 0.1)
+    wait_until(lambda: control.applied == 1)
+
+    backend.levels["volume"] = 0.2  # changed outside, e.g. by a volume key
+    control.adjust("volume", 0.1)
+    wait_until(lambda: control.applied == 2)
+    assert backend.applied[-1] == ("volume", pytest.approx(0.3))
+
+
+def test_failing_backend_does_not_stop_the_service(service):
+    backend = BrokenBrightnessBackend()
+    control = service(backend)
+    control.start()
+    control.adjust("brightness", 0.1)
+    wait_until(lambda: not control.pending)
+
+    control.adjust("volume", -0.1)
+    control.set_level("brightness", 0.8)
+    wait_until(lambda: control.applied == 2)
+    assert control.is_alive()
+    assert sorted(backend.applied) == [("brightness", 0.8), ("volume", 0.4)]
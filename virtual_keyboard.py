@@ -1,5 +1,5 @@
 import tkinter as tk
-import pyautogui
+import input_backend
 
 
 class FullVirtualKeyboard:
@@ -76,30 +76,31 @@ class FullVirtualKeyboard:
             row_val += 1
 
     def on_button_click(self, key):
+        inputs = input_backend.get_backend()
         if key == "Space":
-            pyautogui.press("space")
+            inputs.press("space")
         elif key == "Backspace":
-            pyautogui.press("backspace")
+            inputs.press("backspace")
         elif key == "Enter":
-            pyautogui.press("enter")
+            inputs.press("enter")
         elif key == "Tab":
-            pyautogui.press("tab")
+            inputs.press("tab")
         elif key == "Shift":
-            pyautogui.press("shift")
+            inputs.press("shift")
         elif key == "Ctrl":
-            pyautogui.press("ctrl")
+            inputs.press("ctrl")
         elif key == "Alt":
-            pyautogui.press("alt")
+            inputs.press("alt")
         elif key == "CapsLock":
-            pyautogui.press("capslock")
+            inputs.press("capslock")
         elif key == "Esc":
-            pyautogui.press("esc")
+            inputs.press("esc")
         elif key == "Win":
-            pyautogui.press("winleft")
+            inputs.press("winleft")
         elif key == "Menu":
-            pyautogui.press("menu")
+            inputs.press("menu")
         else:
-            pyautogui.typewrite(key)
+            inputs.write(key)
 
 
 if __name__ == "__main__":
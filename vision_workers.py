@@ -0,0 +1,232 @@
+import multiprocessing
+import time
+from types import SimpleNamespace
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2, classification_pb2
+from camera_broker import FrameRing
+
+LABELS = ["Left", "Right"]
+
+
+def frame_view(ring, seq, shape):
+    """returns contiguous 'shape' view at the start of slot of frame 'seq'."""
+    size = int(np.prod(shape))
+    return ring.frames[seq % ring.slots].reshape(-1)[:size].reshape(shape)
+
+
+def landmark_list(points):
+    """returns 'NormalizedLandmarkList' of (N, 3) array 'points'."""
+    return landmark_pb2.NormalizedLandmarkList(
+        landmark=[
+            landmark_pb2.NormalizedLandmark(x=x, y=y, z=z)
+            for x, y, z in points.tolist()
+        ]
+    )
+
+
+def hand_results(landmarks, labels, scores):
+    """
+    returns results like 'mp_hands.Hands.process' for (H, 21, 3) 'landmarks',
+    handedness 'labels' (index into 'LABELS') and 'scores'.
+    """
+    hands, handedness = [], []
+    for points, label, score in zip(landmarks, labels, scores):
+        hands.append(landmark_list(points))
+        handedness.append(
+            classification_pb2.ClassificationList(
+                classification=[
+                    classification_pb2.Classification(
+                        index=int(label), score=float(score), label=LABELS[label]
+                    )
+                ]
+            )
+        )
+    return SimpleNamespace(
+        multi_hand_landmarks=hands or None, multi_handedness=handedness or None
+    )
+
+
+def face_results(landmarks):
+    """returns results like 'FaceMesh.process' for (F, N, 3) 'landmarks'."""
+    faces = [landmark_list(points) for points in landmarks]
+    return SimpleNamespace(multi_face_landmarks=faces or None)
+
+
+def pack_points(landmark_lists):
+    """returns (N, L, 3) float32 array of x, y, z of 'landmark_lists'."""
+    return np.array(
+        [[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in landmark_lists],
+        np.float32,
+    )
+
+
+def pack_hands(results):
+    """returns (landmarks, labels, scores) arrays of hand 'results'."""
+    if not results.multi_hand_landmarks:
+        return np.zeros((0, 21, 3), np.float32), np.zeros(0, np.int8), np.zeros(0)
+    handedness = [h.classification[0] for h in results.multi_handedness]
+    return (
+        pack_points(results.multi_hand_landmarks),
+        np.array([LABELS.index(c.label) for c in handedness], np.int8),
+        np.array([c.score for c in handedness], np.float32),
+    )
+
+
+def pack_face(results):
+    """returns (landmarks,) array of face mesh 'results'."""
+    if not results.multi_face_landmarks:
+        return (np.zeros((0, 478, 3), np.float32),)
+    return (pack_points(results.multi_face_landmarks),)
+
+
+# model factory, result packer and unpacker per worker kind
+KINDS = {
+    "hands": (
+        lambda mp, options: mp.solutions.hands.Hands(**options),
+        pack_hands,
+        hand_results,
+    ),
+    "face_mesh": (
+        lambda mp, options: mp.solutions.face_mesh.FaceMesh(**options),
+        pack_face,
+        face_results,
+    ),
+}
+
+
+def worker_main(kind, ring_name, conn, options):
+    """
+    entry point of a worker process: runs the model of 'kind' on every
+    frame announced on 'conn' as (seq, shape), replies (seq, *arrays).
+    """
+    import mediapipe as mp
+
+    ring = FrameRing(name=ring_name)
+    make_model, pack, _ = KINDS[kind]
+    model = make_model(mp, options)
+    conn.send("ready")
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            seq, shape = request
+            image = frame_view(ring, seq, shape)
+            conn.send((seq,) + pack(model.process(image)))
+    finally:
+        model.close()
+        ring.close()
+
+
+class VisionWorker:
+    """
+    Runs a mediapipe solution ('hands' or 'face_mesh') in a separate
+    process, so inference does not compete with this process for the GIL.
+
+    Frames are copied once into a shared 'camera_broker.FrameRing', only
+    their sequence no. and shape go over the pipe. Landmarks come back as
+    float arrays and are rebuilt into mediapipe-like results, 'process' can
+    be used in place of the solution's 'process'.
+
+    The worker is supervised: if it died or did not answer within
+    'timeout' seconds it is restarted and the frame returns empty results.
+
+    Attributes
+    ----------
+    kind : str
+        key of 'KINDS'.
+    options : dict
+        keyword arguments of the mediapipe solution.
+    restarts : int
+        no. of times the worker was restarted.
+    """
+
+    def __init__(self, kind, timeout=2.0, start_timeout=60.0, **options):
+        self.kind = kind
+        self.options = options
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.ring = None
+        self.worker = None
+        self.conn = None
+        self.restarts = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self, shape=None):
+        """starts the worker process with room for frames of 'shape'."""
+        if shape is not None and (self.ring is None or self.ring.shape != shape):
+            if self.ring is not None:
+                self.ring.close()
+            self.ring = FrameRing(shape, slots=2)
+        if self.ring is None:
+            return
+        self.conn, child = self.context.Pipe()
+        self.worker = self.context.Process(
+            target=worker_main,
+            args=(self.kind, self.ring.name, child, self.options),
+            daemon=True,
+        )
+        self.worker.start()
+        child.close()
+        if not self.conn.poll(self.start_timeout) or self.conn.recv() != "ready":
+            raise RuntimeError("%s worker did not start" % self.kind)
+
+    def stop(self):
+        if self.worker is None:
+            return
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.worker.join(1.0)
+        if self.worker.is_alive():
+            self.worker.terminate()
+            self.worker.join()
+        self.conn.close()
+        self.worker = None
+
+    def restart(self, shape=None):
+        print("Restarting %s worker." % self.kind)
+        self.restarts += 1
+        self.stop()
+        self.start(shape)
+
+    def process(self, image):
+        """returns results of the worker's model for RGB 'image'."""
+        unpack = KINDS[self.kind][2]
+        if self.ring is None or image.size > self.ring.frames[0].size:
+            self.stop()
+            self.start(image.shape)
+        elif self.worker is None or not self.worker.is_alive():
+            self.restart()
+
+        seq, _ = self.ring.begin()
+        np.copyto(frame_view(self.ring, seq, image.shape), image)
+        self.ring.publish(seq, time.perf_counter())
+        try:
+            self.conn.send((seq, image.shape))
+            while self.conn.poll(self.timeout):
+                reply = self.conn.recv()
+                if reply[0] == seq:
+                    return unpack(*reply[1:])
+        except (EOFError, BrokenPipeError, OSError):
+            pass
+        self.restart()
+        empty = SimpleNamespace(multi_hand_landmarks=None, multi_face_landmarks=None)
+        return unpack(*KINDS[self.kind][1](empty))
+
+    def close(self):
+        self.stop()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -1,5 +1,5 @@
 import speech_recognition as sr
-import pyautogui
+import input_backend
 import threading
 import time
 
@@ -19,7 +19,7 @@ def voice_typing():
             command = recognizer.recognize_google(audio)
             print(f"You said: {command}")
 
-            pyautogui.write(command, interval=0.05)
+            input_backend.get_backend().write(command, interval=0.05)
 
         except sr.UnknownValueError:
             print("Could not understand the audio, please try again.")